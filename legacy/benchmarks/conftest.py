@@ -0,0 +1,55 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# Benchmarks run from the legacy/ directory so config/ resolves as in main.py
+sys.path.insert(0, str(Path(__file__).parent))
+
+pytest.importorskip("pytest_benchmark")
+
+
+@pytest.fixture(scope="session")
+def bench_loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def browser(bench_loop):
+    """A plain headless Chromium, shared by every browser benchmark."""
+    from playwright.async_api import async_playwright
+
+    playwright = bench_loop.run_until_complete(async_playwright().start())
+    try:
+        browser = bench_loop.run_until_complete(
+            playwright.chromium.launch(headless=True)
+        )
+    except Exception as e:
+        bench_loop.run_until_complete(playwright.stop())
+        pytest.skip(f"Chromium is not available: {e}")
+    yield browser
+    bench_loop.run_until_complete(browser.close())
+    bench_loop.run_until_complete(playwright.stop())
+
+
+@pytest.fixture
+def serve_page(bench_loop, browser):
+    """Opens a fresh page serving the given HTML, viewport as in start()."""
+    pages = []
+
+    def serve(html: str):
+        async def open_page():
+            page = await browser.new_page(viewport={"width": 1280, "height": 800})
+            await page.set_content(html)
+            return page
+
+        page = bench_loop.run_until_complete(open_page())
+        pages.append(page)
+        return page
+
+    yield serve
+    for page in pages:
+        bench_loop.run_until_complete(page.close())
@@ -0,0 +1,71 @@
+"""Synthetic WhatsApp-Web-like pages for offline benchmarks.
+
+The generated page follows the structure and attributes that
+``config/selectors.yaml`` targets: a virtualized ``[aria-label="Chat list"]``
+of ``div[role='row']`` rows with ``span[title]`` names, a ``#main`` header,
+a contact drawer, and a virtualized ``div[data-tab='8']`` message pane whose
+bubbles carry ``data-pre-plain-text`` and ``span.selectable-text``. Chat and
+message contents are generated in-page from their indices, so pages with thousands
+of chats and messages stay small.
+"""
+
+import json
+import resource
+import sys
+from pathlib import Path
+
+_PAGE = Path(__file__).with_name("synthetic_page.html")
+
+
+def generate_page(
+    chats: int = 50,
+    messages: int = 200,
+    window: int = 60,
+    page: int = 40,
+    group_every: int = 10,
+    latency_ms: int = 5,
+) -> str:
+    """Builds a synthetic page with ``chats`` x ``messages`` of history.
+
+    ``window`` bubbles are rendered at a time and scrolling to the top of
+    the message pane loads ``page`` older ones, after ``latency_ms``.
+    Every ``group_every``-th chat is a group.
+    """
+    config = {
+        "chats": chats,
+        "messages": messages,
+        "window": window,
+        "page": page,
+        "groupEvery": group_every,
+        "latencyMs": latency_ms,
+    }
+    return _PAGE.read_text(encoding="utf-8").replace("__CONFIG__", json.dumps(config))
+
+
+def generate_messages(count: int, chat: int = 0):
+    """Message records shaped like the scraper's output, for storage benches."""
+    return [
+        {
+            "info": f"[10:{k % 60:02d} AM, 1/{k % 28 + 1}/2024] Contact {chat}: ",
+            "text": f"Message {k} in chat {chat}: lorem ipsum dolor sit amet",
+        }
+        for k in range(count)
+    ]
+
+
+def peak_rss_mb() -> float:
+    """Peak RSS of this process, plus the current RSS of its children (the
+    browser) when psutil is installed."""
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    try:
+        import psutil
+    except ImportError:
+        return round(rss, 1)
+    for child in psutil.Process().children(recursive=True):
+        try:
+            rss += child.memory_info().rss / (1024 * 1024)
+        except psutil.Error:
+            pass
+    return round(rss, 1)
@@ -0,0 +1,98 @@
+"""Offline throughput benchmarks against a synthetic WhatsApp-like page.
+
+Run from legacy/ with ``pytest benchmarks/``. Browser benchmarks are skipped
+when Chromium is not installed; storage benchmarks need no browser.
+"""
+
+from unittest.mock import patch
+
+import pytest
+from fixtures import generate_messages, generate_page, peak_rss_mb
+
+from midori_kage.scraper import MidoriKage
+
+CHATS = 20
+MESSAGES = 200
+
+
+def make_scraper(tmp_path, **kwargs) -> MidoriKage:
+    with patch("midori_kage.scraper.async_playwright"):
+        scraper = MidoriKage(
+            headless=True,
+            session_dir=str(tmp_path / "session"),
+            chats_dir=str(tmp_path / "chats"),
+            log_file=str(tmp_path / "debug.log"),
+            wait_timeout=2.0,
+            # Throughput is what we measure, not the rate budget
+            chats_per_minute=0,
+            actions_per_second=0,
+            **kwargs,
+        )
+    return scraper
+
+
+def record(benchmark, chats: int = 0, messages: int = 0):
+    # No stats under --benchmark-disable / --benchmark-skip
+    if not benchmark.stats:
+        return
+    seconds = benchmark.stats.stats.mean
+    if chats:
+        benchmark.extra_info["chats_per_minute"] = round(chats / seconds * 60, 1)
+    if messages:
+        benchmark.extra_info["messages_per_second"] = round(messages / seconds, 1)
+    benchmark.extra_info["peak_rss_mb"] = peak_rss_mb()
+
+
+@pytest.mark.parametrize("backfill", [False, True], ids=["visible", "backfill"])
+def test_scrape_chats(benchmark, bench_loop, serve_page, tmp_path, backfill):
+    html = generate_page(chats=CHATS, messages=MESSAGES)
+    runs = []
+
+    def setup():
+        # Fresh page and output dir so no chat is skipped as cached
+        scraper = make_scraper(tmp_path / str(len(runs)), backfill=backfill)
+        scraper.page = serve_page(html)
+        runs.append(scraper)
+        return (scraper,), {}
+
+    def run(scraper):
+        bench_loop.run_until_complete(scraper.scrape_chats(limit=CHATS))
+
+    benchmark.pedantic(run, setup=setup, rounds=3)
+
+    saved = runs[-1].storage.chat_names()
+    # Every tenth chat is a group and skipped
+    assert len(saved) == CHATS - CHATS // 10
+    messages = sum(len(runs[-1].storage.load_chat(n)["messages"]) for n in saved)
+    record(benchmark, chats=len(saved), messages=messages)
+
+
+@pytest.mark.parametrize("batch_extract", [True, False], ids=["batched", "locator"])
+def test_scrape_current_chat(
+    benchmark, bench_loop, serve_page, tmp_path, batch_extract
+):
+    scraper = make_scraper(tmp_path, batch_extract=batch_extract)
+    scraper.page = serve_page(generate_page(chats=1, messages=MESSAGES, window=200))
+    bench_loop.run_until_complete(scraper.page.click("div[role='row']"))
+
+    def run():
+        return bench_loop.run_until_complete(scraper._scrape_current_chat())
+
+    messages = benchmark(run)
+
+    assert len(messages) == MESSAGES
+    record(benchmark, messages=len(messages))
+
+
+@pytest.mark.parametrize("storage", ["json", "jsonl", "sqlite"])
+def test_save_chat_history(benchmark, tmp_path, storage):
+    scraper = make_scraper(tmp_path, storage=storage)
+    messages = generate_messages(5000)
+    counter = iter(range(10**6))
+
+    def run():
+        # A new chat per round so each one is a full write
+        scraper._save_chat_history(f"Chat {next(counter)}", messages, {"name": "x"})
+
+    benchmark(run)
+    record(benchmark, chats=1, messages=len(messages))
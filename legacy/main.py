@@ -1,10 +1,15 @@
 import argparse
 import asyncio
+import json
+import sqlite3
 import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
 
 from loguru import logger
 
-from midori_kage.scraper import MidoriKage
+# midori_kage modules are imported where used: playwright, pydantic and
+# pyarrow take longer to import than a daemon client takes to run.
 
 # Configure logger
 logger.remove()
@@ -19,8 +24,39 @@ logger.add(
 )
 
 
+def build_scraper(args):
+    from midori_kage.scraper import MidoriKage
+
+    return MidoriKage(
+        headless=args.headless,
+        batch_extract=not args.per_locator,
+        incremental=args.incremental,
+        backfill=args.backfill,
+        backfill_depth=args.backfill_depth,
+        backfill_until=args.backfill_until,
+        storage=args.storage,
+        wait_timeout=args.wait_timeout,
+        pipeline_depth=args.pipeline_depth,
+        pipeline_writers=args.pipeline_writers,
+        resume=args.resume,
+        metrics_path=args.metrics,
+        metrics_interval=args.metrics_interval,
+        block_resources=args.block_resources,
+        max_heap_mb=args.max_heap_mb,
+        max_rss_mb=args.max_rss_mb,
+        capture_media=args.capture_media,
+        media_workers=args.media_workers,
+        parse_info=args.parse_info,
+        contact_ttl_hours=args.contact_ttl,
+        refresh_contacts=args.refresh_contacts,
+        chats_per_minute=args.chats_per_minute,
+        actions_per_second=args.actions_per_second,
+        snapshot_dom=args.snapshot_dom,
+    )
+
+
 async def run_scraper(args):
-    scraper = MidoriKage(headless=args.headless)
+    scraper = build_scraper(args)
     try:
         await scraper.start()
 
@@ -33,7 +69,7 @@ async def run_scraper(args):
             return
 
         if args.scrape_contacts:
-            logger.info("Scraping contacts feature not yet implemented.")
+            await scraper.scrape_contacts(limit=args.limit)
             return
 
         # Keep alive loop
@@ -52,13 +88,312 @@ async def run_scraper(args):
         await scraper.close()
 
 
+def _midnight(day):
+    return datetime.combine(day, datetime.min.time()) if day else None
+
+
+def run_archive(args):
+    from midori_kage.archive import SqliteStorage, import_chats_dir
+
+    chats_dir = Path(args.chats_dir)
+    if args.archive_command == "import":
+        count = import_chats_dir(chats_dir, args.db)
+        logger.info(f"Imported {count} chats into the archive.")
+        return
+
+    archive = SqliteStorage(chats_dir, args.db)
+    try:
+        if args.archive_command == "search":
+            try:
+                rows = archive.search(args.query, chat_name=args.chat, limit=args.limit)
+            except sqlite3.OperationalError as e:
+                sys.exit(f"Invalid search query {args.query!r}: {e}")
+        else:
+            rows = archive.messages_between(
+                args.chat, since=_midnight(args.since), until=_midnight(args.until)
+            )
+        for row in rows:
+            print(json.dumps(row, ensure_ascii=False))
+    finally:
+        archive.close()
+
+
+def add_archive_parser(subparsers):
+    archive = subparsers.add_parser(
+        "archive", help="Import chats into and query the SQLite archive"
+    )
+    archive.add_argument(
+        "--chats-dir", default="chats", help="Directory of scraped chats"
+    )
+    archive.add_argument(
+        "--db",
+        type=Path,
+        default=None,
+        help="Archive database (default: <chats-dir>/archive.sqlite3)",
+    )
+    commands = archive.add_subparsers(dest="archive_command", required=True)
+
+    commands.add_parser("import", help="Bulk-import chats/*.json and *.jsonl")
+
+    search = commands.add_parser("search", help="Full-text search message text")
+    search.add_argument("query", help="FTS5 query, e.g. 'invoice OR receipt'")
+    search.add_argument("--chat", default=None, help="Only search this chat")
+    search.add_argument("--limit", type=int, default=50, help="Max results")
+
+    scan = commands.add_parser("range", help="List a chat's messages by date")
+    scan.add_argument("chat", help="Chat name")
+    scan.add_argument(
+        "--since", type=date.fromisoformat, default=None, help="YYYY-MM-DD"
+    )
+    scan.add_argument(
+        "--until", type=date.fromisoformat, default=None, help="YYYY-MM-DD"
+    )
+
+
+def run_export(args):
+    from midori_kage.export import export_chats
+    from midori_kage.storage import open_storage
+
+    storage = open_storage(args.storage, Path(args.chats_dir))
+    export_chats(storage, args.out, fmt=args.format, locale=args.locale)
+
+
+def add_export_parser(subparsers):
+    export = subparsers.add_parser(
+        "export", help="Export chats to Parquet or Arrow files for analytics"
+    )
+    export.add_argument("out", type=Path, help="Output directory")
+    export.add_argument(
+        "--chats-dir", default="chats", help="Directory of scraped chats"
+    )
+    export.add_argument(
+        "--storage",
+        choices=["json", "jsonl", "sqlite"],
+        default="json",
+        help="Storage backend the chats were saved with",
+    )
+    export.add_argument("--format", choices=["arrow", "parquet"], default="parquet")
+    export.add_argument(
+        "--locale",
+        default="en-US",
+        help="Locale of the message dates, for chats saved without --parse-info",
+    )
+
+
+def run_reextract(args):
+    from midori_kage.config import load_selectors
+    from midori_kage.snapshots import reextract_archive
+    from midori_kage.storage import open_storage
+
+    storage = open_storage(args.storage, Path(args.out))
+    reextract_archive(
+        args.snapshots,
+        storage,
+        load_selectors(),
+        workers=args.workers,
+        parse_info=args.parse_info,
+        locale=args.locale,
+    )
+
+
+def add_reextract_parser(subparsers):
+    reextract = subparsers.add_parser(
+        "reextract",
+        help="Extract messages again from --snapshot-dom snapshots, without a browser",
+    )
+    reextract.add_argument(
+        "snapshots",
+        type=Path,
+        nargs="?",
+        default=Path("chats/snapshots"),
+        help="Directory of snapshots",
+    )
+    reextract.add_argument(
+        "--out", default="chats_reextracted", help="Directory to save chats to"
+    )
+    reextract.add_argument(
+        "--storage",
+        choices=["json", "jsonl", "sqlite"],
+        default="json",
+        help="Storage backend to save chats with",
+    )
+    reextract.add_argument(
+        "--workers", type=int, help="Parser processes (default: one per CPU)"
+    )
+    reextract.add_argument(
+        "--parse-info",
+        action="store_true",
+        help="Add timestamp, sender and direction fields to each message",
+    )
+    reextract.add_argument(
+        "--locale", default="en-US", help="Locale of the message dates"
+    )
+
+
+def run_estimate(args):
+    from midori_kage.ratelimit import estimate_run, observed_timings
+
+    timings = {"seconds_per_chat": args.chat_seconds}
+    if args.from_metrics:
+        timings.update(observed_timings(args.from_metrics))
+    estimate = estimate_run(args.chats, args.chats_per_minute, **timings)
+    print(
+        f"{estimate['chats']} chats at up to {args.chats_per_minute:g}/min, "
+        f"~{estimate['seconds_per_chat']:g}s each: "
+        f"{timedelta(seconds=round(estimate['total_seconds']))} "
+        f"({estimate['rate_wait_seconds']:g}s waiting on the rate budget)"
+    )
+    print(
+        "With a fixed delay after every chat: "
+        f"{timedelta(seconds=round(estimate['legacy_total_seconds']))}"
+    )
+
+
+def add_estimate_parser(subparsers):
+    estimate = subparsers.add_parser(
+        "estimate", help="Predict how long a run takes without opening a browser"
+    )
+    estimate.add_argument("chats", type=int, help="Number of chats in the account")
+    estimate.add_argument(
+        "--chats-per-minute", type=float, default=20.0, help="Rate budget for chats"
+    )
+    estimate.add_argument(
+        "--chat-seconds",
+        type=float,
+        default=6.0,
+        help="Time to scrape one chat, without rate waits",
+    )
+    estimate.add_argument(
+        "--from-metrics",
+        type=Path,
+        help="Take chat and scroll times from a --metrics JSON file of a past run",
+    )
+
+
+def run_orchestrator(args):
+    from midori_kage.orchestrator import Orchestrator, load_manifest
+
+    manifest = load_manifest(args.manifest)
+    if args.concurrency:
+        manifest.concurrency = args.concurrency
+
+    reports = asyncio.run(Orchestrator(manifest).run())
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            json.dump([r.model_dump() for r in reports], f, indent=2)
+    if any(r.status != "done" for r in reports):
+        sys.exit(1)
+
+
+def add_orchestrate_parser(subparsers):
+    orchestrate = subparsers.add_parser(
+        "orchestrate", help="Scrape several accounts in parallel processes"
+    )
+    orchestrate.add_argument(
+        "manifest", type=Path, help="YAML manifest listing the accounts"
+    )
+    orchestrate.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Max accounts running at once (overrides the manifest)",
+    )
+    orchestrate.add_argument(
+        "--summary", type=Path, default=None, help="Write a JSON summary here"
+    )
+
+
+def run_daemon(args):
+    if args.daemon_command == "start":
+        from midori_kage.daemon import MidoriDaemon
+
+        daemon = MidoriDaemon(build_scraper(args), args.socket)
+        asyncio.run(daemon.serve())
+        return
+
+    from midori_kage import client
+
+    try:
+        response = _daemon_request(client, args)
+    except (FileNotFoundError, ConnectionRefusedError):
+        logger.error(f"No daemon listening on {args.socket}.")
+        sys.exit(1)
+
+    print(json.dumps(response, ensure_ascii=False))
+    job = response.get("job") or {}
+    if not response["ok"] or job.get("status") == "failed":
+        sys.exit(1)
+
+
+def _daemon_request(client, args):
+    if args.daemon_command == "submit":
+        kind = args.job.replace("-", "_")
+        if kind == "scrape_chats":
+            params = {"limit": args.limit}
+        elif kind == "scrape_chat":
+            params = {"name": args.name}
+        else:
+            params = {"out": str(args.out.resolve()), "format": args.format}
+        response = client.request(
+            args.socket, {"op": "submit", "kind": kind, "params": params}
+        )
+        if response["ok"] and args.wait:
+            job = client.wait_for_job(args.socket, response["job"]["id"])
+            response = {"ok": True, "job": job}
+    elif args.daemon_command == "status":
+        if args.job_id:
+            response = client.request(args.socket, {"op": "status", "id": args.job_id})
+        else:
+            response = client.request(args.socket, {"op": "list"})
+    else:
+        response = client.request(args.socket, {"op": "shutdown"})
+    return response
+
+
+def add_daemon_parser(subparsers):
+    daemon = subparsers.add_parser(
+        "daemon", help="Keep a warm browser session and run jobs sent to it"
+    )
+    daemon.add_argument(
+        "--socket",
+        type=Path,
+        default=Path("session/daemon.sock"),
+        help="Unix socket the daemon listens on",
+    )
+    commands = daemon.add_subparsers(dest="daemon_command", required=True)
+
+    commands.add_parser(
+        "start", help="Run the daemon (scraper options go before 'daemon')"
+    )
+
+    submit = commands.add_parser("submit", help="Queue a job")
+    submit.add_argument(
+        "--wait", action="store_true", help="Block until the job finishes"
+    )
+    jobs = submit.add_subparsers(dest="job", required=True)
+    chats = jobs.add_parser("scrape-chats", help="Scrape the top N chats")
+    chats.add_argument("--limit", type=int, default=10)
+    chat = jobs.add_parser("scrape-chat", help="Scrape one chat by name")
+    chat.add_argument("name")
+    export = jobs.add_parser("export", help="Export the archive")
+    export.add_argument("out", type=Path)
+    export.add_argument("--format", choices=["arrow", "parquet"], default="parquet")
+
+    status = commands.add_parser("status", help="Show one job, or all jobs")
+    status.add_argument("job_id", nargs="?", default=None)
+
+    commands.add_parser("stop", help="Finish the running job and shut down")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Midori Kage - WhatsApp Web Scraper")
     parser.add_argument(
         "--headless", action="store_true", help="Run in headless mode (default: False)"
     )
     parser.add_argument(
-        "--scrape-contacts", action="store_true", help="Scrape contacts list"
+        "--scrape-contacts",
+        action="store_true",
+        help="Harvest contacts and groups from the New chat list",
     )
     parser.add_argument(
         "--scrape-chats", action="store_true", help="Scrape chat history"
@@ -66,9 +401,166 @@ def main():
     parser.add_argument(
         "--limit", type=int, default=50, help="Limit number of items to scrape"
     )
+    parser.add_argument(
+        "--per-locator",
+        action="store_true",
+        help="Extract messages with per-bubble locator calls instead of one batch",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Revisit cached chats and append only messages newer than last run",
+    )
+    parser.add_argument(
+        "--backfill",
+        action="store_true",
+        help="Scroll each chat back to load its full history",
+    )
+    parser.add_argument(
+        "--backfill-depth",
+        type=int,
+        default=None,
+        help="Stop backfilling a chat after this many messages",
+    )
+    parser.add_argument(
+        "--backfill-until",
+        type=date.fromisoformat,
+        default=None,
+        help="Stop backfilling at messages older than this date (YYYY-MM-DD)",
+    )
+    parser.add_argument(
+        "--storage",
+        choices=["json", "jsonl", "sqlite"],
+        default="json",
+        help="Chat storage: JSON files, append-only JSON Lines or SQLite archive",
+    )
+    parser.add_argument(
+        "--wait-timeout",
+        type=float,
+        default=5.0,
+        help="Max seconds to wait for the page to show headers, drawers or rows",
+    )
+    parser.add_argument(
+        "--pipeline-depth",
+        type=int,
+        default=4,
+        help="Chats buffered between scraping and saving (0 saves inline)",
+    )
+    parser.add_argument(
+        "--pipeline-writers",
+        type=int,
+        default=1,
+        help="Concurrent storage writer threads",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run from its manifest checkpoint",
+    )
+    parser.add_argument(
+        "--metrics",
+        type=Path,
+        default=None,
+        help="Write per-phase timings here (Prometheus text, or JSON if *.json)",
+    )
+    parser.add_argument(
+        "--metrics-interval",
+        type=float,
+        default=30.0,
+        help="Seconds between metrics file updates during a run",
+    )
+    parser.add_argument(
+        "--block-resources",
+        action="store_true",
+        help="Block images, media and fonts per config/resources.yaml",
+    )
+    parser.add_argument(
+        "--max-heap-mb",
+        type=float,
+        default=None,
+        help="Recycle the page between chats when its JS heap exceeds this",
+    )
+    parser.add_argument(
+        "--max-rss-mb",
+        type=float,
+        default=None,
+        help="Restart the browser between chats when its RSS exceeds this",
+    )
+    parser.add_argument(
+        "--capture-media",
+        action="store_true",
+        help="Download message media into chats/media/, referenced by hash",
+    )
+    parser.add_argument(
+        "--media-workers",
+        type=int,
+        default=4,
+        help="Concurrent media downloads",
+    )
+    parser.add_argument(
+        "--parse-info",
+        action="store_true",
+        help="Add timestamp, sender and direction fields to each message",
+    )
+    parser.add_argument(
+        "--contact-ttl",
+        type=float,
+        default=168.0,
+        metavar="HOURS",
+        help="Reuse cached contact info younger than this (0 disables the cache)",
+    )
+    parser.add_argument(
+        "--chats-per-minute",
+        type=float,
+        default=20.0,
+        help="Rate budget for opening chats; time spent in a chat counts (0: off)",
+    )
+    parser.add_argument(
+        "--actions-per-second",
+        type=float,
+        default=2.0,
+        help="Rate budget for clicks and scrolls (0: off)",
+    )
+    parser.add_argument(
+        "--snapshot-dom",
+        action="store_true",
+        help="Save each chat's HTML to chats/snapshots for offline re-extraction",
+    )
+    parser.add_argument(
+        "--refresh-contacts",
+        action="store_true",
+        help="Re-read contact info for every chat and refresh the cache",
+    )
+
+    subparsers = parser.add_subparsers(dest="command")
+    add_archive_parser(subparsers)
+    add_orchestrate_parser(subparsers)
+    add_export_parser(subparsers)
+    add_estimate_parser(subparsers)
+    add_reextract_parser(subparsers)
+    add_daemon_parser(subparsers)
 
     args = parser.parse_args()
 
+    if args.command == "archive":
+        run_archive(args)
+        return
+    if args.command == "orchestrate":
+        run_orchestrator(args)
+        return
+    if args.command == "export":
+        run_export(args)
+        return
+    if args.command == "reextract":
+        run_reextract(args)
+        return
+    if args.command == "estimate":
+        run_estimate(args)
+        return
+    if args.command == "daemon":
+        run_daemon(args)
+        return
+
     asyncio.run(run_scraper(args))
 
 
@@ -0,0 +1,307 @@
+import json
+import re
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from loguru import logger
+
+from midori_kage.parsing import parse_info
+from midori_kage.storage import ChatStorage, JsonlStorage, Message
+
+# Quoted phrases or runs of non-space characters
+_FTS_TOKEN_RE = re.compile(r'"[^"]*"|\S+')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS contacts (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    phone TEXT,
+    about TEXT,
+    scraped_at TEXT
+);
+CREATE TABLE IF NOT EXISTS chats (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    contact_id INTEGER REFERENCES contacts(id),
+    updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    chat_id INTEGER NOT NULL REFERENCES chats(id),
+    seq INTEGER NOT NULL,
+    info TEXT NOT NULL,
+    text TEXT NOT NULL,
+    sender TEXT,
+    sent_at TEXT,
+    extra TEXT,
+    UNIQUE (chat_id, seq)
+);
+CREATE INDEX IF NOT EXISTS messages_chat_sent_at ON messages (chat_id, sent_at);
+CREATE INDEX IF NOT EXISTS messages_sent_at ON messages (sent_at);
+"""
+
+# External-content FTS5 index kept in sync with ``messages`` by triggers
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    text, content='messages', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS messages_ai AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_ad AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, text)
+    VALUES ('delete', old.id, old.text);
+END;
+"""
+
+_CONTACT_FIELDS = ("name", "phone", "about", "scraped_at")
+
+
+def fts_query(query: str) -> str:
+    """Quotes plain terms so punctuation ("don't", "e-mail") is searched
+    literally. Quoted phrases, AND/OR/NOT and trailing ``*`` still work."""
+    terms = []
+    for token in _FTS_TOKEN_RE.findall(query):
+        if token in ("AND", "OR", "NOT") or (
+            len(token) > 1 and token.startswith('"') and token.endswith('"')
+        ):
+            terms.append(token)
+            continue
+        prefix = token.endswith("*") and len(token) > 1
+        word = token[:-1] if prefix else token
+        terms.append('"' + word.replace('"', '""') + '"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+class SqliteStorage(ChatStorage):
+    """Normalized SQLite archive with an FTS5 index over message text.
+
+    Every write is a single transaction. If the SQLite build lacks FTS5,
+    text search falls back to a (slow) ``LIKE`` scan. The connection may be
+    used from pipeline writer threads; writes are serialized by a lock.
+    """
+
+    def __init__(self, chats_dir: Path, db_path: Optional[Path] = None):
+        super().__init__(chats_dir)
+        self.db_path = Path(db_path or self.chats_dir / "archive.sqlite3")
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(_SCHEMA)
+        try:
+            self.conn.executescript(_FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError as e:
+            logger.warning(f"FTS5 unavailable ({e}); text search will be slow.")
+            self.has_fts = False
+
+    def close(self):
+        self.conn.close()
+
+    def _chat_id(self, chat_name: str) -> Optional[int]:
+        row = self.conn.execute(
+            "SELECT id FROM chats WHERE name = ?", (chat_name,)
+        ).fetchone()
+        return row["id"] if row else None
+
+    def _upsert_chat(self, chat_name: str, contact_info: Optional[Dict]) -> int:
+        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self.conn.execute(
+            "INSERT INTO chats (name, updated_at) VALUES (?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET updated_at = excluded.updated_at",
+            (chat_name, now),
+        )
+        row = self.conn.execute(
+            "SELECT id, contact_id FROM chats WHERE name = ?", (chat_name,)
+        ).fetchone()
+
+        if contact_info:
+            values = [contact_info.get(field, "") for field in _CONTACT_FIELDS]
+            if row["contact_id"] is None:
+                cursor = self.conn.execute(
+                    "INSERT INTO contacts (name, phone, about, scraped_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    values,
+                )
+                self.conn.execute(
+                    "UPDATE chats SET contact_id = ? WHERE id = ?",
+                    (cursor.lastrowid, row["id"]),
+                )
+            else:
+                self.conn.execute(
+                    "UPDATE contacts SET name = ?, phone = ?, about = ?, "
+                    "scraped_at = ? WHERE id = ?",
+                    values + [row["contact_id"]],
+                )
+        return row["id"]
+
+    def _insert_batches(
+        self, chat_id: int, batches: Iterable[List[Message]], seq: int
+    ) -> int:
+        for batch in batches:
+            rows = []
+            for message in batch:
+                info = message.get("info", "")
+                timestamp, sender = parse_info(info)
+                extra = {k: v for k, v in message.items() if k not in ("info", "text")}
+                rows.append(
+                    (
+                        chat_id,
+                        seq,
+                        info,
+                        message.get("text", ""),
+                        sender,
+                        timestamp.isoformat() if timestamp else None,
+                        json.dumps(extra, ensure_ascii=False) if extra else None,
+                    )
+                )
+                seq += 1
+            self.conn.executemany(
+                "INSERT INTO messages "
+                "(chat_id, seq, info, text, sender, sent_at, extra) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return seq
+
+    def exists(self, chat_name):
+        return self._chat_id(chat_name) is not None
+
+    def write_chat(self, chat_name, batches, contact_info=None):
+        with self._lock, self.conn:
+            chat_id = self._upsert_chat(chat_name, contact_info or {})
+            self.conn.execute("DELETE FROM messages WHERE chat_id = ?", (chat_id,))
+            self._insert_batches(chat_id, batches, 0)
+
+    def append_messages(self, chat_name, messages, contact_info=None):
+        with self._lock, self.conn:
+            chat_id = self._upsert_chat(chat_name, contact_info)
+            row = self.conn.execute(
+                "SELECT COALESCE(MAX(seq) + 1, 0) AS next FROM messages "
+                "WHERE chat_id = ?",
+                (chat_id,),
+            ).fetchone()
+            self._insert_batches(chat_id, [messages], row["next"])
+
+    def _message(self, row: sqlite3.Row) -> Message:
+        message = {"info": row["info"], "text": row["text"]}
+        if row["extra"]:
+            message.update(json.loads(row["extra"]))
+        return message
+
+    def load_chat(self, chat_name):
+        chat = self.conn.execute(
+            "SELECT chats.id, contacts.name, contacts.phone, contacts.about, "
+            "contacts.scraped_at FROM chats "
+            "LEFT JOIN contacts ON contacts.id = chats.contact_id "
+            "WHERE chats.name = ?",
+            (chat_name,),
+        ).fetchone()
+        if chat is None:
+            return None
+
+        contact_info = {}
+        if chat["name"] is not None:
+            contact_info = {field: chat[field] for field in _CONTACT_FIELDS}
+        rows = self.conn.execute(
+            "SELECT info, text, extra FROM messages WHERE chat_id = ? ORDER BY seq",
+            (chat["id"],),
+        )
+        return {
+            "chat_name": chat_name,
+            "contact_info": contact_info,
+            "messages": [self._message(row) for row in rows],
+        }
+
+    def tail(self, chat_name, count=1):
+        rows = self.conn.execute(
+            "SELECT info, text, extra FROM messages "
+            "WHERE chat_id = (SELECT id FROM chats WHERE name = ?) "
+            "ORDER BY seq DESC LIMIT ?",
+            (chat_name, count),
+        ).fetchall()
+        return [self._message(row) for row in reversed(rows)]
+
+    def chat_names(self):
+        rows = self.conn.execute("SELECT name FROM chats ORDER BY name")
+        return [row["name"] for row in rows]
+
+    def location(self, chat_name):
+        return f"{self.db_path}#{chat_name}"
+
+    def search(
+        self, query: str, chat_name: Optional[str] = None, limit: int = 50
+    ) -> List[Dict]:
+        """Full-text search over message text, best matches first."""
+        # Fixed SQL; an unset chat_name matches every chat
+        if self.has_fts:
+            sql = (
+                "SELECT chats.name AS chat, messages.sent_at, messages.info, "
+                "messages.text FROM messages_fts "
+                "JOIN messages ON messages.id = messages_fts.rowid "
+                "JOIN chats ON chats.id = messages.chat_id "
+                "WHERE messages_fts MATCH ? AND (? IS NULL OR chats.name = ?) "
+                "ORDER BY messages_fts.rank LIMIT ?"
+            )
+            term = fts_query(query)
+        else:
+            sql = (
+                "SELECT chats.name AS chat, messages.sent_at, messages.info, "
+                "messages.text FROM messages "
+                "JOIN chats ON chats.id = messages.chat_id "
+                "WHERE messages.text LIKE ? AND (? IS NULL OR chats.name = ?) "
+                "LIMIT ?"
+            )
+            term = f"%{query}%"
+        params = (term, chat_name, chat_name, limit)
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def messages_between(
+        self,
+        chat_name: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> List[Dict]:
+        """Messages of one chat within a timestamp range, using the index."""
+        sql = (
+            "SELECT messages.sent_at, messages.info, messages.text FROM messages "
+            "JOIN chats ON chats.id = messages.chat_id WHERE chats.name = ?"
+        )
+        params: List = [chat_name]
+        if since is not None:
+            sql += " AND messages.sent_at >= ?"
+            params.append(since.isoformat())
+        if until is not None:
+            sql += " AND messages.sent_at < ?"
+            params.append(until.isoformat())
+        sql += " ORDER BY messages.sent_at, messages.seq"
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def import_chats(self, source: ChatStorage) -> int:
+        """Copies every chat from another backend, one transaction per chat."""
+        imported = 0
+        for chat_name in source.chat_names():
+            chat = source.load_chat(chat_name)
+            if chat is None:
+                continue
+            self.write_chat(chat_name, [chat["messages"]], chat.get("contact_info"))
+            imported += 1
+            if imported % 100 == 0:
+                logger.info(f"Imported {imported} chats...")
+        return imported
+
+
+def import_chats_dir(chats_dir: Path, db_path: Optional[Path] = None) -> int:
+    """Bulk-imports ``chats/*.json`` and ``chats/*.jsonl`` into the archive."""
+    archive = SqliteStorage(chats_dir, db_path)
+    try:
+        return archive.import_chats(JsonlStorage(chats_dir))
+    finally:
+        archive.close()
@@ -0,0 +1,47 @@
+import json
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+
+class ReverseSpool:
+    """Disk spool for batches that arrive newest-first.
+
+    Backfill scrolls upwards, so each batch is older than the previous one.
+    Batches are appended to a JSON Lines file and only their byte offsets
+    are kept in memory, which lets us replay them oldest-first without ever
+    holding the whole history.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, "w+b")
+        self._offsets: List[int] = []
+        self.message_count = 0
+
+    def append(self, batch: List[Dict[str, str]]):
+        self._offsets.append(self._file.tell())
+        line = json.dumps(batch, ensure_ascii=False).encode("utf-8")
+        self._file.write(line + b"\n")
+        self.message_count += len(batch)
+
+    def iter_batches(
+        self, newest_first: bool = False
+    ) -> Iterator[List[Dict[str, str]]]:
+        """Yields the spooled batches in chronological order.
+
+        With ``newest_first`` they come back in the order they were appended.
+        """
+        self._file.flush()
+        offsets = self._offsets if newest_first else reversed(self._offsets)
+        for offset in offsets:
+            self._file.seek(offset)
+            yield json.loads(self._file.readline())
+
+    def iter_messages(self) -> Iterator[Dict[str, str]]:
+        for batch in self.iter_batches():
+            yield from batch
+
+    def remove(self):
+        self._file.close()
+        self.path.unlink(missing_ok=True)
@@ -0,0 +1,37 @@
+"""Thin daemon client. Standard library only, so short jobs start fast."""
+
+import json
+import socket
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+
+def request(socket_path: Path, payload: Dict[str, Any], timeout: float = 10.0):
+    """Sends one request to the daemon and returns its response."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(str(socket_path))
+        sock.sendall(json.dumps(payload).encode() + b"\n")
+        with sock.makefile("rb") as f:
+            line = f.readline()
+    if not line:
+        raise ConnectionError("Daemon closed the connection")
+    return json.loads(line)
+
+
+def wait_for_job(
+    socket_path: Path, job_id: str, poll: float = 0.5, timeout: float = None
+) -> Dict[str, Any]:
+    """Polls a job until it is done or failed, and returns it."""
+    deadline = time.monotonic() + timeout if timeout else None
+    while True:
+        response = request(socket_path, {"op": "status", "id": job_id})
+        if not response["ok"]:
+            raise RuntimeError(response["error"])
+        job = response["job"]
+        if job["status"] in ("done", "failed"):
+            return job
+        if deadline and time.monotonic() > deadline:
+            raise TimeoutError(f"Job {job_id} still {job['status']}")
+        time.sleep(poll)
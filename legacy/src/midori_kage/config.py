@@ -0,0 +1,30 @@
+from pathlib import Path
+from typing import Dict
+
+import yaml
+
+SELECTORS_PATH = Path("config/selectors.yaml")
+
+
+def load_selectors(path: Path = SELECTORS_PATH) -> Dict[str, Dict[str, str]]:
+    if not path.exists():
+        raise FileNotFoundError(f"Config file not found at {path}")
+    with open(path, "r") as f:
+        return (yaml.safe_load(f) or {}).get("selectors", {})
+
+
+def build_selector(selectors: Dict[str, Dict[str, str]], key: str) -> str:
+    """Builds a CSS selector from the config."""
+    attrs = selectors.get(key)
+    if not attrs:
+        raise ValueError(f"Selector '{key}' not found in config")
+
+    parts = []
+    if "css" in attrs:
+        return attrs["css"]
+    if "role" in attrs:
+        parts.append(f'[role="{attrs["role"]}"]')
+    if "aria_label" in attrs:
+        parts.append(f'[aria-label="{attrs["aria_label"]}"]')
+
+    return "".join(parts)
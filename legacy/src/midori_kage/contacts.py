@@ -0,0 +1,163 @@
+import json
+import os
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from loguru import logger
+from pydantic import BaseModel
+
+# "+1 555 0100", "(555) 010-0100"... Names of unsaved contacts are numbers
+_PHONE_RE = re.compile(r"^\+?[\d\s().-]{7,}$")
+
+
+def guess_phone(text: str) -> str:
+    text = (text or "").strip()
+    return text if _PHONE_RE.match(text) and sum(c.isdigit() for c in text) >= 7 else ""
+
+
+class ContactRecord(BaseModel):
+    """One contact or group as listed in the New chat drawer."""
+
+    name: str
+    about: str = ""
+    phone: str = ""
+    is_group: bool = False
+    # Member names for groups, group names for contacts
+    members: List[str] = []
+    groups: List[str] = []
+
+    @classmethod
+    def from_row(cls, row: Dict) -> "ContactRecord":
+        name = row.get("name") or row.get("key") or ""
+        about = (row.get("about") or "").strip()
+        if row.get("is_group"):
+            members = [m.strip() for m in about.split(",") if m.strip()]
+            return cls(name=name, is_group=True, members=members)
+        return cls(name=name, about=about, phone=guess_phone(name))
+
+
+class ContactSink:
+    """Streams harvested contacts to ``contacts.jsonl`` as they are found.
+
+    Each batch is appended and flushed, so an interrupted sweep keeps what
+    it saw. ``finalize`` then adds each contact's groups in one pass.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.count = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, "w", encoding="utf-8")
+
+    def write(self, records: List[ContactRecord]):
+        for record in records:
+            self._file.write(record.model_dump_json() + "\n")
+        self._file.flush()
+        self.count += len(records)
+
+    def finalize(self):
+        self._file.close()
+        memberships: Dict[str, List[str]] = {}
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                for member in record["members"]:
+                    memberships.setdefault(member, []).append(record["name"])
+        if not memberships:
+            return
+
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(self.path, "r", encoding="utf-8") as src:
+            with open(tmp_path, "w", encoding="utf-8") as dst:
+                for line in src:
+                    record = json.loads(line)
+                    if not record["is_group"]:
+                        record["groups"] = memberships.get(record["name"], [])
+                    dst.write(json.dumps(record, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.path)
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+class CachedContactInfo(BaseModel):
+    info: Dict[str, str]
+    fetched_at: str  # ISO timestamp, UTC
+
+
+class ContactInfoCache:
+    """Contact drawer details per chat, reused until they are ``ttl`` old.
+
+    Keyed by the chat row's title, which stays the same across runs. A
+    ``ttl`` of zero disables reuse; entries are still refreshed on disk.
+    Saved every ``checkpoint_every`` updates or ``checkpoint_interval``
+    seconds and at the end of a run; losing the rest only costs drawer opens.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        ttl: timedelta = timedelta(days=7),
+        checkpoint_every: int = 10,
+        checkpoint_interval: float = 30.0,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_interval = checkpoint_interval
+        self._dirty = 0
+        self._last_checkpoint = time.monotonic()
+        self.entries: Dict[str, CachedContactInfo] = {}
+        self.hits = 0
+        self.misses = 0
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.entries = {k: CachedContactInfo(**e) for k, e in data.items()}
+
+    def get(self, key: str, now: Optional[datetime] = None) -> Optional[Dict]:
+        """Returns the cached info, or None when missing or stale."""
+        entry = self.entries.get(key)
+        now = now or datetime.now(timezone.utc)
+        if entry and now - datetime.fromisoformat(entry.fetched_at) < self.ttl:
+            self.hits += 1
+            return dict(entry.info)
+        self.misses += 1
+        return None
+
+    def set(self, key: str, info: Dict[str, str], now: Optional[datetime] = None):
+        now = now or datetime.now(timezone.utc)
+        self.entries[key] = CachedContactInfo(
+            info=info, fetched_at=now.isoformat(timespec="seconds")
+        )
+        self._dirty += 1
+        if (
+            self._dirty >= self.checkpoint_every
+            or time.monotonic() - self._last_checkpoint >= self.checkpoint_interval
+        ):
+            self.checkpoint()
+
+    def checkpoint(self):
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {k: e.model_dump() for k, e in self.entries.items()},
+                f,
+                ensure_ascii=False,
+            )
+        os.replace(tmp_path, self.path)
+        self._dirty = 0
+        self._last_checkpoint = time.monotonic()
+
+    def log_summary(self):
+        if self.hits or self.misses:
+            logger.info(
+                f"Contact info cache: {self.hits} hits, {self.misses} drawer opens."
+            )
@@ -0,0 +1,169 @@
+import asyncio
+import itertools
+import json
+import signal
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from loguru import logger
+from pydantic import BaseModel
+
+JOB_KINDS = ("scrape_chats", "scrape_chat", "export")
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class Job(BaseModel):
+    id: str
+    kind: str
+    params: Dict[str, Any] = {}
+    status: str = "queued"  # queued | running | done | failed
+    submitted_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    result: Any = None
+    error: Optional[str] = None
+
+
+class MidoriDaemon:
+    """Keeps one logged-in MidoriKage warm and runs jobs sent over a socket.
+
+    Clients send one JSON request per line on a Unix socket and get one
+    JSON response line back (see ``midori_kage.client``). Jobs share the
+    single browser session, so they run one at a time in submission order.
+    """
+
+    def __init__(self, scraper, socket_path: Path, keep_jobs: int = 100):
+        self.scraper = scraper
+        self.socket_path = Path(socket_path)
+        self.keep_jobs = keep_jobs
+        self.jobs: Dict[str, Job] = {}
+        self._ids = itertools.count(1)
+        self._queue: Optional[asyncio.Queue] = None
+        self._stopping: Optional[asyncio.Event] = None
+
+    async def serve(self):
+        self._queue = asyncio.Queue()
+        self._stopping = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self._stopping.set)
+
+        await self.scraper.start()
+        if self.socket_path.exists():
+            # Left over from a daemon that didn't shut down cleanly
+            self.socket_path.unlink()
+        server = await asyncio.start_unix_server(
+            self._handle_client, path=str(self.socket_path)
+        )
+        worker = asyncio.create_task(self._worker())
+        logger.info(f"Daemon ready, listening on {self.socket_path}")
+        try:
+            await self._stopping.wait()
+        finally:
+            logger.info("Daemon stopping...")
+            server.close()
+            await server.wait_closed()
+            # Let the running job finish; queued ones are dropped
+            await self._queue.put(None)
+            await worker
+            self.socket_path.unlink(missing_ok=True)
+            await self.scraper.close()
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            if job is None or self._stopping.is_set():
+                return
+            job.status = "running"
+            job.started_at = _now()
+            logger.info(f"Job {job.id}: {job.kind} {job.params}")
+            try:
+                job.result = await self._run(job)
+                job.status = "done"
+            except Exception as e:
+                logger.exception(f"Job {job.id} failed: {e}")
+                job.status = "failed"
+                job.error = str(e)
+            job.finished_at = _now()
+
+    async def _run(self, job: Job):
+        params = job.params
+        if job.kind == "scrape_chats":
+            saved = []
+            self.scraper.on_progress = self._collect(saved)
+            try:
+                await self.scraper.scrape_chats(limit=params.get("limit", 10))
+            finally:
+                self.scraper.on_progress = None
+            return {"saved": saved}
+        if job.kind == "scrape_chat":
+            return {"saved": await self.scraper.scrape_chat(params["name"])}
+
+        from midori_kage.export import export_chats
+
+        rows = await asyncio.to_thread(
+            export_chats,
+            self.scraper.storage,
+            Path(params["out"]),
+            params.get("format", "parquet"),
+            self.scraper.locale,
+        )
+        return {"rows": rows}
+
+    @staticmethod
+    def _collect(saved):
+        def on_progress(event: str, data: Dict):
+            if event == "chat_saved":
+                saved.append(data["chat"])
+
+        return on_progress
+
+    def submit(self, kind: str, params: Dict[str, Any]) -> Job:
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind '{kind}'")
+        job = Job(
+            id=str(next(self._ids)), kind=kind, params=params, submitted_at=_now()
+        )
+        self.jobs[job.id] = job
+        # Forget the oldest finished jobs
+        finished = [j.id for j in self.jobs.values() if j.finished_at]
+        for job_id in finished[: max(0, len(self.jobs) - self.keep_jobs)]:
+            del self.jobs[job_id]
+        self._queue.put_nowait(job)
+        return job
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        op = request.get("op")
+        if op == "submit":
+            job = self.submit(request.get("kind"), request.get("params") or {})
+            return {"ok": True, "job": job.model_dump()}
+        if op == "status":
+            job = self.jobs.get(str(request.get("id")))
+            if job is None:
+                return {"ok": False, "error": f"No job {request.get('id')}"}
+            return {"ok": True, "job": job.model_dump()}
+        if op == "list":
+            return {"ok": True, "jobs": [j.model_dump() for j in self.jobs.values()]}
+        if op == "shutdown":
+            self._stopping.set()
+            return {"ok": True}
+        return {"ok": False, "error": f"Unknown op '{op}'"}
+
+    async def _handle_client(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    response = self.handle(json.loads(line))
+                except Exception as e:
+                    response = {"ok": False, "error": str(e)}
+                writer.write(json.dumps(response, ensure_ascii=False).encode() + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
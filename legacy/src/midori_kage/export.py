@@ -0,0 +1,112 @@
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+from loguru import logger
+
+from midori_kage.parsing import InfoParser
+from midori_kage.storage import ChatStorage
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+except ImportError:  # Only needed for exports: pip install pyarrow
+    pa = None
+
+EXPORT_FORMATS = {"parquet": "parquet", "arrow": "ipc"}
+
+
+def export_schema():
+    text_dict = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema(
+        [
+            ("chat", text_dict),
+            ("seq", pa.int32()),
+            ("sent_at", pa.timestamp("s")),
+            ("sender", text_dict),
+            ("direction", pa.dictionary(pa.int8(), pa.string())),
+            ("text", pa.string()),
+            ("media", pa.list_(pa.string())),
+            ("year", pa.int16()),
+        ]
+    )
+
+
+def _batch(chat: str, start: int, messages: List[Dict], schema) -> "pa.RecordBatch":
+    sent_at = [
+        datetime.fromisoformat(m["timestamp"]) if m.get("timestamp") else None
+        for m in messages
+    ]
+    columns = {
+        "chat": [chat] * len(messages),
+        "seq": list(range(start, start + len(messages))),
+        "sent_at": sent_at,
+        "sender": [m.get("sender") for m in messages],
+        "direction": [m.get("direction") for m in messages],
+        "text": [m.get("text", "") for m in messages],
+        "media": [
+            (
+                [ref["sha256"] for ref in m["media"] if isinstance(ref, dict)]
+                if m.get("media")
+                else None
+            )
+            for m in messages
+        ],
+        "year": [t.year if t else None for t in sent_at],
+    }
+    return pa.RecordBatch.from_arrays(
+        [pa.array(columns[f.name], type=f.type) for f in schema], schema=schema
+    )
+
+
+def iter_record_batches(
+    storage: ChatStorage, locale: str = "en-US", batch_size: int = 50000
+) -> Iterator["pa.RecordBatch"]:
+    """Streams every stored chat as record batches, one chat at a time."""
+    schema = export_schema()
+    parser = InfoParser(locale)
+    for chat in storage.chat_names():
+        data = storage.load_chat(chat)
+        if not data:
+            continue
+        messages = data.get("messages", [])
+        for start in range(0, len(messages), batch_size):
+            chunk = [dict(m) for m in messages[start : start + batch_size]]
+            # Chats scraped without --parse-info are parsed here
+            if any("timestamp" not in m for m in chunk):
+                parser.parse_batch(chunk)
+            yield _batch(chat, start, chunk, schema)
+
+
+def export_chats(
+    storage: ChatStorage,
+    out_dir: Path,
+    fmt: str = "parquet",
+    locale: str = "en-US",
+) -> int:
+    """Writes the archive as a dataset partitioned by year. Returns rows."""
+    if pa is None:
+        raise RuntimeError("Exporting needs pyarrow: pip install pyarrow")
+
+    rows = 0
+
+    def counted():
+        nonlocal rows
+        for batch in iter_record_batches(storage, locale):
+            rows += batch.num_rows
+            yield batch
+
+    extension = "parquet" if fmt == "parquet" else "arrow"
+    ds.write_dataset(
+        counted(),
+        out_dir,
+        schema=export_schema(),
+        format=EXPORT_FORMATS[fmt],
+        partitioning=ds.partitioning(pa.schema([("year", pa.int16())]), flavor="hive"),
+        basename_template=f"part-{{i}}.{extension}",
+        existing_data_behavior="delete_matching",
+        max_rows_per_file=1_000_000,
+        max_rows_per_group=128_000,
+    )
+    logger.info(f"Exported {rows} messages to {out_dir} ({fmt}).")
+    return rows
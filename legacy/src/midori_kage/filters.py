@@ -0,0 +1,149 @@
+import fnmatch
+import re
+from datetime import date, timedelta
+from typing import Callable, Iterable, List, Optional
+
+from pydantic import BaseModel
+
+from midori_kage.parsing import InfoParser
+
+_WEEKDAYS = [
+    "monday",
+    "tuesday",
+    "wednesday",
+    "thursday",
+    "friday",
+    "saturday",
+    "sunday",
+]
+_TIME_RE = re.compile(r"^\d{1,2}[:.]\d{2}")
+
+
+class FilterRule(BaseModel):
+    """Conditions on a chat-list row; a rule matches when all its set fields do.
+
+    ``name`` is a shell-style glob and ``regex`` a regular expression, both
+    matched against the chat name. Unset fields are ignored.
+    """
+
+    name: Optional[str] = None
+    regex: Optional[str] = None
+    group: Optional[bool] = None
+    pinned: Optional[bool] = None
+    muted: Optional[bool] = None
+    unread: Optional[bool] = None
+    last_activity_before: Optional[date] = None
+    last_activity_after: Optional[date] = None
+
+    def describe(self) -> str:
+        fields = self.model_dump(exclude_none=True)
+        return ", ".join(f"{k}={v}" for k, v in fields.items())
+
+    @property
+    def uses_activity(self) -> bool:
+        return bool(self.last_activity_before or self.last_activity_after)
+
+
+class FilterConfig(BaseModel):
+    # Chats matching any skip rule are skipped; with only rules, chats must
+    # also match one of them.
+    skip: List[FilterRule] = []
+    only: List[FilterRule] = []
+
+
+# Without a filters section, groups are skipped as they always were
+DEFAULT_FILTERS = FilterConfig(skip=[FilterRule(group=True)])
+
+
+def parse_last_activity(
+    text: str, today: date, parser: Optional[InfoParser] = None
+) -> Optional[date]:
+    """Turns a chat-list timestamp ("10:32 AM", "Yesterday", "Tuesday",
+    "1/31/2024") into a date, or None if it can't be read."""
+    text = (text or "").strip()
+    if not text:
+        return None
+    lowered = text.lower()
+    if _TIME_RE.match(text) or lowered == "today":
+        return today
+    if lowered == "yesterday":
+        return today - timedelta(days=1)
+    if lowered in _WEEKDAYS:
+        # The list names weekdays for the past week only
+        days_ago = (today.weekday() - _WEEKDAYS.index(lowered)) % 7 or 7
+        return today - timedelta(days=days_ago)
+    return (parser or InfoParser()).parse_date(text)
+
+
+class ChatFilter:
+    """Compiles filter rules once into predicates over ChatRow snapshots.
+
+    ``ignored`` are the exact names of the legacy ``ignored_chats`` list.
+    """
+
+    def __init__(
+        self,
+        config: FilterConfig = DEFAULT_FILTERS,
+        ignored: Iterable[str] = (),
+        locale: str = "en-US",
+    ):
+        self.config = config
+        self.ignored = set(ignored)
+        self.parser = InfoParser(locale)
+        self._skip = [(rule, self._compile(rule)) for rule in config.skip]
+        self._only = [self._compile(rule) for rule in config.only]
+        self._uses_activity = any(
+            rule.uses_activity for rule in config.skip + config.only
+        )
+
+    @property
+    def excludes_groups(self) -> bool:
+        """Whether every group is skipped. Rows only show a group icon for
+        groups without a photo, so the scraper re-checks after opening."""
+        skipped = any(
+            rule.model_dump(exclude_none=True) == {"group": True}
+            for rule in self.config.skip
+        )
+        only_direct = bool(self.config.only) and all(
+            rule.group is False for rule in self.config.only
+        )
+        return skipped or only_direct
+
+    def _compile(self, rule: FilterRule) -> List[Callable]:
+        checks = []
+        if rule.name is not None:
+            pattern = re.compile(fnmatch.translate(rule.name))
+            checks.append(lambda row, day: bool(pattern.match(row.name)))
+        if rule.regex is not None:
+            regex = re.compile(rule.regex)
+            checks.append(lambda row, day: bool(regex.search(row.name)))
+        for flag in ("group", "pinned", "muted", "unread"):
+            expected = getattr(rule, flag)
+            if expected is not None:
+                checks.append(lambda row, day, f=flag, e=expected: getattr(row, f) == e)
+        # Rows whose timestamp can't be read never match activity rules
+        if rule.last_activity_before is not None:
+            before = rule.last_activity_before
+            checks.append(lambda row, day: day is not None and day < before)
+        if rule.last_activity_after is not None:
+            after = rule.last_activity_after
+            checks.append(lambda row, day: day is not None and day > after)
+        return checks
+
+    def skip_reason(self, row, today: Optional[date] = None) -> Optional[str]:
+        """Returns why a row should be skipped, or None to open it."""
+        if row.name in self.ignored:
+            return "ignored"
+        day = None
+        if self._uses_activity:
+            day = parse_last_activity(
+                row.last_activity, today or date.today(), self.parser
+            )
+        for rule, checks in self._skip:
+            if all(check(row, day) for check in checks):
+                return f"filtered ({rule.describe()})"
+        if self._only and not any(
+            all(check(row, day) for check in checks) for checks in self._only
+        ):
+            return "filtered (no 'only' rule matched)"
+        return None
@@ -0,0 +1,97 @@
+from typing import Dict, Optional
+
+from loguru import logger
+
+try:
+    import psutil
+except ImportError:  # RSS sampling is optional
+    psutil = None
+
+
+class MemoryGovernor:
+    """Decides when the browser has grown enough to be recycled.
+
+    The renderer's JS heap is read through CDP ``Performance.getMetrics``
+    and, when psutil is installed, the RSS of every browser process is
+    summed. Over ``max_heap_mb`` the page is recycled; over ``max_rss_mb``,
+    or if the heap is still too large right after a page recycle, the whole
+    persistent context is restarted.
+    """
+
+    def __init__(
+        self,
+        max_heap_mb: Optional[float] = None,
+        max_rss_mb: Optional[float] = None,
+        check_every: int = 1,
+    ):
+        self.max_heap_mb = max_heap_mb
+        self.max_rss_mb = max_rss_mb
+        self.check_every = check_every
+        self.recycles = {"page": 0, "context": 0}
+        self.last_sample: Dict[str, Optional[float]] = {}
+        self._chats = 0
+        self._cdp = None
+        self._cdp_page = None
+        self._just_recycled_page = False
+        if max_rss_mb and psutil is None:
+            logger.warning("psutil is not installed; --max-rss-mb is ignored.")
+
+    async def _heap_mb(self, page) -> Optional[float]:
+        try:
+            # One CDP session per page, reopened after a recycle
+            if self._cdp_page is not page:
+                self._cdp = await page.context.new_cdp_session(page)
+                await self._cdp.send("Performance.enable")
+                self._cdp_page = page
+            result = await self._cdp.send("Performance.getMetrics")
+        except Exception as e:
+            logger.debug(f"Could not read renderer metrics: {e}")
+            self._cdp_page = None
+            return None
+        metrics = {m["name"]: m["value"] for m in result.get("metrics", [])}
+        used = metrics.get("JSHeapUsedSize")
+        return used / (1024 * 1024) if used is not None else None
+
+    def _rss_mb(self) -> Optional[float]:
+        if psutil is None:
+            return None
+        # The browser runs under the Playwright driver, a child of ours
+        total = 0
+        for child in psutil.Process().children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                continue
+        return total / (1024 * 1024)
+
+    async def sample(self, page) -> Dict[str, Optional[float]]:
+        self.last_sample = {"heap_mb": await self._heap_mb(page), "rss_mb": None}
+        if self.max_rss_mb:
+            self.last_sample["rss_mb"] = self._rss_mb()
+        return self.last_sample
+
+    async def check(self, page) -> Optional[str]:
+        """Called between chats; returns "page", "context" or None."""
+        self._chats += 1
+        if self._chats % self.check_every:
+            return None
+
+        sample = await self.sample(page)
+        heap, rss = sample["heap_mb"], sample["rss_mb"]
+        logger.debug(f"Browser memory: heap {heap} MB, rss {rss} MB")
+
+        action = None
+        if self.max_rss_mb and rss is not None and rss > self.max_rss_mb:
+            action = "context"
+        elif self.max_heap_mb and heap is not None and heap > self.max_heap_mb:
+            # A fresh page didn't bring the heap down, restart everything
+            action = "context" if self._just_recycled_page else "page"
+
+        self._just_recycled_page = action == "page"
+        if action:
+            self.recycles[action] += 1
+            logger.info(
+                f"Browser memory over limit (heap {heap} MB, rss {rss} MB); "
+                f"recycling the {action}."
+            )
+        return action
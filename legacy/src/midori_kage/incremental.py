@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import AbstractSet, Dict, List, Optional
+
+from loguru import logger
+from pydantic import BaseModel
+
+
+class HighWaterMark(BaseModel):
+    """The newest message we have already stored for a chat."""
+
+    info: str
+    hash: str
+
+
+# How many of a chat's last stored messages ``overlap_end`` falls back to
+STORED_TAIL = 50
+
+
+def message_hash(message: Dict[str, str]) -> str:
+    """Content hash of a message, stable across runs.
+
+    Media-only messages have neither info nor text, so they are told apart
+    by their ``id`` (WhatsApp's data-id) or else by their media.
+    """
+    info, text = message.get("info", ""), message.get("text", "")
+    payload = f"{info}\n{text}"
+    if not (info or text):
+        media = [
+            ref["sha256"] if isinstance(ref, dict) else ref
+            for ref in message.get("media") or []
+        ]
+        payload += "\n" + json.dumps(message.get("id") or media)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def mark_for(messages: List[Dict[str, str]]) -> Optional[HighWaterMark]:
+    """Builds the high-water mark for the last message of a chat, if any."""
+    if not messages:
+        return None
+    last = messages[-1]
+    return HighWaterMark(info=last.get("info", ""), hash=message_hash(last))
+
+
+def overlap_end(
+    messages: List[Dict[str, str]],
+    mark: HighWaterMark,
+    known: AbstractSet[str] = frozenset(),
+) -> Optional[int]:
+    """Returns the index just past the newest already-stored message.
+
+    That is the mark or, when the marked message was deleted or edited
+    since, the newest message whose hash is in ``known``, the hashes of the
+    chat's last stored messages. None when nothing rendered is stored.
+    """
+    for i in range(len(messages) - 1, -1, -1):
+        msg = messages[i]
+        if msg.get("info", "") == mark.info and message_hash(msg) == mark.hash:
+            return i + 1
+    for i in range(len(messages) - 1, -1, -1):
+        if message_hash(messages[i]) in known:
+            return i + 1
+    return None
+
+
+def messages_after(
+    messages: List[Dict[str, str]],
+    mark: Optional[HighWaterMark],
+    known: AbstractSet[str] = frozenset(),
+) -> List[Dict[str, str]]:
+    """Returns the messages newer than the mark.
+
+    Scans from the newest message backwards, so the cost is proportional to
+    the number of new messages. See ``overlap_end`` for ``known``. If no
+    stored message is among the rendered ones every message is new.
+    """
+    if mark is None:
+        return messages
+
+    end = overlap_end(messages, mark, known)
+    if end is None:
+        logger.warning(
+            "High-water mark not found among rendered messages; "
+            "older new messages may be missing."
+        )
+        return messages
+    return messages[end:]
+
+
+class MarkStore:
+    """Per-chat high-water marks, loaded once and checkpointed atomically
+    every ``checkpoint_every`` updates or ``checkpoint_interval`` seconds.
+
+    A mark that lags storage would re-append the messages after it, so a
+    ``.dirty`` sentinel marks unsaved updates. Loading with the sentinel
+    present, e.g. after a crash, distrusts every mark until it is set again
+    and callers fall back to the stored messages.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        checkpoint_every: int = 10,
+        checkpoint_interval: float = 30.0,
+    ):
+        self.path = path
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_interval = checkpoint_interval
+        self._lock = threading.Lock()
+        self._sentinel = path.with_name(path.name + ".dirty")
+        self._dirty = 0
+        self._last_checkpoint = time.monotonic()
+        self.marks: Dict[str, HighWaterMark] = {}
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.marks = {name: HighWaterMark(**m) for name, m in data.items()}
+        self._unverified = set(self.marks) if self._sentinel.exists() else set()
+
+    def get(self, chat_name: str) -> Optional[HighWaterMark]:
+        if chat_name in self._unverified:
+            return None
+        return self.marks.get(chat_name)
+
+    def set(self, chat_name: str, mark: HighWaterMark):
+        with self._lock:
+            if not self._dirty:
+                self._sentinel.parent.mkdir(parents=True, exist_ok=True)
+                self._sentinel.touch()
+            self.marks[chat_name] = mark
+            self._unverified.discard(chat_name)
+            self._dirty += 1
+            if (
+                self._dirty >= self.checkpoint_every
+                or time.monotonic() - self._last_checkpoint >= self.checkpoint_interval
+            ):
+                self._save()
+
+    def checkpoint(self):
+        """Saves pending updates, e.g. at the end of a run."""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def _save(self):
+        # Callers hold self._lock, marks are set from several writer threads
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {name: m.model_dump() for name, m in self.marks.items()},
+                f,
+                ensure_ascii=False,
+            )
+        os.replace(tmp_path, self.path)
+        self._dirty = 0
+        self._last_checkpoint = time.monotonic()
+        if not self._unverified:
+            self._sentinel.unlink(missing_ok=True)
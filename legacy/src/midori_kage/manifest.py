@@ -0,0 +1,170 @@
+import json
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from loguru import logger
+from pydantic import BaseModel
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class ChatEntry(BaseModel):
+    """What we know about one chat across runs."""
+
+    status: str  # done | failed | skipped | missing
+    run_id: Optional[str] = None
+    last_scraped: Optional[str] = None
+    message_count: int = 0
+    output: Optional[str] = None
+    detail: Optional[str] = None  # skip reason or error
+
+
+class RunState(BaseModel):
+    run_id: str
+    started_at: str
+    updated_at: str
+    limit: Optional[float] = None
+    completed: bool = False
+
+
+class RunManifest:
+    """On-disk index of every chat, kept in memory for O(1) lookups.
+
+    Loaded once, reconciled with a single listing of the storage backend,
+    and checkpointed atomically every ``checkpoint_every`` updates or
+    ``checkpoint_interval`` seconds, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        checkpoint_every: int = 10,
+        checkpoint_interval: float = 30.0,
+    ):
+        self.path = path
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_interval = checkpoint_interval
+        self.chats: Dict[str, ChatEntry] = {}
+        self.run: Optional[RunState] = None
+        self._dirty = 0
+        self._last_checkpoint = time.monotonic()
+
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.chats = {
+                name: ChatEntry(**entry) for name, entry in data["chats"].items()
+            }
+            if data.get("run"):
+                self.run = RunState(**data["run"])
+
+    def reconcile(self, chat_names: List[str], location) -> int:
+        """Syncs the manifest with one listing of the storage backend.
+
+        Adds chats found in storage but missing from the manifest, and marks
+        done chats that are no longer in storage (deleted, or saved with
+        another backend) as missing, so they are scraped again.
+        Returns the number of chats added.
+        """
+        stored = set(chat_names)
+        added = 0
+        for name in stored:
+            if name not in self.chats:
+                self.chats[name] = ChatEntry(status="done", output=location(name))
+                added += 1
+        removed = 0
+        for name, entry in self.chats.items():
+            if entry.status == "done" and name not in stored:
+                self.chats[name] = entry.model_copy(
+                    update={"status": "missing", "run_id": None, "detail": None}
+                )
+                removed += 1
+        if added:
+            logger.info(f"Manifest: indexed {added} chats found in storage.")
+        if removed:
+            logger.info(f"Manifest: {removed} chats are no longer in storage.")
+        if added or removed:
+            self.checkpoint()
+        return added
+
+    def begin_run(self, limit: float, resume: bool = False) -> Tuple[Set[str], int]:
+        """Starts or resumes a run. Returns (visited chat names, processed count)."""
+        if resume and self.run is not None and not self.run.completed:
+            run_id = self.run.run_id
+            visited = {n for n, e in self.chats.items() if e.run_id == run_id}
+            processed = sum(
+                1
+                for e in self.chats.values()
+                if e.run_id == run_id and e.status == "done"
+            )
+            logger.info(
+                f"Resuming run {run_id}: {len(visited)} chats already visited, "
+                f"{processed} scraped."
+            )
+            return visited, processed
+
+        if resume:
+            logger.info("No interrupted run to resume; starting a new one.")
+        started = _now()
+        self.run = RunState(
+            run_id=started,
+            started_at=started,
+            updated_at=started,
+            limit=None if limit == float("inf") else limit,
+        )
+        self.checkpoint()
+        return set(), 0
+
+    def end_run(self):
+        if self.run is not None:
+            self.run.completed = True
+        self.checkpoint()
+
+    def is_done(self, chat_name: str) -> bool:
+        entry = self.chats.get(chat_name)
+        return entry is not None and entry.status == "done"
+
+    def record(self, chat_name: str, status: str, **fields):
+        entry = self.chats.get(chat_name)
+        previous = entry.model_dump() if entry else {}
+        self.chats[chat_name] = ChatEntry(
+            **{
+                **previous,
+                "status": status,
+                "run_id": self.run.run_id if self.run else None,
+                "last_scraped": _now(),
+                "detail": None,
+                **fields,
+            }
+        )
+        self._dirty += 1
+        if (
+            self._dirty >= self.checkpoint_every
+            or time.monotonic() - self._last_checkpoint >= self.checkpoint_interval
+        ):
+            self.checkpoint()
+
+    def checkpoint(self):
+        if self.run is not None:
+            self.run.updated_at = _now()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "run": self.run.model_dump() if self.run else None,
+                    "chats": {n: e.model_dump() for n, e in self.chats.items()},
+                },
+                f,
+                ensure_ascii=False,
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._dirty = 0
+        self._last_checkpoint = time.monotonic()
@@ -0,0 +1,114 @@
+import asyncio
+import hashlib
+import mimetypes
+import os
+import threading
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+
+class MediaStore:
+    """Content-addressed media files: ``<root>/<sha[:2]>/<sha><ext>``.
+
+    Identical bytes hash to the same name, so media forwarded across chats
+    is stored once.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    def path_for(self, digest: str, mime: str = "") -> Path:
+        ext = mimetypes.guess_extension(mime.split(";")[0].strip()) if mime else None
+        return self.root / digest[:2] / f"{digest}{ext or ''}"
+
+    def put(self, data: bytes, mime: str = "") -> Tuple[str, bool]:
+        """Stores data if new. Returns (sha256, whether it was written)."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path_for(digest, mime)
+        if path.exists():
+            return digest, False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Writer threads may store the same bytes at once
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return digest, True
+
+
+class MediaDownloader:
+    """Downloads media URLs through a fixed pool of asyncio workers.
+
+    ``submit`` only queues the URL and returns a future, so the browser
+    stage never waits on a download; the pipeline's normalize stage awaits
+    the futures to put hashes into the message records. ``fetch`` returns
+    ``(bytes, mime)``, or None when the media is gone.
+    """
+
+    def __init__(
+        self,
+        store: MediaStore,
+        fetch: Callable[[str], Awaitable[Optional[Tuple[bytes, str]]]],
+        workers: int = 4,
+    ):
+        self.store = store
+        self.fetch = fetch
+        self.workers = workers
+        self.stats = {"downloaded": 0, "duplicates": 0, "failed": 0, "bytes": 0}
+        self._futures: Dict[str, asyncio.Future] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def submit(self, url: str) -> asyncio.Future:
+        """Queues a URL once; later submits share the first future."""
+        future = self._futures.get(url)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._futures[url] = future
+            self._queue.put_nowait(url)
+        return future
+
+    async def resolve(self, urls: List[str]) -> List[Dict]:
+        """Waits for the given URLs and returns their media references."""
+        results = await asyncio.gather(*(self.submit(url) for url in urls))
+        return [r for r in results if r is not None]
+
+    async def _worker(self):
+        while True:
+            url = await self._queue.get()
+            future = self._futures[url]
+            try:
+                fetched = await self.fetch(url)
+                if fetched is None:
+                    raise ValueError("media no longer available")
+                data, mime = fetched
+                digest, written = await asyncio.to_thread(self.store.put, data, mime)
+                self.stats["downloaded" if written else "duplicates"] += 1
+                self.stats["bytes"] += len(data) if written else 0
+                future.set_result({"sha256": digest, "mime": mime, "size": len(data)})
+            except Exception as e:
+                self.stats["failed"] += 1
+                logger.warning(f"Failed to download media {url[:80]}: {e}")
+                future.set_result(None)
+            finally:
+                self._queue.task_done()
+
+    async def close(self):
+        """Waits for queued downloads, then stops the workers."""
+        if self._queue is not None:
+            await self._queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info(
+            f"Media: {self.stats['downloaded']} files "
+            f"({self.stats['bytes'] / 1e6:.1f} MB) saved, "
+            f"{self.stats['duplicates']} duplicates, {self.stats['failed']} failed."
+        )
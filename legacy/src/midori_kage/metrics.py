@@ -0,0 +1,231 @@
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+
+# Upper bounds in seconds, from quick in-page evaluates to long backfills
+BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+# Spans on the browser stage are attributed to the chat being processed;
+# pipeline workers start before any chat, so their writes are not.
+_current_chat: contextvars.ContextVar = contextvars.ContextVar(
+    "midori_current_chat", default=None
+)
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def summary(self) -> Dict:
+        return {
+            "count": self.count,
+            "total": round(self.total, 4),
+            "avg": round(self.total / self.count, 4) if self.count else 0.0,
+            "max": round(self.max, 4),
+            "buckets": dict(zip([str(b) for b in BUCKETS] + ["+Inf"], self.counts)),
+        }
+
+
+class _ChatTiming:
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.monotonic()
+        self.phases: Dict[str, float] = {}
+
+
+class Metrics:
+    """Counts and latency histograms per scrape phase, exported to a file.
+
+    Phases are timed with ``with metrics.span("header"):``. The file is
+    Prometheus text format, or JSON when ``path`` ends in ``.json``, and is
+    rewritten every ``interval`` seconds during the run and by ``write()``.
+    A chat whose total time exceeds ``outlier_factor`` times the median of
+    the chats before it is flagged as an outlier.
+    """
+
+    enabled = True
+
+    def __init__(
+        self,
+        path: Path,
+        interval: float = 30.0,
+        outlier_factor: float = 3.0,
+        outlier_min_samples: int = 5,
+    ):
+        self.path = Path(path)
+        self.interval = interval
+        self.outlier_factor = outlier_factor
+        self.outlier_min_samples = outlier_min_samples
+        self.histograms: Dict[Tuple[str, str], Histogram] = {}
+        self.chats: List[Dict] = []
+        self._durations: List[float] = []
+        self._lock = threading.Lock()
+        self._last_write = time.monotonic()
+
+    @contextlib.contextmanager
+    def span(self, phase: str):
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(phase, time.monotonic() - started)
+
+    def observe(self, name: str, seconds: float, kind: str = "phase"):
+        chat = _current_chat.get()
+        with self._lock:
+            self.histograms.setdefault((kind, name), Histogram()).observe(seconds)
+            if chat is not None and kind == "phase":
+                chat.phases[name] = chat.phases.get(name, 0.0) + seconds
+        if time.monotonic() - self._last_write >= self.interval:
+            self.write()
+
+    def begin_chat(self, name: str):
+        _current_chat.set(_ChatTiming(name))
+
+    def end_chat(self, outcome: str):
+        chat = _current_chat.get()
+        if chat is None:
+            return
+        _current_chat.set(None)
+        duration = time.monotonic() - chat.started
+
+        # Median of earlier chats, so one slow chat can't hide the next
+        outlier = False
+        if len(self._durations) >= self.outlier_min_samples:
+            ordered = sorted(self._durations)
+            median = ordered[len(ordered) // 2]
+            outlier = duration > self.outlier_factor * median
+        self._durations.append(duration)
+
+        slowest = max(chat.phases, key=chat.phases.get) if chat.phases else None
+        record = {
+            "chat": chat.name,
+            "outcome": outcome,
+            "seconds": round(duration, 4),
+            "phases": {p: round(s, 4) for p, s in chat.phases.items()},
+            "outlier": outlier,
+        }
+        with self._lock:
+            self.chats.append(record)
+        if outlier:
+            logger.warning(
+                f"Chat '{chat.name}' took {duration:.1f}s, over "
+                f"{self.outlier_factor:g}x the median; slowest phase: {slowest}"
+            )
+
+    def summary(self) -> Dict:
+        with self._lock:
+            histograms = {}
+            for (kind, name), histogram in sorted(self.histograms.items()):
+                histograms.setdefault(kind, {})[name] = histogram.summary()
+            return {
+                **histograms,
+                "chats": list(self.chats),
+                "outliers": sum(1 for c in self.chats if c["outlier"]),
+            }
+
+    def to_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            kinds = sorted({kind for kind, _ in self.histograms})
+            for kind in kinds:
+                metric = f"midori_{kind}_seconds"
+                lines.append(f"# TYPE {metric} histogram")
+                for (k, name), histogram in sorted(self.histograms.items()):
+                    if k != kind:
+                        continue
+                    cumulative = 0
+                    bounds = [str(b) for b in BUCKETS] + ["+Inf"]
+                    for bound, count in zip(bounds, histogram.counts):
+                        cumulative += count
+                        lines.append(
+                            f'{metric}_bucket{{{kind}="{name}",le="{bound}"}} '
+                            f"{cumulative}"
+                        )
+                    lines.append(f'{metric}_sum{{{kind}="{name}"}} {histogram.total}')
+                    lines.append(f'{metric}_count{{{kind}="{name}"}} {histogram.count}')
+            outcomes: Dict[str, int] = {}
+            for chat in self.chats:
+                outcomes[chat["outcome"]] = outcomes.get(chat["outcome"], 0) + 1
+            outliers = sum(1 for c in self.chats if c["outlier"])
+
+        lines.append("# TYPE midori_chats_total counter")
+        for outcome, count in sorted(outcomes.items()):
+            lines.append(f'midori_chats_total{{outcome="{outcome}"}} {count}')
+        lines.append("# TYPE midori_outlier_chats_total counter")
+        lines.append(f"midori_outlier_chats_total {outliers}")
+        return "\n".join(lines) + "\n"
+
+    def write(self):
+        """Atomically rewrites the metrics file."""
+        self._last_write = time.monotonic()
+        if self.path.suffix == ".json":
+            content = json.dumps(self.summary(), indent=2)
+        else:
+            content = self.to_prometheus()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + f".{threading.get_ident()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, self.path)
+
+    def log_summary(self):
+        for (kind, name), histogram in sorted(self.histograms.items()):
+            if kind != "phase" or not histogram.count:
+                continue
+            logger.info(
+                f"Phase '{name}': {histogram.count} spans, "
+                f"total {histogram.total:.2f}s, "
+                f"avg {histogram.total / histogram.count:.3f}s, "
+                f"max {histogram.max:.3f}s"
+            )
+
+
+class NullMetrics:
+    """Stand-in used when metrics are off; every call is a no-op."""
+
+    enabled = False
+    _span = contextlib.nullcontext()
+
+    def span(self, phase: str):
+        return self._span
+
+    def observe(self, name: str, seconds: float, kind: str = "phase"):
+        pass
+
+    def begin_chat(self, name: str):
+        pass
+
+    def end_chat(self, outcome: str):
+        pass
+
+    def write(self):
+        pass
+
+    def log_summary(self):
+        pass
+
+
+def open_metrics(path: Optional[Path], interval: float = 30.0):
+    return Metrics(path, interval=interval) if path else NullMetrics()
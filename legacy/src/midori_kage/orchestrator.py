@@ -0,0 +1,217 @@
+import asyncio
+import multiprocessing
+import os
+import queue
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import yaml
+from loguru import logger
+from pydantic import BaseModel
+
+
+class AccountSpec(BaseModel):
+    """One linked account to archive, as listed in the orchestrator manifest."""
+
+    name: str
+    session_dir: str
+    output_dir: str
+    limit: int = -1
+    headless: bool = True
+    # Extra MidoriKage keyword arguments (incremental, storage, backfill...)
+    options: Dict[str, Any] = {}
+
+
+class OrchestratorManifest(BaseModel):
+    accounts: List[AccountSpec]
+    concurrency: Optional[int] = None
+    max_restarts: int = 2
+
+
+class AccountReport(BaseModel):
+    name: str
+    status: str = "pending"
+    saved: int = 0
+    skipped: int = 0
+    failed: int = 0
+    messages: int = 0
+    restarts: int = 0
+    exit_code: Optional[int] = None
+    duration: float = 0.0
+
+
+def load_manifest(path: Path) -> OrchestratorManifest:
+    with open(path, "r") as f:
+        manifest = OrchestratorManifest(**yaml.safe_load(f))
+
+    # A persistent browser profile can only be opened by one process
+    session_dirs = [Path(a.session_dir).resolve() for a in manifest.accounts]
+    if len(set(session_dirs)) != len(session_dirs):
+        raise ValueError("Each account needs its own session_dir")
+    return manifest
+
+
+def _run_account(
+    spec: Dict[str, Any], events: multiprocessing.Queue, resume: bool = False
+):
+    """Worker process entry point: scrapes one account end to end.
+
+    Restarted workers resume the crashed run from its manifest.
+    """
+    from midori_kage.scraper import MidoriKage
+
+    spec = AccountSpec(**spec)
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    def report(event: str, data: Dict):
+        events.put((spec.name, event, data))
+
+    async def run():
+        scraper = MidoriKage(
+            headless=spec.headless,
+            session_dir=spec.session_dir,
+            chats_dir=spec.output_dir,
+            log_file=f"logs/{spec.name}.log",
+            **{**spec.options, "resume": resume or spec.options.get("resume", False)},
+        )
+        scraper.on_progress = report
+        try:
+            await scraper.start()
+            await scraper.scrape_chats(limit=spec.limit)
+        finally:
+            await scraper.close()
+
+    asyncio.run(run())
+
+
+class Orchestrator:
+    """Runs one MidoriKage per account, each in its own worker process.
+
+    At most ``concurrency`` workers run at once (defaults to the CPU count).
+    Workers that crash are restarted up to ``max_restarts`` times with
+    ``resume=True``, so a restart skips the chats the crashed run handled
+    (incremental ones included) and keeps counting towards ``limit``.
+    """
+
+    def __init__(self, manifest: OrchestratorManifest):
+        self.manifest = manifest
+        self.concurrency = manifest.concurrency or os.cpu_count() or 1
+        self.reports = {a.name: AccountReport(name=a.name) for a in manifest.accounts}
+        self._mp = multiprocessing.get_context("spawn")
+        self._events = self._mp.Queue()
+        self._running = True
+
+    async def run(self) -> List[AccountReport]:
+        logger.info(
+            f"Orchestrating {len(self.manifest.accounts)} accounts "
+            f"with concurrency {self.concurrency}."
+        )
+        semaphore = asyncio.Semaphore(self.concurrency)
+        pump = asyncio.create_task(self._pump_events())
+        try:
+            await asyncio.gather(
+                *(self._supervise(a, semaphore) for a in self.manifest.accounts)
+            )
+        finally:
+            self._running = False
+            await pump
+        self._drain_events()
+        self.log_summary()
+        return list(self.reports.values())
+
+    async def _supervise(self, account: AccountSpec, semaphore: asyncio.Semaphore):
+        report = self.reports[account.name]
+        async with semaphore:
+            started = time.monotonic()
+            while True:
+                report.status = "running"
+                process = self._mp.Process(
+                    target=_run_account,
+                    args=(account.model_dump(), self._events, report.restarts > 0),
+                    name=f"midori-{account.name}",
+                )
+                process.start()
+                try:
+                    await asyncio.to_thread(process.join)
+                finally:
+                    if process.is_alive():
+                        process.terminate()
+                        process.join()
+
+                report.exit_code = process.exitcode
+                if process.exitcode == 0:
+                    report.status = "done"
+                    break
+                if report.restarts >= self.manifest.max_restarts:
+                    report.status = "failed"
+                    logger.error(
+                        f"[{account.name}] Worker exited with {process.exitcode}; "
+                        "giving up."
+                    )
+                    break
+
+                report.restarts += 1
+                backoff = min(2**report.restarts, 60)
+                logger.warning(
+                    f"[{account.name}] Worker exited with {process.exitcode}; "
+                    f"restart {report.restarts}/{self.manifest.max_restarts} "
+                    f"in {backoff}s."
+                )
+                await asyncio.sleep(backoff)
+            report.duration = time.monotonic() - started
+
+    def _handle_event(self, name: str, event: str, data: Dict):
+        report = self.reports[name]
+        if event == "chat_saved":
+            report.saved += 1
+            report.messages += data.get("messages", 0)
+        elif event == "chat_skipped":
+            report.skipped += 1
+        elif event == "chat_failed":
+            report.failed += 1
+
+        totals = self.totals()
+        logger.info(
+            f"[{name}] {event} '{data.get('chat')}' | total: "
+            f"{totals['saved']} saved, {totals['skipped']} skipped, "
+            f"{totals['failed']} failed, {totals['messages']} messages"
+        )
+
+    async def _pump_events(self):
+        while self._running:
+            try:
+                event = await asyncio.to_thread(self._events.get, True, 0.5)
+            except queue.Empty:
+                continue
+            self._handle_event(*event)
+
+    def _drain_events(self):
+        while True:
+            try:
+                self._handle_event(*self._events.get_nowait())
+            except queue.Empty:
+                return
+
+    def totals(self) -> Dict[str, int]:
+        fields = ("saved", "skipped", "failed", "messages", "restarts")
+        return {
+            field: sum(getattr(r, field) for r in self.reports.values())
+            for field in fields
+        }
+
+    def log_summary(self):
+        logger.info("Orchestrator summary:")
+        for r in self.reports.values():
+            logger.info(
+                f"  {r.name}: {r.status} in {r.duration:.0f}s, {r.saved} saved, "
+                f"{r.skipped} skipped, {r.failed} failed, {r.messages} messages, "
+                f"{r.restarts} restarts"
+            )
+        totals = self.totals()
+        logger.info(
+            f"  total: {totals['saved']} chats, {totals['messages']} messages, "
+            f"{totals['restarts']} restarts"
+        )
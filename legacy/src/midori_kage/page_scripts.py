@@ -0,0 +1,188 @@
+"""In-page JavaScript snippets evaluated through ``page.evaluate``.
+
+Each snippet receives a single argument object built from the selectors in
+``config/selectors.yaml`` so the page side never hardcodes a selector.
+"""
+
+# Extracts every message bubble in one round-trip.
+#
+# Mirrors the per-locator path in ``MidoriKage._scrape_current_chat``:
+# a child selector matching more than one element would make Playwright's
+# strict-mode ``inner_text()``/``get_attribute()`` raise, and that bubble is
+# dropped, so we return ``null`` for it here as well. ``id`` is WhatsApp's
+# ``data-id`` for the message when rendered, used to dedupe while scrolling.
+# With a ``media`` selector each record also lists its media URLs, and
+# ``blob:`` ones start downloading into ``window.__midoriMedia`` right away,
+# before the chat is left and they may be revoked (see READ_MEDIA).
+EXTRACT_MESSAGES = """
+({bubble, text, info, media}) => {
+    const single = (root, sel) => {
+        const found = root.querySelectorAll(sel);
+        if (found.length > 1) throw new Error("strict");
+        return found.length ? found[0] : null;
+    };
+    if (media && !window.__midoriMedia) window.__midoriMedia = new Map();
+    const cache = window.__midoriMedia;
+    const mediaUrls = (el) => {
+        if (!media) return [];
+        const found = el.querySelectorAll(media);
+        const urls = Array.from(found, (m) => m.currentSrc || m.src);
+        for (const url of urls) {
+            if (url && url.startsWith("blob:") && !cache.has(url)) {
+                cache.set(url, fetch(url).then((r) => r.blob()).catch(() => null));
+            }
+        }
+        return urls.filter(Boolean);
+    };
+    return Array.from(document.querySelectorAll(bubble), (el) => {
+        try {
+            const textEl = single(el, text);
+            const infoEl = single(el, info);
+            const idEl = el.closest("[data-id]") || el.querySelector("[data-id]");
+            return {
+                id: idEl ? idEl.getAttribute("data-id") : null,
+                info: infoEl ? infoEl.getAttribute("data-pre-plain-text") || "" : "",
+                text: textEl ? textEl.innerText : "",
+                media: mediaUrls(el),
+            };
+        } catch (e) {
+            return null;
+        }
+    });
+}
+"""
+
+# Reads one media URL as base64, from the download EXTRACT_MESSAGES started
+# for ``blob:`` URLs, or by fetching it now. Returns ``{type, data}`` or
+# ``null`` when the media can't be read anymore.
+READ_MEDIA = """
+async (url) => {
+    const cache = window.__midoriMedia;
+    const pending = cache && cache.get(url);
+    if (cache) cache.delete(url);
+    const blob = await (pending || fetch(url).then((r) => r.blob()).catch(() => null));
+    if (!blob) return null;
+    const dataUrl = await new Promise((resolve, reject) => {
+        const reader = new FileReader();
+        reader.onload = () => resolve(reader.result);
+        reader.onerror = () => reject(reader.error);
+        reader.readAsDataURL(blob);
+    });
+    return {type: blob.type, data: dataUrl.slice(dataUrl.indexOf(",") + 1)};
+}
+"""
+
+# Snapshots every rendered chat-list row in one round-trip.
+#
+# ``key`` is the title attribute of the row's name element; it survives
+# re-renders of the virtualized list and is what we click by later.
+# Marker selectors are optional and may be ``null``.
+SNAPSHOT_CHAT_LIST = """
+({row, title, pinned, unread, muted, group, lastActivity}) => {
+    const has = (el, sel) => Boolean(sel && el.querySelector(sel));
+    return Array.from(document.querySelectorAll(row), (el, index) => {
+        const titleEl = el.querySelector(title);
+        const activityEl = lastActivity ? el.querySelector(lastActivity) : null;
+        return {
+            index,
+            key: titleEl ? titleEl.getAttribute("title") : null,
+            name: titleEl ? titleEl.innerText : null,
+            pinned: has(el, pinned),
+            unread: has(el, unread),
+            muted: has(el, muted),
+            group: has(el, group),
+            last_activity: activityEl ? activityEl.innerText.trim() : "",
+        };
+    });
+}
+"""
+
+# Snapshots every rendered row of the New chat drawer's contact list.
+#
+# ``key`` is the row's name title, stable across re-renders, used to dedupe
+# rows seen at several scroll positions. ``about`` is the second line, which
+# lists member names on group rows.
+SNAPSHOT_CONTACTS = """
+({list, row, name, about, group}) => {
+    const container = document.querySelector(list);
+    if (!container) return [];
+    return Array.from(container.querySelectorAll(row), (el) => {
+        const nameEl = el.querySelector(name);
+        const aboutEl = about ? el.querySelector(about) : null;
+        return {
+            key: nameEl ? nameEl.getAttribute("title") : null,
+            name: nameEl ? nameEl.innerText.trim() : "",
+            about: aboutEl ? aboutEl.getAttribute("title") || aboutEl.innerText : "",
+            is_group: Boolean(group && el.querySelector(group)),
+        };
+    });
+}
+"""
+
+# Resolves once the chat header mentions the clicked chat's name.
+# Used with ``page.wait_for_function``; mirrors the fuzzy header check in
+# ``MidoriKage._header_matches`` (the sanitized-name fallback stays in Python).
+HEADER_MATCHES = """
+({header, name}) => {
+    const el = document.querySelector(header);
+    if (!el) return false;
+    const text = el.innerText;
+    if (text.includes(name)) return true;
+    return name.length > 10 && text.includes(name.slice(0, 10));
+}
+"""
+
+# Scrolls a container and waits, via a MutationObserver, until the items
+# matching ``watch`` inside it actually change (or ``timeoutMs`` passes).
+# ``delta`` of ``null`` jumps to the top. Returns whether the items changed
+# and whether the scroll position moved at all. A scroll that didn't move
+# returns at once, unless ``waitIfStill``: at the top of a chat, WhatsApp
+# loads older messages without the position changing.
+SCROLL_AND_WAIT = """
+async ({container, watch, delta, timeoutMs, waitIfStill}) => {
+    const el = document.querySelector(container);
+    if (!el) return {changed: false, moved: false};
+    const signature = () => {
+        const items = el.querySelectorAll(watch);
+        if (!items.length) return "0";
+        const last = items[items.length - 1];
+        return `${items.length}|${items[0].textContent}|${last.textContent}`;
+    };
+    const before = signature();
+    const top = el.scrollTop;
+    if (delta === null) el.scrollTop = 0;
+    else el.scrollTop += delta;
+    const moved = el.scrollTop !== top;
+    if (!moved && !waitIfStill) return {changed: false, moved};
+    const changed = await new Promise((resolve) => {
+        let timer = null;
+        const observer = new MutationObserver(() => {
+            if (signature() !== before) finish(true);
+        });
+        const finish = (value) => {
+            observer.disconnect();
+            clearTimeout(timer);
+            resolve(value);
+        };
+        observer.observe(el, {childList: true, subtree: true, characterData: true});
+        timer = setTimeout(() => finish(signature() !== before), timeoutMs);
+    });
+    return {changed, moved};
+}
+"""
+
+# The scroll offset of the first element matching a selector, or 0.
+SCROLL_TOP = """
+(selector) => {
+    const el = document.querySelector(selector);
+    return el ? el.scrollTop : 0;
+}
+"""
+
+# The HTML of the first element matching a selector, or ``null``.
+OUTER_HTML = """
+(selector) => {
+    const el = document.querySelector(selector);
+    return el ? el.outerHTML : null;
+}
+"""
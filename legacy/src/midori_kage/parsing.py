@@ -0,0 +1,128 @@
+import re
+from datetime import date, datetime, time
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+# "[10:32 AM, 1/31/2024] Alice: " as found in data-pre-plain-text
+_INFO_RE = re.compile(r"^\s*\[([^,\]]*),\s*([^\]]+)\]\s*(.*?):?\s*$", re.DOTALL)
+
+_MONTH_FIRST = ("%m/%d/%Y", "%d/%m/%Y", "%d.%m.%Y", "%Y-%m-%d")
+_DAY_FIRST = ("%d/%m/%Y", "%m/%d/%Y", "%d.%m.%Y", "%Y-%m-%d")
+_TIME_FORMATS = ("%I:%M %p", "%H:%M", "%I:%M:%S %p", "%H:%M:%S")
+
+# Regions writing dates month-first; everyone else is tried day-first
+_MONTH_FIRST_REGIONS = {"US", "PH", "CA", "FM", "MH", "PW"}
+
+
+def _date_formats(locale: str) -> Tuple[str, ...]:
+    region = locale.replace("_", "-").split("-")[-1].upper() if locale else ""
+    return _MONTH_FIRST if region in _MONTH_FIRST_REGIONS else _DAY_FIRST
+
+
+@lru_cache(maxsize=4096)
+def _strptime_date(raw: str, fmt: str) -> Optional[date]:
+    try:
+        return datetime.strptime(raw, fmt).date()
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=4096)
+def _strptime_time(raw: str, fmt: str) -> Optional[time]:
+    try:
+        return datetime.strptime(raw, fmt).time()
+    except ValueError:
+        return None
+
+
+def _front(formats: List[str], fmt: str) -> List[str]:
+    return [fmt] + [f for f in formats if f != fmt]
+
+
+def message_direction(message_id: Optional[str]) -> Optional[str]:
+    """Returns "out" or "in" for a WhatsApp data-id (``true_...`` is ours)."""
+    if not message_id:
+        return None
+    if message_id.startswith("true_"):
+        return "out"
+    if message_id.startswith("false_"):
+        return "in"
+    return None
+
+
+class InfoParser:
+    """Parses ``[HH:MM, date] Sender:`` prefixes, remembering the formats seen.
+
+    Date order follows ``locale`` (the browser context runs as en-US, so
+    month-first by default) until a batch proves otherwise, e.g. with a
+    ``31/01/2024``. The last time format that matched is tried first, and
+    parsed strings are cached, since a chat repeats the same few dates
+    thousands of times. Format lists are swapped, never mutated, so one
+    parser can be shared by writer threads.
+    """
+
+    def __init__(self, locale: str = "en-US"):
+        self.date_formats = list(_date_formats(locale))
+        self.time_formats = list(_TIME_FORMATS)
+
+    def parse_date(self, raw: str) -> Optional[date]:
+        # Date order only changes in detect(), on a whole batch's evidence
+        raw = raw.strip()
+        for fmt in self.date_formats:
+            value = _strptime_date(raw, fmt)
+            if value is not None:
+                return value
+        return None
+
+    def parse_time(self, raw: str) -> Optional[time]:
+        # Some locales use narrow no-break spaces before AM/PM
+        raw = raw.strip().replace("\u202f", " ").replace("\xa0", " ")
+        formats = self.time_formats
+        for i, fmt in enumerate(formats):
+            value = _strptime_time(raw, fmt)
+            if value is not None:
+                if i:
+                    # Remember the detected format by moving it to the front
+                    self.time_formats = _front(formats, fmt)
+                return value
+        return None
+
+    def parse(self, info: str) -> Tuple[Optional[datetime], Optional[str]]:
+        match = _INFO_RE.match(info)
+        if not match:
+            return None, None
+        day = self.parse_date(match.group(2))
+        clock = self.parse_time(match.group(1))
+        timestamp = datetime.combine(day, clock) if day and clock else None
+        return timestamp, match.group(3).strip() or None
+
+    def detect(self, infos: List[str]):
+        """Settles the date order on the first format that fits every date."""
+        dates = {m.group(2).strip() for m in map(_INFO_RE.match, infos) if m}
+        for fmt in self.date_formats:
+            if dates and all(_strptime_date(d, fmt) for d in dates):
+                self.date_formats = _front(self.date_formats, fmt)
+                return
+
+    def parse_batch(self, messages: List[Dict]) -> List[Dict]:
+        """Adds ``timestamp`` (ISO 8601) and ``sender`` to each message."""
+        self.detect([m.get("info", "") for m in messages])
+        for message in messages:
+            timestamp, sender = self.parse(message.get("info", ""))
+            message["timestamp"] = timestamp.isoformat() if timestamp else None
+            message["sender"] = sender
+        return messages
+
+
+_default_parser = InfoParser()
+
+
+def parse_info_date(info: str) -> Optional[date]:
+    """Extracts the date from a ``[HH:MM, date] Sender:`` prefix."""
+    match = _INFO_RE.match(info)
+    return _default_parser.parse_date(match.group(2)) if match else None
+
+
+def parse_info(info: str) -> Tuple[Optional[datetime], Optional[str]]:
+    """Splits a ``[HH:MM, date] Sender:`` prefix into timestamp and sender."""
+    return _default_parser.parse(info)
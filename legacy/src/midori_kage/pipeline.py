@@ -0,0 +1,159 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from loguru import logger
+from pydantic import BaseModel, ConfigDict
+
+from midori_kage.backfill import ReverseSpool
+
+
+class ChatJob(BaseModel):
+    """A scraped chat travelling from the browser stage to storage.
+
+    Messages are either held in memory or, for backfilled chats, still
+    sitting in a spool on disk.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    chat_name: str
+    contact_info: Dict = {}
+    messages: List[Dict] = []
+    spool: Optional[ReverseSpool] = None
+    # Newest message of a spooled chat, for its high-water mark
+    newest: Optional[Dict] = None
+    # Set when the write appended to a stored chat instead of replacing it
+    appended: bool = False
+
+
+class StageStats(BaseModel):
+    processed: int = 0
+    failed: int = 0
+    depth: int = 0
+    max_depth: int = 0
+    depth_sum: int = 0
+    depth_samples: int = 0
+    busy_seconds: float = 0.0
+    # Time producers spent waiting for room in this stage's queue
+    blocked_seconds: float = 0.0
+
+    def sample(self, depth: int):
+        self.depth = depth
+        self.max_depth = max(self.max_depth, depth)
+        self.depth_sum += depth
+        self.depth_samples += 1
+
+    def summary(self) -> Dict[str, float]:
+        avg = self.depth_sum / self.depth_samples if self.depth_samples else 0.0
+        return {
+            "processed": self.processed,
+            "failed": self.failed,
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "avg_depth": round(avg, 2),
+            "busy_seconds": round(self.busy_seconds, 3),
+            "blocked_seconds": round(self.blocked_seconds, 3),
+        }
+
+
+class ChatPipeline:
+    """Bounded asyncio queues between navigation, normalization and writes.
+
+    The browser stage ``submit``s jobs and moves on to the next chat while
+    one normalize worker and ``writers`` write workers drain the queues.
+    Writes run in a thread so disk I/O never blocks the event loop. When a
+    queue holds ``depth`` jobs, ``submit`` waits (backpressure) and the
+    wait is accounted in the stage's ``blocked_seconds``.
+    """
+
+    def __init__(
+        self,
+        normalize: Callable[[ChatJob], Awaitable[None]],
+        persist: Callable[[ChatJob], int],
+        on_done: Callable[[ChatJob, Optional[int], Optional[Exception]], None],
+        depth: int = 4,
+        writers: int = 1,
+    ):
+        self.normalize = normalize
+        self.persist = persist
+        self.on_done = on_done
+        self.depth = depth
+        self.writers = writers
+        self.stats = {"normalize": StageStats(), "write": StageStats()}
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        self._queues = {name: asyncio.Queue(maxsize=self.depth) for name in self.stats}
+        self._tasks = [asyncio.create_task(self._normalize_worker())]
+        self._tasks += [
+            asyncio.create_task(self._write_worker()) for _ in range(self.writers)
+        ]
+
+    async def _put(self, stage: str, job: ChatJob):
+        stats = self.stats[stage]
+        queue = self._queues[stage]
+        if queue.full():
+            logger.debug(f"Pipeline stage '{stage}' full, applying backpressure.")
+        started = time.monotonic()
+        await queue.put(job)
+        stats.blocked_seconds += time.monotonic() - started
+        stats.sample(queue.qsize())
+
+    async def submit(self, job: ChatJob):
+        await self._put("normalize", job)
+
+    async def _normalize_worker(self):
+        queue = self._queues["normalize"]
+        stats = self.stats["normalize"]
+        while True:
+            job = await queue.get()
+            try:
+                started = time.monotonic()
+                try:
+                    await self.normalize(job)
+                    stats.processed += 1
+                except Exception as e:
+                    stats.failed += 1
+                    logger.error(f"Failed to normalize '{job.chat_name}': {e}")
+                    self.on_done(job, None, e)
+                    continue
+                finally:
+                    stats.busy_seconds += time.monotonic() - started
+                # Hand over before task_done so close() can't miss the job
+                await self._put("write", job)
+            finally:
+                stats.sample(queue.qsize())
+                queue.task_done()
+
+    async def _write_worker(self):
+        queue = self._queues["write"]
+        stats = self.stats["write"]
+        while True:
+            job = await queue.get()
+            started = time.monotonic()
+            try:
+                saved = await asyncio.to_thread(self.persist, job)
+                stats.processed += 1
+                self.on_done(job, saved, None)
+            except Exception as e:
+                stats.failed += 1
+                logger.error(f"Failed to write '{job.chat_name}': {e}")
+                self.on_done(job, None, e)
+            finally:
+                stats.busy_seconds += time.monotonic() - started
+                stats.sample(queue.qsize())
+                queue.task_done()
+
+    async def close(self):
+        """Waits for queued jobs to be written, then stops the workers."""
+        for name in self.stats:
+            await self._queues[name].join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {name: stats.summary() for name, stats in self.stats.items()}
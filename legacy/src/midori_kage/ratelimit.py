@@ -0,0 +1,147 @@
+import asyncio
+import json
+import math
+import random
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from loguru import logger
+
+# Average cost of the old fixed human_delay(1, 3) after every chat
+LEGACY_DELAY_SECONDS = 2.0
+
+
+class TokenBucket:
+    """Allows ``rate`` operations per second on average, bursting to
+    ``capacity``.
+
+    Tokens accrue with wall time, so time already spent elsewhere (a slow
+    chat, a long wait) is credited and the next operation may not wait at
+    all. Taking a token when none is left puts the bucket in debt, and the
+    caller waits until it is paid back.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Takes tokens and returns how long to wait before using them."""
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= tokens
+        return max(0.0, -self.tokens / self.rate)
+
+
+class RateScheduler:
+    """Keeps a run within an overall budget of chats per minute and page
+    actions (clicks, scrolls, key presses) per second.
+
+    Waits are only as long as the budget needs, plus up to ``jitter`` of
+    the wait at random so pacing isn't perfectly regular. A rate of zero
+    disables that limit.
+    """
+
+    def __init__(
+        self,
+        chats_per_minute: float = 20.0,
+        actions_per_second: float = 2.0,
+        jitter: float = 0.25,
+    ):
+        self.chats_per_minute = chats_per_minute
+        self.actions_per_second = actions_per_second
+        self.jitter = jitter
+        self.buckets: Dict[str, Optional[TokenBucket]] = {
+            "chat": TokenBucket(chats_per_minute / 60) if chats_per_minute else None,
+            "action": (
+                TokenBucket(actions_per_second, capacity=max(1.0, actions_per_second))
+                if actions_per_second
+                else None
+            ),
+        }
+        self.waited: Dict[str, float] = {"chat": 0.0, "action": 0.0}
+
+    def delay(self, kind: str) -> float:
+        bucket = self.buckets[kind]
+        if bucket is None:
+            return 0.0
+        wait = bucket.reserve()
+        if wait:
+            wait += random.uniform(0, self.jitter * wait)  # nosec
+        self.waited[kind] += wait
+        return wait
+
+    async def chat(self):
+        """Waits until the budget allows starting another chat."""
+        wait = self.delay("chat")
+        if wait:
+            logger.debug(f"Rate budget: waiting {wait:.2f}s before next chat")
+            await asyncio.sleep(wait)
+
+    async def action(self):
+        """Waits until the budget allows another page action."""
+        wait = self.delay("action")
+        if wait:
+            await asyncio.sleep(wait)
+
+    def log_summary(self):
+        logger.info(
+            f"Rate budget: waited {self.waited['chat']:.1f}s between chats and "
+            f"{self.waited['action']:.1f}s between actions."
+        )
+
+
+def estimate_run(
+    chats: int,
+    chats_per_minute: float = 20.0,
+    seconds_per_chat: float = 6.0,
+    chats_per_scroll: int = 15,
+    seconds_per_scroll: float = 1.0,
+    startup_seconds: float = 15.0,
+) -> Dict[str, float]:
+    """Predicts how long scraping ``chats`` chats takes under a budget.
+
+    A chat slower than the budget's interval isn't delayed further, so each
+    chat costs whichever is larger. Also returns the estimate with the old
+    fixed delay after every chat, for comparison.
+    """
+    interval = 60 / chats_per_minute if chats_per_minute else 0.0
+    scrolling = math.ceil(chats / chats_per_scroll) * seconds_per_scroll
+    per_chat = max(seconds_per_chat, interval)
+    total = startup_seconds + scrolling + chats * per_chat
+    legacy = (
+        startup_seconds + scrolling + chats * (seconds_per_chat + LEGACY_DELAY_SECONDS)
+    )
+    return {
+        "chats": chats,
+        "seconds_per_chat": round(per_chat, 2),
+        "rate_wait_seconds": round(chats * (per_chat - seconds_per_chat), 1),
+        "total_seconds": round(total, 1),
+        "legacy_total_seconds": round(legacy, 1),
+    }
+
+
+def observed_timings(metrics_path: Path) -> Dict[str, float]:
+    """Reads median chat and average scroll times from a JSON metrics file."""
+    with open(metrics_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    timings = {}
+    durations = sorted(
+        c["seconds"] for c in data.get("chats", []) if c["outcome"] == "scraped"
+    )
+    if durations:
+        timings["seconds_per_chat"] = durations[len(durations) // 2]
+    scroll = data.get("phase", {}).get("list_scroll")
+    if scroll and scroll["count"]:
+        timings["seconds_per_scroll"] = scroll["avg"]
+    return timings
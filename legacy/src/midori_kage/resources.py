@@ -0,0 +1,107 @@
+import base64
+import fnmatch
+from pathlib import Path
+from typing import Dict, List
+
+import yaml
+from loguru import logger
+from pydantic import BaseModel
+
+# 1x1 transparent GIF served for stubbed images
+PLACEHOLDER_GIF = base64.b64decode(
+    "R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7"
+)
+
+
+class ResourcePolicy(BaseModel):
+    """Which requests the browser may make, from config/resources.yaml."""
+
+    allowed_types: List[str] = ["document", "script", "xhr", "fetch", "websocket"]
+    stub_types: List[str] = []
+    blocked_urls: List[str] = []
+    allowed_urls: List[str] = []
+    # Let through when media capture is on, blocked otherwise
+    media_types: List[str] = ["image", "media"]
+    media_urls: List[str] = []
+    capture_media: bool = False
+    estimated_bytes: Dict[str, int] = {"default": 15000}
+
+    def decide(self, resource_type: str, url: str) -> str:
+        """Returns "allow", "stub" or "abort" for a request."""
+        if any(fnmatch.fnmatchcase(url, p) for p in self.allowed_urls):
+            return "allow"
+        media_url = any(fnmatch.fnmatchcase(url, p) for p in self.media_urls)
+        if self.capture_media and (media_url or resource_type in self.media_types):
+            return "allow"
+        blocked = (
+            media_url
+            or resource_type not in self.allowed_types
+            or any(fnmatch.fnmatchcase(url, p) for p in self.blocked_urls)
+        )
+        if not blocked:
+            return "allow"
+        return "stub" if resource_type in self.stub_types else "abort"
+
+
+def load_resource_policy(path: Path = Path("config/resources.yaml")) -> ResourcePolicy:
+    if not path.exists():
+        logger.warning(f"{path} not found; using the built-in resource allowlist.")
+        return ResourcePolicy()
+    with open(path, "r") as f:
+        return ResourcePolicy(**(yaml.safe_load(f) or {}))
+
+
+class ResourceBlocker:
+    """Routes every request of a browser context through a ResourcePolicy.
+
+    Blocked requests are counted per resource type, and the bytes saved are
+    estimated from the policy's per-type averages since they are never
+    downloaded. Requests handled by a service worker bypass routing.
+    """
+
+    def __init__(self, policy: ResourcePolicy):
+        self.policy = policy
+        self.allowed = 0
+        self.blocked: Dict[str, int] = {}
+
+    async def install(self, context):
+        await context.route("**/*", self._handle)
+
+    async def _handle(self, route):
+        request = route.request
+        action = self.policy.decide(request.resource_type, request.url)
+        if action == "allow":
+            self.allowed += 1
+            # Fall back rather than continue so later routes still apply
+            await route.fallback()
+            return
+
+        self.blocked[request.resource_type] = (
+            self.blocked.get(request.resource_type, 0) + 1
+        )
+        if action == "stub":
+            await route.fulfill(
+                status=200, content_type="image/gif", body=PLACEHOLDER_GIF
+            )
+        else:
+            await route.abort("blockedbyclient")
+
+    @property
+    def blocked_requests(self) -> int:
+        return sum(self.blocked.values())
+
+    @property
+    def estimated_bytes_saved(self) -> int:
+        sizes = self.policy.estimated_bytes
+        default = sizes.get("default", 0)
+        return sum(
+            count * sizes.get(kind, default) for kind, count in self.blocked.items()
+        )
+
+    def log_summary(self):
+        by_type = ", ".join(f"{k}: {v}" for k, v in sorted(self.blocked.items()))
+        logger.info(
+            f"Resource blocking: {self.blocked_requests} requests blocked "
+            f"({by_type or 'none'}), ~{self.estimated_bytes_saved / 1e6:.1f} MB "
+            f"saved, {self.allowed} allowed."
+        )
@@ -1,26 +1,171 @@
 import asyncio
-import json
+import base64
 import random
+import time
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import (
+    AbstractSet,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
 
 import yaml
 from loguru import logger
-from playwright.async_api import Browser, BrowserContext, Page, async_playwright
+from playwright.async_api import Browser, BrowserContext, Page
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import async_playwright
 from playwright_stealth import Stealth
 from pydantic import BaseModel
 
+from midori_kage import page_scripts
+from midori_kage.backfill import ReverseSpool
+from midori_kage.config import build_selector, load_selectors
+from midori_kage.contacts import ContactInfoCache, ContactRecord, ContactSink
+from midori_kage.filters import DEFAULT_FILTERS, ChatFilter, FilterConfig
+from midori_kage.governor import MemoryGovernor
+from midori_kage.incremental import (
+    STORED_TAIL,
+    HighWaterMark,
+    MarkStore,
+    mark_for,
+    message_hash,
+    messages_after,
+    overlap_end,
+)
+from midori_kage.manifest import RunManifest
+from midori_kage.media import MediaDownloader, MediaStore
+from midori_kage.metrics import open_metrics
+from midori_kage.parsing import InfoParser, message_direction, parse_info_date
+from midori_kage.pipeline import ChatJob, ChatPipeline
+from midori_kage.ratelimit import RateScheduler
+from midori_kage.resources import ResourceBlocker, load_resource_policy
+from midori_kage.snapshots import SnapshotWriter, snapshot_path
+from midori_kage.storage import open_storage
+
 
 class ScraperConfig(BaseModel):
     selectors: Dict[str, Dict[str, str]]
     ignored_chats: List[str] = []
+    filters: FilterConfig = DEFAULT_FILTERS
+
+
+class ChatRow(BaseModel):
+    """A chat-list row as read by a single in-page snapshot."""
+
+    index: int
+    name: str
+    key: Optional[str] = None
+    pinned: bool = False
+    unread: bool = False
+    muted: bool = False
+    group: bool = False
+    last_activity: str = ""
 
 
 class MidoriKage:
-    def __init__(self, headless: bool = False, session_dir: str = "session"):
+    def __init__(
+        self,
+        headless: bool = False,
+        session_dir: str = "session",
+        batch_extract: bool = True,
+        chats_dir: str = "chats",
+        incremental: bool = False,
+        backfill: bool = False,
+        backfill_depth: Optional[int] = None,
+        backfill_until: Optional[date] = None,
+        storage: str = "json",
+        wait_timeout: float = 5.0,
+        log_file: str = "logs/debug.log",
+        pipeline_depth: int = 4,
+        pipeline_writers: int = 1,
+        resume: bool = False,
+        metrics_path: Optional[Path] = None,
+        metrics_interval: float = 30.0,
+        block_resources: bool = False,
+        max_heap_mb: Optional[float] = None,
+        max_rss_mb: Optional[float] = None,
+        capture_media: bool = False,
+        media_workers: int = 4,
+        parse_info: bool = False,
+        contact_ttl_hours: float = 168.0,
+        refresh_contacts: bool = False,
+        chats_per_minute: float = 20.0,
+        actions_per_second: float = 2.0,
+        snapshot_dom: bool = False,
+    ):
         self.headless = headless
+        self.batch_extract = batch_extract
+        self.chats_dir = Path(chats_dir)
+        self.incremental = incremental
+        self.backfill = backfill
+        self.backfill_depth = backfill_depth
+        self.backfill_until = backfill_until
+        self.marks = MarkStore(self.chats_dir / ".high_water_marks.json")
+        if incremental and storage == "json":
+            # A JSON file is rewritten whole on every append; JSONL reads
+            # the existing .json chats and migrates each on its first append
+            logger.warning(
+                "--incremental appends cost the whole history with JSON "
+                "storage; using jsonl instead."
+            )
+            storage = "jsonl"
+        self.storage = open_storage(storage, self.chats_dir)
+        self.wait_timeout = wait_timeout
+        # Per-wait latency stats: label -> count, timeouts, total and max seconds
+        self.wait_stats: Dict[str, Dict[str, float]] = {}
+        self.log_file = log_file
+        # Optional hook called as on_progress(event, data) for each chat outcome
+        self.on_progress: Optional[Callable[[str, Dict], None]] = None
+        # Async hooks run over each batch of messages in the normalize stage
+        self.normalizers: List[Callable[[List[Dict]], Awaitable[List[Dict]]]] = []
+        self.pipeline_depth = pipeline_depth
+        self.pipeline_writers = pipeline_writers
+        self.pipeline: Optional[ChatPipeline] = None
+        self.resume = resume
+        self.manifest = RunManifest(self.chats_dir / ".manifest.json")
+        self.manifest.reconcile(self.storage.chat_names(), self.storage.location)
+        # Phase timings; a no-op stand-in unless a metrics file is requested
+        self.metrics = open_metrics(metrics_path, metrics_interval)
+        self.block_resources = block_resources
+        self.resource_blocker: Optional[ResourceBlocker] = None
+        # Recycles the page or context between chats when memory grows
+        self.governor: Optional[MemoryGovernor] = None
+        if max_heap_mb or max_rss_mb:
+            self.governor = MemoryGovernor(max_heap_mb, max_rss_mb)
+        self.capture_media = capture_media
+        self.media_workers = media_workers
+        self.media: Optional[MediaDownloader] = None
+        if capture_media:
+            # Downloads run in the background; hashes are attached on normalize
+            self.normalizers.append(self._attach_media)
+        # Dates in data-pre-plain-text follow the browser context's locale
+        self.locale = "en-US"
+        self.parse_info = parse_info
+        self.info_parser = InfoParser(self.locale)
+        if parse_info:
+            self.normalizers.append(self._parse_messages)
+        # Contact drawer details are reused until stale, or always re-read
+        self.contact_cache = ContactInfoCache(
+            self.chats_dir / ".contact_info.json", timedelta(hours=contact_ttl_hours)
+        )
+        self.refresh_contacts = refresh_contacts
+        # Paces chats and page actions against an overall rate budget
+        self.rate = RateScheduler(chats_per_minute, actions_per_second)
+        # Chat panel HTML saved per viewport, for offline re-extraction
+        self.snapshot_dom = snapshot_dom
+        self.dom_snapshots: Optional[SnapshotWriter] = None
         self.session_dir = Path(session_dir)
         self.config = self._load_config()
+        self.chat_filter = ChatFilter(
+            self.config.filters, self.config.ignored_chats, self.locale
+        )
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
@@ -29,27 +174,23 @@ class MidoriKage:
         self.session_dir.mkdir(parents=True, exist_ok=True)
 
     def _load_config(self) -> ScraperConfig:
-        config_path = Path("config/selectors.yaml")
-        if not config_path.exists():
-            raise FileNotFoundError(f"Config file not found at {config_path}")
-
+        selectors = load_selectors()
         ignore_path = Path("config/ignore_list.yaml")
-        ignored = []
+        ignore_data = {}
         if ignore_path.exists():
             with open(ignore_path, "r") as f:
-                ignore_data = yaml.safe_load(f)
-                ignored = ignore_data.get("ignored_chats", [])
+                ignore_data = yaml.safe_load(f) or {}
 
-        with open(config_path, "r") as f:
-            data = yaml.safe_load(f)
-            return ScraperConfig(
-                selectors=data.get("selectors", {}), ignored_chats=ignored
-            )
+        return ScraperConfig(
+            selectors=selectors,
+            ignored_chats=ignore_data.get("ignored_chats") or [],
+            filters=ignore_data.get("filters") or DEFAULT_FILTERS,
+        )
 
     async def start(self):
         # Configure verbose logging
         logger.add(
-            "logs/debug.log",
+            self.log_file,
             level="DEBUG",
             rotation="10 MB",
             retention="1 week",
@@ -57,7 +198,10 @@ class MidoriKage:
         )
         logger.info("Starting Midori Kage...")
         self.playwright = await async_playwright().start()
+        await self._start_browser()
 
+    async def _start_browser(self):
+        """Launches the persistent context and opens a logged-in page."""
         # Use a persistent context for better session stability (IndexedDB, etc.)
         user_data_dir = self.session_dir / "user_data"
         user_data_dir.mkdir(parents=True, exist_ok=True)
@@ -67,46 +211,45 @@ class MidoriKage:
         # Launch persistent context
         # We use firefox or chromium. Chromium is often more detectable,
         # but playwright-stealth helps.
-        self.context = await self.playwright.chromium.launch_persistent_context(
-            user_data_dir=user_data_dir,
-            headless=self.headless,
-            args=[
-                "--disable-blink-features=AutomationControlled",
-                "--no-sandbox",
-                "--disable-dev-shm-usage",
-            ],
-            user_agent=(
-                "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/120.0.0.0 Safari/537.36"
-            ),
-            viewport={"width": 1280, "height": 800},
-            locale="en-US",
-            timezone_id="America/New_York",
-        )
+        with self.metrics.span("launch"):
+            self.context = await self._launch_context(user_data_dir)
+
+        # Skip avatars, media, fonts... before the first navigation
+        if self.block_resources:
+            if self.resource_blocker is None:
+                policy = load_resource_policy()
+                policy.capture_media = self.capture_media
+                self.resource_blocker = ResourceBlocker(policy)
+            await self.resource_blocker.install(self.context)
 
         self.browser = None  # Persistent context is the browser effectively
 
         # Apply stealth to the first page (or all new pages)
         if len(self.context.pages) > 0:
-            self.page = self.context.pages[0]
+            page = self.context.pages[0]
         else:
-            self.page = await self.context.new_page()
+            page = await self.context.new_page()
+        await self._open_page(page)
 
+    async def _open_page(self, page: Page):
+        """Makes page the scraper's page and waits until WhatsApp is loaded."""
+        self.page = page
         await Stealth().apply_stealth_async(self.page)
 
         # Navigate to WhatsApp Web
         logger.info("Navigating to WhatsApp Web...")
-        await self.page.goto("https://web.whatsapp.com/")
+        with self.metrics.span("navigate"):
+            await self.page.goto("https://web.whatsapp.com/")
 
         # Wait for user to scan QR code if not logged in
         try:
             logger.info("Waiting for login...")
             # Using dynamic selector for chat list or side panel which is more robust
             # New WhatsApp Web often has a side panel wrapper
-            await self.page.wait_for_selector(
-                "#side, [aria-label='Chat list']", timeout=60000
-            )  # Wait 60s for scan
+            with self.metrics.span("login"):
+                await self.page.wait_for_selector(
+                    "#side, [aria-label='Chat list']", timeout=60000
+                )  # Wait 60s for scan
             logger.info("Login successful!")
 
         except Exception as e:
@@ -115,21 +258,52 @@ class MidoriKage:
             await self.page.screenshot(path="logs/login_failed.png")
             raise
 
+    async def _recycle_browser(self, action: str):
+        """Replaces the page, or restarts the whole context, between chats.
+
+        The session lives in session_dir, so no new login is needed. The chat
+        list starts from the top again; visited chats are skipped.
+        """
+        with self.metrics.span(f"recycle_{action}"):
+            if action == "page":
+                # WhatsApp allows one active tab per profile: close the old
+                # tab before the new one loads WhatsApp. The blank page keeps
+                # the context from being left without pages.
+                new_page = await self.context.new_page()
+                await self.page.close()
+                await self._open_page(new_page)
+            else:
+                await self.context.close()
+                await self._start_browser()
+
+    async def _launch_context(self, user_data_dir: Path) -> BrowserContext:
+        return await self.playwright.chromium.launch_persistent_context(
+            user_data_dir=user_data_dir,
+            headless=self.headless,
+            args=[
+                "--disable-blink-features=AutomationControlled",
+                "--no-sandbox",
+                "--disable-dev-shm-usage",
+            ],
+            user_agent=(
+                "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+                "AppleWebKit/537.36 (KHTML, like Gecko) "
+                "Chrome/120.0.0.0 Safari/537.36"
+            ),
+            viewport={"width": 1280, "height": 800},
+            locale=self.locale,
+            timezone_id="America/New_York",
+        )
+
     def _build_selector(self, key: str) -> str:
         """Builds a CSS selector from the config."""
-        attrs = self.config.selectors.get(key)
-        if not attrs:
-            raise ValueError(f"Selector '{key}' not found in config")
-
-        parts = []
-        if "css" in attrs:
-            return attrs["css"]
-        if "role" in attrs:
-            parts.append(f'[role="{attrs["role"]}"]')
-        if "aria_label" in attrs:
-            parts.append(f'[aria-label="{attrs["aria_label"]}"]')
+        return build_selector(self.config.selectors, key)
 
-        return "".join(parts)
+    def _optional_selector(self, key: str) -> Optional[str]:
+        """Like _build_selector, but returns None for unconfigured keys."""
+        if key not in self.config.selectors:
+            return None
+        return self._build_selector(key)
 
     async def human_delay(self, min_seconds: float = 1.0, max_seconds: float = 3.0):
         """Waits for a random amount of time with a normal distribution."""
@@ -138,7 +312,8 @@ class MidoriKage:
         delay = random.gauss(mean, std_dev)  # nosec
         delay = max(min_seconds, min(delay, max_seconds))  # Clamp
         logger.debug(f"Sleeping for {delay:.2f}s")
-        await asyncio.sleep(delay)
+        with self.metrics.span("human_delay"):
+            await asyncio.sleep(delay)
 
     async def smooth_mouse_move(self, x: int, y: int):
         """Simulates smooth mouse movement to coordinates."""
@@ -167,61 +342,196 @@ class MidoriKage:
 
         chat_list_selector = self._build_selector("chat_list")
         chat_row_selector = self._build_selector("chat_row")
-        list_title_selector = self._build_selector("chat_list_title")
 
         # Wait for list
         await self.page.wait_for_selector(chat_row_selector, timeout=30000)
+        # A warm page (daemon jobs) may have left the list scrolled down,
+        # and the most recent chats are at the top
+        await self._scroll_and_wait(
+            "chat_list_scroll", chat_list_selector, chat_row_selector, None
+        )
 
-        processed_count = 0
+        visited_names, processed_count = self.manifest.begin_run(
+            limit, resume=self.resume
+        )
+        await self._start_media()
+        await self._start_pipeline()
+        try:
+            await self._scrape_chat_list(
+                limit,
+                chat_list_selector,
+                chat_row_selector,
+                visited_names,
+                processed_count,
+            )
+        finally:
+            await self._stop_pipeline()
+            await self._stop_media()
+            self.marks.checkpoint()
+            self.contact_cache.checkpoint()
+            self.manifest.checkpoint()
+        self.manifest.end_run()
+
+        self._log_wait_stats()
+        self.metrics.log_summary()
+        self.metrics.write()
+
+    async def scrape_contacts(self, limit: int = -1) -> int:
+        """Harvests contacts and groups from the New chat drawer in one sweep.
+
+        Rows are read with one evaluate per scroll position, deduped by
+        name, and appended to ``<chats_dir>/contacts/contacts.jsonl`` as they come.
+        Returns the number of records saved.
+        """
+        limit = float("inf") if limit == -1 else limit
+        list_selector = self._build_selector("contacts_list")
+        row_selector = self._build_selector("contact_row")
+
+        await self.page.locator(self._build_selector("new_chat_button")).first.click()
+        await self.page.wait_for_selector(row_selector, timeout=30000)
+
+        sink = ContactSink(self.chats_dir / "contacts" / "contacts.jsonl")
+        seen: Set[str] = set()
+        started = time.monotonic()
         scrolled_attempts = 0
-        visited_names = set()
+        try:
+            while sink.count < limit and scrolled_attempts < 3:
+                fresh = []
+                for row in await self._snapshot_contacts(list_selector, row_selector):
+                    key = row.get("key") or row.get("name")
+                    if not key or key in seen:
+                        continue
+                    seen.add(key)
+                    fresh.append(ContactRecord.from_row(row))
+                if sink.count + len(fresh) > limit:
+                    fresh = fresh[: int(limit - sink.count)]
+                sink.write(fresh)
+
+                scrolled = await self._scroll_and_wait(
+                    "contacts_scroll", list_selector, row_selector, 1000
+                )
+                scrolled_attempts = 0 if scrolled["changed"] else scrolled_attempts + 1
+            sink.finalize()
+        finally:
+            sink.close()
+            await self.page.keyboard.press("Escape")
 
-        while processed_count < limit:
-            # Get current rows
-            rows = await self.page.locator(chat_row_selector).all()
+        elapsed = time.monotonic() - started
+        logger.info(
+            f"Saved {sink.count} contacts to {sink.path} in {elapsed:.1f}s "
+            f"({sink.count / max(elapsed, 1e-6):.1f}/s)."
+        )
+        self._log_wait_stats()
+        return sink.count
+
+    async def _snapshot_contacts(self, list_selector: str, row_selector: str):
+        return await self.page.evaluate(
+            page_scripts.SNAPSHOT_CONTACTS,
+            {
+                "list": list_selector,
+                "row": row_selector,
+                "name": self._build_selector("contact_row_name"),
+                "about": self._optional_selector("contact_row_about"),
+                "group": self._optional_selector("contact_row_group"),
+            },
+        )
+
+    async def scrape_chat(self, name: str) -> bool:
+        """Finds one chat by name in the chat list and scrapes it.
 
-            # Filter rows we haven't processed in this loop run if possible?
-            # Actually, easiest is to iterate what we see, check cache/visited.
+        Cached chats are scraped again. Returns True if the chat was saved.
+        """
+        chat_list_selector = self._build_selector("chat_list")
+        chat_row_selector = self._build_selector("chat_row")
+        await self.page.wait_for_selector(chat_row_selector, timeout=30000)
+
+        row = await self._find_chat_row(name, chat_list_selector, chat_row_selector)
+        if row is None:
+            logger.warning(f"Chat '{name}' not found in the chat list.")
+            return False
+
+        await self._start_media()
+        await self._start_pipeline()
+        try:
+            saved = await self._process_chat(row, self._sanitize_filename(row.name))
+        finally:
+            await self._stop_pipeline()
+            await self._stop_media()
+            self.marks.checkpoint()
+            self.contact_cache.checkpoint()
+            self.manifest.checkpoint()
+        self.metrics.write()
+        return saved
+
+    async def _find_chat_row(
+        self, name: str, chat_list_selector: str, chat_row_selector: str
+    ) -> Optional[ChatRow]:
+        # Start from the top of the list, then scroll until the row shows up
+        await self._scroll_and_wait(
+            "chat_list_scroll", chat_list_selector, chat_row_selector, None
+        )
+        scrolled_attempts = 0
+        while scrolled_attempts < 3:
+            for row in await self._snapshot_chat_list():
+                if name in (row.key, row.name):
+                    return row
+            scrolled = await self._scroll_and_wait(
+                "chat_list_scroll", chat_list_selector, chat_row_selector, 1000
+            )
+            scrolled_attempts = 0 if scrolled["changed"] else scrolled_attempts + 1
+        return None
+
+    async def _scrape_chat_list(
+        self,
+        limit: float,
+        chat_list_selector: str,
+        chat_row_selector: str,
+        visited_names: Set[str],
+        processed_count: int,
+    ):
+        scrolled_attempts = 0
+
+        while processed_count < limit:
+            # Snapshot every rendered row in one call, then filter in memory
+            # so we only ever touch the page again for rows worth clicking.
+            with self.metrics.span("list_snapshot"):
+                rows = await self._snapshot_chat_list()
 
             new_promising_rows = []
             for row in rows:
-                # Try to extract name from row to check cache BEFORE clicking
-                try:
-                    name_el = row.locator(list_title_selector).first
-                    if await name_el.count() > 0:
-                        raw_name = await name_el.inner_text()
-                        safe_name = self._sanitize_filename(raw_name)
+                safe_name = self._sanitize_filename(row.name)
+                if safe_name in visited_names:
+                    continue
 
-                        if safe_name in visited_names:
-                            continue
+                # Check cache (incremental runs revisit cached chats for deltas)
+                if not self.incremental and self._chat_exists(safe_name):
+                    logger.info(f"Skipping cached chat: '{safe_name}'")
+                    visited_names.add(safe_name)
+                    self._emit("chat_skipped", chat=safe_name, reason="cached")
+                    continue
 
-                        # Check cache
-                        if self._chat_exists(safe_name):
-                            logger.info(f"Skipping cached chat: '{safe_name}'")
-                            visited_names.add(safe_name)
-                            continue
+                # Filters only need the row, so skipped chats are never clicked
+                reason = self.chat_filter.skip_reason(row)
+                if reason:
+                    logger.info(f"Skipping chat '{row.name}': {reason}")
+                    visited_names.add(safe_name)
+                    self._emit("chat_skipped", chat=safe_name, reason=reason)
+                    continue
 
-                        new_promising_rows.append((row, safe_name, raw_name))
-                    else:
-                        # Cannot read name easily? Skip or try click?
-                        # Let's skip to be safe/fast
-                        continue
-                except Exception:
-                    continue  # nosec
+                new_promising_rows.append((row, safe_name))
 
             if not new_promising_rows:
                 # No new actionable rows visible. Scroll down.
                 logger.info("No new chats visible. Scrolling...")
-                prev_count = len(rows)
 
-                # Scroll the chat list container
-                chat_list_el = self.page.locator(chat_list_selector).first
-                await chat_list_el.evaluate("el => el.scrollTop += 1000")
-                await asyncio.sleep(2)  # Wait for load
+                # Scroll the chat list container and wait for new rows
+                with self.metrics.span("list_scroll"):
+                    scrolled = await self._scroll_and_wait(
+                        "chat_list_scroll", chat_list_selector, chat_row_selector, 1000
+                    )
 
                 # Check if we reached bottom/stopped loading
-                new_rows_count = await self.page.locator(chat_row_selector).count()
-                if new_rows_count == prev_count:
+                if not scrolled["changed"]:
                     scrolled_attempts += 1
                     if scrolled_attempts >= 3:
                         logger.info("Reached end of chat list or load timeout.")
@@ -232,104 +542,411 @@ class MidoriKage:
                 continue
 
             # Process the promising rows
-            for row, safe_name, raw_name in new_promising_rows:
+            for row, safe_name in new_promising_rows:
                 if processed_count >= limit:
                     break
 
                 visited_names.add(safe_name)
 
-                # Check ignore list (using raw name usually, but config might have safe?
-                # Let's check raw name mainly)
-                if raw_name in self.config.ignored_chats:
-                    logger.info(f"Skipping ignored chat: '{raw_name}'")
-                    continue
+                # Time spent on the previous chat counts towards the budget
+                with self.metrics.span("rate_wait"):
+                    await self.rate.chat()
 
+                self.metrics.begin_chat(safe_name)
+                outcome = "failed"
                 try:
-                    logger.info(f"Processing chat {processed_count + 1}: '{raw_name}'")
-
-                    # Click the row
-                    await row.click()
-
-                    # Wait for the chat title in the header to match the clicked
-                    # name (or close to it). This ensures we switched chats.
-                    # We look for the main header element
-                    header_selector = "#main header"
-
-                    # Retry logic for verification
-                    verified = False
-                    for _ in range(5):  # Wait up to ~5 seconds (5 * 1s)
-                        await asyncio.sleep(1)
-                        if await self.page.locator(header_selector).count() > 0:
-                            # Get all text in header
-                            header_text = await self.page.locator(
-                                header_selector
-                            ).first.inner_text()
-
-                            # Check if the name we clicked is in the header
-                            # This is fuzzier but safer than specific span[title]
-                            if raw_name in header_text:
-                                verified = True
-                                break
-                            elif safe_name in self._sanitize_filename(header_text):
-                                verified = True
-                                break
-                            # Handle group names truncation or partial matches
-                            elif len(raw_name) > 10 and raw_name[:10] in header_text:
-                                verified = True
-                                break
-                            else:
-                                logger.debug(
-                                    f"Header text mismatch with row '{raw_name}'."
-                                    f" Header contains: {header_text[:40]}..."
-                                    f" Waiting..."
-                                )
-
-                    if not verified:
-                        logger.warning(
-                            f"Failed to verify navigation to '{raw_name}'. "
-                            "Skipping to avoid mix-up."
+                    logger.info(f"Processing chat {processed_count + 1}: '{row.name}'")
+                    if await self._process_chat(row, safe_name):
+                        processed_count += 1
+                        outcome = "scraped"
+                    else:
+                        outcome = "skipped"
+                except Exception as e:
+                    logger.error(f"Error scraping '{row.name}': {e}")
+                    self._emit("chat_failed", chat=safe_name, error=str(e))
+                finally:
+                    self.metrics.end_chat(outcome)
+
+                # Between chats is the only safe point to swap the page
+                if self.governor is not None:
+                    action = await self.governor.check(self.page)
+                    if action:
+                        # Resume where the list was instead of scrolling back
+                        # through every chat already visited
+                        offset = await self.page.evaluate(
+                            page_scripts.SCROLL_TOP, chat_list_selector
                         )
-                        # Could attempt to click again or just skip
-                        continue
-
-                    # Double check we are in the right chat (header check)
-                    # Skip header check for speed if we trust click,
-                    # OR implement robustly.
-                    # Let's check group heuristic here as well if possible, or inside.
-
-                    # We can use the header subtitle for group check as before
-                    subtitle_selector = self._build_selector("chat_subtitle")
-                    is_group = False
-                    if await self.page.locator(subtitle_selector).count() > 0:
-                        subtitle = await self.page.locator(
-                            subtitle_selector
-                        ).first.inner_text()
-                        if (
-                            "," in subtitle
-                            or "group" in subtitle.lower()
-                            or "click here" in subtitle.lower()
-                        ):
-                            is_group = True
-
-                    if is_group:
-                        logger.info(f"Skipping group chat: '{raw_name}'")
-                        continue
+                        await self._recycle_browser(action)
+                        await self.page.wait_for_selector(
+                            chat_row_selector, timeout=30000
+                        )
+                        if offset:
+                            await self._scroll_and_wait(
+                                "chat_list_scroll",
+                                chat_list_selector,
+                                chat_row_selector,
+                                offset,
+                            )
+                        scrolled_attempts = 0
+                        break
 
-                    # Scrape Contact Info
-                    contact_info = await self._scrape_contact_info()
-                    logger.info(f"Extracted info: {contact_info}")
+    async def _snapshot_chat_list(self) -> List[ChatRow]:
+        """Reads every rendered chat-list row with a single in-page evaluate."""
+        records = await self.page.evaluate(
+            page_scripts.SNAPSHOT_CHAT_LIST,
+            {
+                "row": self._build_selector("chat_row"),
+                "title": self._build_selector("chat_list_title"),
+                "pinned": self._optional_selector("chat_row_pinned"),
+                "unread": self._optional_selector("unread_badge"),
+                "muted": self._optional_selector("chat_row_muted"),
+                "group": self._optional_selector("chat_row_group"),
+                "lastActivity": self._optional_selector("chat_row_last_activity"),
+            },
+        )
+        # Rows without a readable name can't be cached or verified, skip them
+        return [ChatRow(**record) for record in records if record.get("name")]
+
+    def _row_locator(self, row: ChatRow):
+        """Locates a snapshotted row again, by title when possible."""
+        rows = self.page.locator(self._build_selector("chat_row"))
+        if row.key:
+            return rows.filter(has=self.page.get_by_title(row.key, exact=True)).first
+        return rows.nth(row.index)
+
+    async def _process_chat(self, row: ChatRow, safe_name: str) -> bool:
+        """Opens a chat row, scrapes and saves it. Returns True if saved."""
+        raw_name = row.name
+
+        # Click the row
+        with self.metrics.span("open_chat"):
+            await self.rate.action()
+            await self._row_locator(row).click()
+
+        # Wait for the chat title in the header to match the clicked
+        # name (or close to it). This ensures we switched chats.
+        # We look for the main header element
+        header_selector = "#main header"
+
+        with self.metrics.span("header"):
+            await self._wait(
+                "header",
+                self.page.wait_for_function(
+                    page_scripts.HEADER_MATCHES,
+                    arg={"header": header_selector, "name": raw_name},
+                    timeout=self.wait_timeout * 1000,
+                ),
+            )
 
+        # Final check in Python also covers names that only match sanitized
+        verified = False
+        if await self.page.locator(header_selector).count() > 0:
+            header_text = await self.page.locator(header_selector).first.inner_text()
+            verified = self._header_matches(header_text, raw_name, safe_name)
+            if not verified:
+                logger.debug(
+                    f"Header text mismatch with row '{raw_name}'."
+                    f" Header contains: {header_text[:40]}..."
+                )
+
+        if not verified:
+            logger.warning(
+                f"Failed to verify navigation to '{raw_name}'. "
+                "Skipping to avoid mix-up."
+            )
+            # Could attempt to click again or just skip
+            self._emit("chat_skipped", chat=safe_name, reason="unverified")
+            return False
+
+        # Groups with a photo look like direct chats in the list, so when
+        # filters exclude groups the header subtitle is checked as well
+        subtitle_selector = self._build_selector("chat_subtitle")
+        is_group = False
+        if (
+            self.chat_filter.excludes_groups
+            and await self.page.locator(subtitle_selector).count() > 0
+        ):
+            subtitle = await self.page.locator(subtitle_selector).first.inner_text()
+            if (
+                "," in subtitle
+                or "group" in subtitle.lower()
+                or "click here" in subtitle.lower()
+            ):
+                is_group = True
+
+        if is_group:
+            logger.info(f"Skipping group chat: '{raw_name}'")
+            self._emit("chat_skipped", chat=safe_name, reason="group")
+            return False
+
+        # Scrape Contact Info, unless cached recently
+        contact_info = await self._contact_info_for(row)
+        logger.info(f"Extracted info: {contact_info}")
+
+        if self.snapshot_dom:
+            # Incremental visits only see what's new since the last run, so
+            # they are appended to a full snapshot of the chat, if there is one
+            root = self.chats_dir / "snapshots"
+            delta = self.incremental and self.storage.exists(safe_name)
+            if not delta or snapshot_path(root, safe_name).exists():
+                self.dom_snapshots = SnapshotWriter(
+                    root, safe_name, contact_info, delta=delta
+                )
+        extracted = False
+        try:
+            with self.metrics.span("extract"):
+                if self.backfill:
+                    job = await self._backfill_current_chat(safe_name, contact_info)
+                else:
                     # Scrape Messages
                     messages = await self._scrape_current_chat()
                     logger.info(f"Scraped {len(messages)} messages.")
+                    job = ChatJob(
+                        chat_name=safe_name,
+                        contact_info=contact_info,
+                        messages=messages,
+                    )
+            extracted = True
+        finally:
+            if self.dom_snapshots is not None:
+                writer, self.dom_snapshots = self.dom_snapshots, None
+                await asyncio.to_thread(writer.close if extracted else writer.discard)
 
-                    self._save_chat_history(safe_name, messages, contact_info)
-                    processed_count += 1
+        # Saving happens in the pipeline while we move on to the next chat
+        with self.metrics.span("submit"):
+            await self._submit(job)
+        return True
 
-                except Exception as e:
-                    logger.error(f"Error scraping '{raw_name}': {e}")
+    async def _start_pipeline(self):
+        if self.pipeline_depth <= 0:
+            return
+        self.pipeline = ChatPipeline(
+            normalize=self._normalize_job,
+            persist=self._persist_job,
+            on_done=self._on_job_done,
+            depth=self.pipeline_depth,
+            writers=self.pipeline_writers,
+        )
+        await self.pipeline.start()
+
+    async def _stop_pipeline(self):
+        if self.pipeline is None:
+            return
+        await self.pipeline.close()
+        for stage, stats in self.pipeline.summary().items():
+            logger.info(f"Pipeline stage '{stage}': {stats}")
+        self.pipeline = None
+
+    async def _submit(self, job: ChatJob):
+        """Queues a scraped chat for saving, or saves it inline without one."""
+        if self.pipeline is not None:
+            await self.pipeline.submit(job)
+            return
+
+        try:
+            await self._normalize_job(job)
+            saved = self._persist_job(job)
+        except Exception as e:
+            self._on_job_done(job, None, e)
+            raise
+        self._on_job_done(job, saved, None)
+
+    async def _start_media(self):
+        if not self.capture_media:
+            return
+        if not self.batch_extract:
+            logger.warning("Media capture needs batched extraction; skipping media.")
+            return
+        store = MediaStore(self.chats_dir / "media")
+        self.media = MediaDownloader(store, self._fetch_media, self.media_workers)
+        await self.media.start()
+
+    async def _stop_media(self):
+        if self.media is None:
+            return
+        await self.media.close()
+        self.media = None
+
+    async def _fetch_media(self, url: str) -> Optional[Tuple[bytes, str]]:
+        """Reads blob: URLs from the page, downloads the rest directly."""
+        if url.startswith(("blob:", "data:")):
+            result = await self.page.evaluate(page_scripts.READ_MEDIA, url)
+            if result is None:
+                return None
+            return base64.b64decode(result["data"]), result["type"]
+
+        response = await self.context.request.get(url)
+        if not response.ok:
+            return None
+        return await response.body(), response.headers.get("content-type", "")
+
+    async def _attach_media(self, batch: List[Dict]) -> List[Dict]:
+        """Normalizer replacing each message's media URLs with their hashes."""
+        if self.media is None:
+            return batch
+        for message in batch:
+            if message.get("media"):
+                message["media"] = await self.media.resolve(message["media"])
+        return batch
+
+    async def _parse_messages(self, batch: List[Dict]) -> List[Dict]:
+        """Normalizer adding typed timestamp and sender fields."""
+        return self.info_parser.parse_batch(batch)
+
+    async def _normalize_job(self, job: ChatJob):
+        if not self.normalizers:
+            return
+        with self.metrics.span("normalize"):
+            await self._run_normalizers(job)
+
+    async def _run_normalizers(self, job: ChatJob):
+        if job.spool is None:
+            for normalize in self.normalizers:
+                job.messages = await normalize(job.messages)
+            return
+
+        # Spooled chats are normalized batch by batch into a fresh spool
+        normalized = ReverseSpool(job.spool.path.with_suffix(".norm.jsonl"))
+        try:
+            for batch in job.spool.iter_batches(newest_first=True):
+                for normalize in self.normalizers:
+                    batch = await normalize(batch)
+                normalized.append(batch)
+        except Exception:
+            normalized.remove()
+            raise
+        finally:
+            job.spool.remove()
+        job.spool = normalized
+
+    def _persist_job(self, job: ChatJob) -> int:
+        """Writes a job to storage. Runs in a worker thread; returns count."""
+        with self.metrics.span("write"):
+            return self._write_job(job)
+
+    def _write_job(self, job: ChatJob) -> int:
+        if job.spool is not None:
+            return self._persist_spool(job)
+
+        if self.incremental:
+            job.appended = self.storage.exists(job.chat_name)
+            return self._save_chat_delta(job.chat_name, job.messages, job.contact_info)
+        self._save_chat_history(job.chat_name, job.messages, job.contact_info)
+        self._update_mark(job.chat_name, job.messages)
+        return len(job.messages)
+
+    def _on_job_done(
+        self, job: ChatJob, saved: Optional[int], error: Optional[Exception]
+    ):
+        if job.spool is not None:
+            job.spool.remove()
+        if error is not None:
+            self._emit("chat_failed", chat=job.chat_name, error=str(error))
+        else:
+            # Appends only save the delta; the manifest keeps the chat's total
+            total = saved
+            entry = self.manifest.chats.get(job.chat_name)
+            if job.appended and entry is not None:
+                total += entry.message_count
+            self._emit("chat_saved", chat=job.chat_name, messages=saved, total=total)
+
+    def _emit(self, event: str, total: Optional[int] = None, **data):
+        chat = data.get("chat")
+        if event == "chat_saved":
+            self.manifest.record(
+                chat,
+                "done",
+                message_count=data["messages"] if total is None else total,
+                output=self.storage.location(chat),
+            )
+        elif event == "chat_failed":
+            self.manifest.record(chat, "failed", detail=data.get("error"))
+        elif event == "chat_skipped" and data.get("reason") != "cached":
+            self.manifest.record(chat, "skipped", detail=data.get("reason"))
+
+        if self.on_progress is not None:
+            self.on_progress(event, data)
+
+    def _header_matches(self, header_text: str, raw_name: str, safe_name: str) -> bool:
+        # Check if the name we clicked is in the header
+        # This is fuzzier but safer than specific span[title]
+        if raw_name in header_text:
+            return True
+        if safe_name in self._sanitize_filename(header_text):
+            return True
+        # Handle group names truncation or partial matches
+        return len(raw_name) > 10 and raw_name[:10] in header_text
+
+    async def _wait(self, label: str, waiter) -> bool:
+        """Awaits a Playwright wait, recording its latency. False on timeout."""
+        started = time.monotonic()
+        try:
+            await waiter
+            resolved = True
+        except PlaywrightTimeoutError:
+            resolved = False
+        self._record_wait(label, time.monotonic() - started, resolved)
+        return resolved
+
+    async def _scroll_and_wait(
+        self,
+        label: str,
+        container: str,
+        watch: str,
+        delta: Optional[int],
+        wait_if_still: bool = False,
+    ) -> Dict[str, bool]:
+        """Scrolls a container and waits until the watched items change."""
+        await self.rate.action()
+        started = time.monotonic()
+        result = await self.page.evaluate(
+            page_scripts.SCROLL_AND_WAIT,
+            {
+                "container": container,
+                "watch": watch,
+                "delta": delta,
+                "timeoutMs": int(self.wait_timeout * 1000),
+                "waitIfStill": wait_if_still,
+            },
+        )
+        self._record_wait(label, time.monotonic() - started, result["changed"])
+        return result
+
+    def _record_wait(self, label: str, latency: float, resolved: bool):
+        stats = self.wait_stats.setdefault(
+            label, {"count": 0, "timeouts": 0, "total": 0.0, "max": 0.0}
+        )
+        stats["count"] += 1
+        stats["timeouts"] += 0 if resolved else 1
+        stats["total"] += latency
+        stats["max"] = max(stats["max"], latency)
+        self.metrics.observe(label, latency, kind="wait")
+        outcome = "resolved" if resolved else "timed out"
+        logger.debug(f"Wait '{label}' {outcome} after {latency:.3f}s")
+
+    def _log_wait_stats(self):
+        for label, stats in self.wait_stats.items():
+            logger.info(
+                f"Wait '{label}': {stats['count']} waits, "
+                f"avg {stats['total'] / stats['count']:.3f}s, "
+                f"max {stats['max']:.3f}s, {stats['timeouts']} timeouts"
+            )
 
-                await self.human_delay(1, 3)
+    async def _contact_info_for(self, row: ChatRow) -> Dict[str, str]:
+        """Returns the open chat's contact info, from the cache when fresh."""
+        key = row.key or row.name
+        if not self.refresh_contacts:
+            cached = self.contact_cache.get(key)
+            if cached is not None:
+                logger.debug(f"Using cached contact info for '{key}'")
+                return cached
+
+        with self.metrics.span("contact_drawer"):
+            info = await self._scrape_contact_info()
+        # An empty name means the drawer failed; try again next run
+        if info["name"]:
+            self.contact_cache.set(key, info)
+        return info
 
     async def _scrape_contact_info(self) -> Dict[str, str]:
         """Opens contact info drawer and scrapes details."""
@@ -337,22 +954,27 @@ class MidoriKage:
             "name": "",
             "phone": "",
             "about": "",
-            "scraped_at": "",  # Could add timestamp
+            "scraped_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
         }
 
         try:
             # Click header to open drawer
             header_click_sel = self._build_selector("header_title_container")
             logger.debug("Clicking header to open contact info...")
+            await self.rate.action()
             # Use first just in case
             await self.page.locator(header_click_sel).first.click()
 
-            # Wait for drawer text "Contact info" or "Group info" or similar?
-            # Or just wait a bit and check for name element.
-            await asyncio.sleep(1.0)  # wait for animation
+            # Wait for the drawer's name element rather than the animation
+            name_sel = self._build_selector("contact_info_name")
+            await self._wait(
+                "contact_drawer_open",
+                self.page.wait_for_selector(
+                    name_sel, state="visible", timeout=self.wait_timeout * 1000
+                ),
+            )
 
             # Extract name
-            name_sel = self._build_selector("contact_info_name")
             if await self.page.locator(name_sel).count() > 0:
                 info["name"] = await self.page.locator(name_sel).first.inner_text()
                 logger.debug(f"Found contact name: {info['name']}")
@@ -365,7 +987,12 @@ class MidoriKage:
             # Close drawer using Escape key (safer/easier)
             logger.debug("Closing contact info drawer with Escape key...")
             await self.page.keyboard.press("Escape")
-            await asyncio.sleep(0.5)
+            await self._wait(
+                "contact_drawer_close",
+                self.page.wait_for_selector(
+                    name_sel, state="hidden", timeout=self.wait_timeout * 1000
+                ),
+            )
 
         except Exception as e:
             logger.error(f"Failed to scrape contact info: {e}")
@@ -384,14 +1011,100 @@ class MidoriKage:
         return safe if safe else "unknown_chat"
 
     def _chat_exists(self, chat_name: str) -> bool:
-        return (self.session_dir.parent / "chats" / f"{chat_name}.json").exists()
+        # In-memory manifest lookup instead of probing the filesystem
+        return self.manifest.is_done(chat_name)
 
     async def _scrape_current_chat(self) -> List[Dict[str, str]]:
         """Scrapes messages from the currently open chat."""
-        msg_selector = self._build_selector("message_bubble")
-        # Give a little time for messages to render
-        await asyncio.sleep(1)
+        await self._wait_for_messages()
+        await self._snapshot_viewport()
+
+        if self.batch_extract:
+            try:
+                return await self._extract_messages_batched()
+            except Exception as e:
+                logger.warning(
+                    f"Batched extraction failed ({e}). Falling back to locators."
+                )
+
+        return await self._extract_messages_per_locator()
+
+    async def _wait_for_messages(self):
+        """Waits until message bubbles of the open chat have rendered."""
+        # Empty chats simply time out after wait_timeout
+        await self._wait(
+            "messages",
+            self.page.wait_for_selector(
+                self._build_selector("message_info"),
+                timeout=self.wait_timeout * 1000,
+            ),
+        )
+
+    async def _snapshot_viewport(self):
+        """Saves the chat panel's HTML as rendered, when snapshotting."""
+        if self.dom_snapshots is None:
+            return
+        with self.metrics.span("snapshot"):
+            html = await self.page.evaluate(
+                page_scripts.OUTER_HTML, self._build_selector("chat_panel")
+            )
+            if html:
+                # Compressing a large chat panel would stall the event loop
+                await asyncio.to_thread(self.dom_snapshots.write, html)
+
+    async def _extract_messages_batched(
+        self, with_keys: bool = False
+    ) -> List[Dict[str, str]]:
+        """Extracts all message bubbles with a single in-page evaluate.
+
+        With ``with_keys`` each message also carries a stable ``key``: its
+        WhatsApp ``data-id`` when rendered, otherwise its content hash.
+        """
+        records = await self.page.evaluate(
+            page_scripts.EXTRACT_MESSAGES,
+            {
+                "bubble": self._build_selector("message_bubble"),
+                "text": self._build_selector("message_text"),
+                "info": self._build_selector("message_info"),
+                "media": (
+                    self._optional_selector("message_media") if self.media else None
+                ),
+            },
+        )
+        logger.debug(f"Found {len(records)} message bubbles.")
+        data = []
+
+        for i, record in enumerate(records):
+            if record is None:
+                logger.debug(f"Msg {i}: Error extracting: ambiguous child selector")
+                continue
+
+            text = record.get("text") or ""
+            info = record.get("info") or ""
+            media = record.get("media") or []
+            if text or info or media:
+                message = {"info": info.strip(), "text": text.strip()}
+                if self.parse_info:
+                    message["direction"] = message_direction(record.get("id"))
+                if media:
+                    # Start downloading now; URLs become hashes on normalize
+                    message["media"] = media
+                    for url in media:
+                        self.media.submit(url)
+                    if not message["info"] and not message["text"] and record.get("id"):
+                        # Nothing else tells media-only messages apart
+                        message["id"] = record["id"]
+                if with_keys:
+                    message["key"] = record.get("id") or message_hash(message)
+                data.append(message)
+            else:
+                logger.debug(f"Msg {i}: Empty text/info. Possibly media/system msg.")
+
+        return data
 
+    async def _extract_messages_per_locator(self) -> List[Dict[str, str]]:
+        """Extracts message bubbles one locator call at a time (slow fallback)."""
+        msg_selector = self._build_selector("message_bubble")
         msgs = await self.page.locator(msg_selector).all()
         logger.debug(f"Found {len(msgs)} message bubbles.")
         data = []
@@ -427,24 +1140,188 @@ class MidoriKage:
 
         return data
 
+    async def _backfill_current_chat(
+        self, chat_name: str, contact_info: Dict
+    ) -> ChatJob:
+        """Scrolls the open chat back through its history into a disk spool.
+
+        Batches are spooled as they arrive, so memory stays flat no matter
+        how long the chat is. In incremental mode scrolling stops at the
+        chat's high-water mark, so only the delta is spooled.
+        """
+        mark = None
+        known = set()
+        if self.incremental and self.storage.exists(chat_name):
+            mark = self._current_mark(chat_name)
+            known = self._stored_hashes(chat_name)
+
+        spool = ReverseSpool(self.chats_dir / f".{chat_name}.spool.jsonl")
+        newest = None
+        try:
+            async for batch in self._iter_history_batches(stop_at=mark, known=known):
+                if newest is None:
+                    newest = batch[-1]
+                spool.append(batch)
+        except Exception:
+            spool.remove()
+            raise
+
+        logger.info(f"Backfilled {spool.message_count} messages.")
+        return ChatJob(
+            chat_name=chat_name, contact_info=contact_info, spool=spool, newest=newest
+        )
+
+    def _persist_spool(self, job: ChatJob) -> int:
+        spool = job.spool
+        try:
+            if self.incremental and self.storage.exists(job.chat_name):
+                job.appended = True
+                if spool.message_count:
+                    self._append_chat_messages(
+                        job.chat_name, list(spool.iter_messages()), job.contact_info
+                    )
+            else:
+                self.storage.write_chat(
+                    job.chat_name, spool.iter_batches(), job.contact_info
+                )
+        finally:
+            spool.remove()
+
+        if job.newest:
+            self._update_mark(job.chat_name, [job.newest])
+        return spool.message_count
+
+    async def _iter_history_batches(
+        self,
+        stop_at: Optional[HighWaterMark] = None,
+        known: AbstractSet[str] = frozenset(),
+    ) -> AsyncIterator[List[Dict[str, str]]]:
+        """Yields batches of messages, newest batch first, while scrolling up.
+
+        Each batch is in chronological order. Messages are deduped by key
+        against the previous viewport snapshot only, since consecutive
+        snapshots are the only ones that can overlap. With ``stop_at``,
+        scrolling stops at the first already-stored message (see
+        ``overlap_end``).
+        """
+        pane_selector = self._build_selector("message_pane")
+        bubble_selector = self._build_selector("message_bubble")
+        await self._wait_for_messages()
+
+        previous_keys = set()
+        total = 0
+        stalled = 0
+        started = time.monotonic()
+
+        while True:
+            await self._snapshot_viewport()
+            messages = await self._extract_messages_batched(with_keys=True)
+            keys = {m["key"] for m in messages}
+            batch = [m for m in messages if m["key"] not in previous_keys]
+            previous_keys = keys
+
+            done = False
+            if stop_at is not None:
+                end = overlap_end(batch, stop_at, known)
+                if end is not None:
+                    batch = batch[end:]
+                    done = True
+
+            if self.backfill_until is not None:
+                kept = [
+                    m
+                    for m in batch
+                    if (parse_info_date(m["info"]) or self.backfill_until)
+                    >= self.backfill_until
+                ]
+                done = done or len(kept) < len(batch)
+                batch = kept
+
+            if self.backfill_depth is not None:
+                remaining = self.backfill_depth - total
+                if len(batch) >= remaining:
+                    batch = batch[len(batch) - remaining :] if remaining > 0 else []
+                    done = True
+
+            if batch:
+                stalled = 0
+                total += len(batch)
+                for m in batch:
+                    del m["key"]
+                elapsed = max(time.monotonic() - started, 1e-6)
+                logger.info(f"Backfill: {total} messages ({total / elapsed:.1f} msg/s)")
+                yield batch
+            else:
+                stalled += 1
+
+            if done:
+                break
+
+            # Jumping to the top makes WhatsApp load the previous page
+            scrolled = await self._scroll_and_wait(
+                "message_pane_scroll",
+                pane_selector,
+                bubble_selector,
+                None,
+                wait_if_still=True,
+            )
+            if not scrolled["moved"] and (not scrolled["changed"] or stalled >= 3):
+                logger.info("Reached start of chat history.")
+                break
+
     def _save_chat_history(
         self, chat_name: str, messages: List[Dict], contact_info: Dict = None
     ):
-        """Saves chat messages and metadata to a JSON file."""
-        chats_dir = Path("chats")
-        chats_dir.mkdir(exist_ok=True)
-
-        data = {
-            "chat_name": chat_name,
-            "contact_info": contact_info or {},
-            "messages": messages,
-        }
+        """Saves chat messages and metadata through the storage backend."""
+        self.storage.write_chat(chat_name, [messages], contact_info)
+
+    def _save_chat_delta(
+        self, chat_name: str, messages: List[Dict], contact_info: Dict = None
+    ) -> int:
+        """Appends only the messages newer than the chat's high-water mark.
+
+        Returns the number of messages written.
+        """
+        if not self.storage.exists(chat_name):
+            self._save_chat_history(chat_name, messages, contact_info)
+            self._update_mark(chat_name, messages)
+            return len(messages)
+
+        new_messages = messages_after(
+            messages, self._current_mark(chat_name), self._stored_hashes(chat_name)
+        )
+        if not new_messages:
+            logger.info(f"No new messages in '{chat_name}'.")
+            return 0
+
+        self._append_chat_messages(chat_name, new_messages, contact_info)
+        self._update_mark(chat_name, new_messages)
+        return len(new_messages)
+
+    def _append_chat_messages(
+        self, chat_name: str, new_messages: List[Dict], contact_info: Dict = None
+    ):
+        logger.info(f"Appending {len(new_messages)} new messages to '{chat_name}'.")
+        self.storage.append_messages(chat_name, new_messages, contact_info)
+
+    def _current_mark(self, chat_name: str) -> Optional[HighWaterMark]:
+        # Chats archived before incremental mode have no stored mark yet
+        return self.marks.get(chat_name) or mark_for(self.storage.tail(chat_name))
+
+    def _stored_hashes(self, chat_name: str) -> Set[str]:
+        # Fallback when the marked message was deleted or edited since
+        return {message_hash(m) for m in self.storage.tail(chat_name, STORED_TAIL)}
 
-        file_path = chats_dir / f"{chat_name}.json"
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+    def _update_mark(self, chat_name: str, messages: List[Dict]):
+        mark = mark_for(messages)
+        if mark:
+            self.marks.set(chat_name, mark)
 
     async def close(self):
+        self.contact_cache.log_summary()
+        self.rate.log_summary()
+        if self.resource_blocker:
+            self.resource_blocker.log_summary()
         if self.context:
             await self.context.close()
         # if self.browser:
@@ -0,0 +1,256 @@
+import gzip
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from midori_kage.config import build_selector
+from midori_kage.incremental import STORED_TAIL, message_hash
+from midori_kage.parsing import InfoParser, message_direction
+from midori_kage.storage import ChatStorage
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:  # Only needed for reextract: pip install beautifulsoup4
+    BeautifulSoup = None
+
+SNAPSHOT_SUFFIX = ".html.jsonl.gz"
+# lxml parses several times faster when installed
+HTML_PARSER = "lxml" if find_spec("lxml") else "html.parser"
+
+
+def snapshot_path(root: Path, chat_name: str) -> Path:
+    return root / f"{chat_name}{SNAPSHOT_SUFFIX}"
+
+
+class SnapshotWriter:
+    """Saves the chat panel's HTML once per viewport while a chat is scraped.
+
+    One gzipped JSONL file per chat holding one or more visits: a header
+    line with the chat name and contact info, then one ``{"viewport",
+    "html"}`` line per viewport, newest first when backfilling. Written to
+    a temporary file that is moved into place on ``close`` or dropped on
+    ``discard``, so a failed visit never replaces the previous snapshot.
+
+    With ``delta``, for incremental visits that only see what's new, the
+    visit is instead appended to the existing file as another gzip member
+    and ``reextract_file`` merges it onto the visits before it.
+    """
+
+    def __init__(
+        self, root: Path, chat_name: str, contact_info: Dict, delta: bool = False
+    ):
+        self.path = snapshot_path(root, chat_name)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.delta = delta
+        self._tmp_path = self.path.with_name(self.path.name + ".tmp")
+        self._file = gzip.open(self._tmp_path, "wt", encoding="utf-8")
+        self.viewports = 0
+        self._write_line(
+            {
+                "chat": chat_name,
+                "contact_info": contact_info,
+                "captured_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "delta": delta,
+            }
+        )
+
+    def _write_line(self, record: Dict):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def write(self, html: str):
+        self._write_line({"viewport": self.viewports, "html": html})
+        self.viewports += 1
+
+    def close(self):
+        self._file.close()
+        if not self.delta:
+            os.replace(self._tmp_path, self.path)
+            return
+        with open(self._tmp_path, "rb") as src, open(self.path, "ab") as dst:
+            shutil.copyfileobj(src, dst)
+            dst.flush()
+            os.fsync(dst.fileno())
+        self._tmp_path.unlink()
+
+    def discard(self):
+        self._file.close()
+        self._tmp_path.unlink(missing_ok=True)
+
+
+def read_snapshot(path: Path) -> List[Tuple[Dict, List[str]]]:
+    """Returns a snapshot file's visits as (header, viewports' HTML) pairs.
+
+    A visit torn by a crash while it was appended is dropped, with the
+    ones after it.
+    """
+    visits = []
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                if "viewport" in record:
+                    visits[-1][1].append(record["html"])
+                else:
+                    visits.append((record, []))
+    except (EOFError, gzip.BadGzipFile, json.JSONDecodeError):
+        logger.warning(f"Skipping torn last visit in {path}")
+        visits = visits[:-1]
+    return visits
+
+
+def _single(root, selector: str):
+    # Same rule as EXTRACT_MESSAGES: an ambiguous child drops the bubble
+    found = root.select(selector, limit=2)
+    if len(found) > 1:
+        raise ValueError("strict")
+    return found[0] if found else None
+
+
+def _inner_text(element) -> str:
+    for br in element.find_all("br"):
+        br.replace_with("\n")
+    return element.get_text()
+
+
+def _message_id(bubble) -> Optional[str]:
+    if bubble.has_attr("data-id"):
+        return bubble["data-id"]
+    holder = bubble.find_parent(attrs={"data-id": True}) or bubble.find(
+        attrs={"data-id": True}
+    )
+    return holder["data-id"] if holder else None
+
+
+def extract_messages(
+    html: str, selectors: Dict[str, Dict[str, str]], parser: str = HTML_PARSER
+) -> List[Dict[str, str]]:
+    """Extracts a viewport's messages from its HTML, like the batched path.
+
+    Every message carries a ``key``, its ``data-id`` or content hash, and
+    ``id``, the raw ``data-id``. Media URLs are not kept: they point into
+    the closed browser session.
+    """
+    if BeautifulSoup is None:
+        raise RuntimeError(
+            "Re-extracting needs beautifulsoup4: pip install beautifulsoup4"
+        )
+
+    soup = BeautifulSoup(html, parser)
+    bubble_sel = build_selector(selectors, "message_bubble")
+    text_sel = build_selector(selectors, "message_text")
+    info_sel = build_selector(selectors, "message_info")
+
+    messages = []
+    for bubble in soup.select(bubble_sel):
+        try:
+            text_el = _single(bubble, text_sel)
+            info_el = _single(bubble, info_sel)
+        except ValueError:
+            continue
+        text = _inner_text(text_el) if text_el else ""
+        info = (info_el.get("data-pre-plain-text") or "") if info_el else ""
+        if not (text or info):
+            continue
+        message = {"info": info.strip(), "text": text.strip()}
+        message_id = _message_id(bubble)
+        message["key"] = message_id or message_hash(message)
+        message["id"] = message_id
+        messages.append(message)
+    return messages
+
+
+def merge_visit(messages: List[Dict], delta: List[Dict]) -> List[Dict]:
+    """Appends the messages of an incremental visit that come after the
+    newest one already in ``messages``, matched by key."""
+    known = {m["key"] for m in messages[-STORED_TAIL:]}
+    for i in range(len(delta) - 1, -1, -1):
+        if delta[i]["key"] in known:
+            return messages + delta[i + 1 :]
+    return messages + delta
+
+
+def merge_viewports(viewports: List[List[Dict]]) -> List[Dict[str, str]]:
+    """Joins viewports captured newest first into one chronological list,
+    deduping each against the viewport before it as backfill does."""
+    batches = []
+    previous_keys = set()
+    for messages in viewports:
+        batches.append([m for m in messages if m["key"] not in previous_keys])
+        previous_keys = {m["key"] for m in messages}
+    return [m for batch in reversed(batches) for m in batch]
+
+
+def reextract_file(
+    path: Path,
+    selectors: Dict[str, Dict[str, str]],
+    parse_info: bool = False,
+    locale: str = "en-US",
+) -> Tuple[str, Dict, List[Dict]]:
+    """Re-runs extraction over one snapshot file. Runs in worker processes."""
+    visits = read_snapshot(path)
+    if not visits:
+        raise ValueError("no complete visit")
+    messages = []
+    for header, pages in visits:
+        visit = merge_viewports([extract_messages(html, selectors) for html in pages])
+        messages = merge_visit(messages, visit) if header.get("delta") else visit
+    for message in messages:
+        message_id = message.pop("id")
+        del message["key"]
+        if parse_info:
+            message["direction"] = message_direction(message_id)
+    if parse_info:
+        InfoParser(locale).parse_batch(messages)
+    return header["chat"], header.get("contact_info") or {}, messages
+
+
+def snapshot_files(root: Path) -> List[Path]:
+    return sorted(root.glob(f"*{SNAPSHOT_SUFFIX}"))
+
+
+def reextract_archive(
+    root: Path,
+    storage: ChatStorage,
+    selectors: Dict[str, Dict[str, str]],
+    workers: Optional[int] = None,
+    parse_info: bool = False,
+    locale: str = "en-US",
+) -> int:
+    """Re-extracts every snapshot in ``root`` in parallel into ``storage``.
+
+    Parsing runs in a process pool; chats are saved from this process as
+    they finish, so storage backends never see concurrent writers.
+    Returns the number of chats saved.
+    """
+    if BeautifulSoup is None:
+        raise RuntimeError(
+            "Re-extracting needs beautifulsoup4: pip install beautifulsoup4"
+        )
+
+    paths = snapshot_files(root)
+    saved = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(reextract_file, path, selectors, parse_info, locale): path
+            for path in paths
+        }
+        for future in as_completed(futures):
+            try:
+                chat, contact_info, messages = future.result()
+            except Exception as e:
+                logger.error(f"Failed to re-extract {futures[future].name}: {e}")
+                continue
+            storage.write_chat(chat, [messages], contact_info)
+            saved += 1
+            logger.info(
+                f"Re-extracted '{chat}': {len(messages)} messages "
+                f"({saved}/{len(paths)})"
+            )
+    return saved
@@ -0,0 +1,283 @@
+import json
+import os
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from loguru import logger
+
+Message = Dict[str, str]
+
+
+def _indent(text: str, spaces: int) -> str:
+    # Not splitlines(): it also splits on U+2028 and friends, which json
+    # leaves unescaped inside strings. Real newlines are always escaped.
+    pad = " " * spaces
+    return pad + text.replace("\n", "\n" + pad)
+
+
+def _fsync(f):
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def _atomic_write_json(path: Path, data: Dict):
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+        _fsync(f)
+    os.replace(tmp_path, path)
+
+
+class ChatStorage:
+    """Base class for chat archive backends.
+
+    Every backend stores one chat as ``{chat_name, contact_info, messages}``
+    and hands it back in that shape from ``load_chat``.
+    """
+
+    def __init__(self, chats_dir: Path):
+        self.chats_dir = Path(chats_dir)
+
+    def exists(self, chat_name: str) -> bool:
+        raise NotImplementedError
+
+    def write_chat(
+        self,
+        chat_name: str,
+        batches: Iterable[List[Message]],
+        contact_info: Dict = None,
+    ):
+        """Replaces a chat with the given chronological message batches."""
+        raise NotImplementedError
+
+    def append_messages(
+        self, chat_name: str, messages: List[Message], contact_info: Dict = None
+    ):
+        """Appends messages to an existing chat."""
+        raise NotImplementedError
+
+    def load_chat(self, chat_name: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def tail(self, chat_name: str, count: int = 1) -> List[Message]:
+        """Returns the last ``count`` messages of a chat."""
+        chat = self.load_chat(chat_name)
+        return chat["messages"][-count:] if chat else []
+
+    def chat_names(self) -> List[str]:
+        raise NotImplementedError
+
+    def location(self, chat_name: str) -> str:
+        """Where the chat is stored, for manifests and reports."""
+        raise NotImplementedError
+
+
+class JsonStorage(ChatStorage):
+    """One pretty-printed ``<chat>.json`` file per chat (the original format)."""
+
+    def _path(self, chat_name: str) -> Path:
+        return self.chats_dir / f"{chat_name}.json"
+
+    def exists(self, chat_name: str) -> bool:
+        return self._path(chat_name).exists()
+
+    def location(self, chat_name: str) -> str:
+        return str(self._path(chat_name))
+
+    def write_chat(self, chat_name, batches, contact_info=None):
+        self.chats_dir.mkdir(parents=True, exist_ok=True)
+
+        header = json.dumps(
+            {"chat_name": chat_name, "contact_info": contact_info or {}},
+            ensure_ascii=False,
+            indent=2,
+        )
+        file_path = self._path(chat_name)
+        tmp_path = file_path.with_name(file_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            # Reopen the header object to splice in the messages array, so
+            # batches can be written as they come and match json.dump output
+            f.write(header[: header.rindex("}")].rstrip() + ',\n  "messages": [')
+            first = True
+            for batch in batches:
+                for message in batch:
+                    body = json.dumps(message, ensure_ascii=False, indent=2)
+                    f.write(("\n" if first else ",\n") + _indent(body, 4))
+                    first = False
+            f.write("]\n}" if first else "\n  ]\n}")
+            _fsync(f)
+        os.replace(tmp_path, file_path)
+
+    def append_messages(self, chat_name, messages, contact_info=None):
+        existing = self.load_chat(chat_name) or {"messages": []}
+        self.write_chat(
+            chat_name,
+            [existing["messages"], messages],
+            contact_info or existing.get("contact_info"),
+        )
+
+    def load_chat(self, chat_name):
+        file_path = self._path(chat_name)
+        if not file_path.exists():
+            return None
+        with open(file_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def chat_names(self):
+        if not self.chats_dir.exists():
+            return []
+        return sorted(
+            p.stem
+            for p in self.chats_dir.glob("*.json")
+            if not p.name.startswith(".") and not p.name.endswith(".meta.json")
+        )
+
+
+class JsonlStorage(ChatStorage):
+    """Append-only ``<chat>.jsonl`` files with a ``<chat>.meta.json`` sidecar.
+
+    Full writes go to a temporary file that is renamed into place; appends
+    are fsynced every ``checkpoint_every`` batches. A torn last line left by
+    a crash is skipped on read. Chats still in the original ``.json`` format
+    are read through the same API.
+    """
+
+    def __init__(self, chats_dir: Path, checkpoint_every: int = 10):
+        super().__init__(chats_dir)
+        self.checkpoint_every = checkpoint_every
+        self._legacy = JsonStorage(chats_dir)
+
+    def _path(self, chat_name: str) -> Path:
+        return self.chats_dir / f"{chat_name}.jsonl"
+
+    def _meta_path(self, chat_name: str) -> Path:
+        return self.chats_dir / f"{chat_name}.meta.json"
+
+    def exists(self, chat_name: str) -> bool:
+        return self._path(chat_name).exists() or self._legacy.exists(chat_name)
+
+    def location(self, chat_name: str) -> str:
+        if self._legacy.exists(chat_name) and not self._path(chat_name).exists():
+            return self._legacy.location(chat_name)
+        return str(self._path(chat_name))
+
+    def _write_meta(self, chat_name: str, contact_info: Dict):
+        _atomic_write_json(
+            self._meta_path(chat_name),
+            {"chat_name": chat_name, "contact_info": contact_info or {}},
+        )
+
+    def _write_batches(self, f, batches: Iterable[List[Message]]):
+        for i, batch in enumerate(batches, start=1):
+            f.writelines(
+                json.dumps(message, ensure_ascii=False) + "\n" for message in batch
+            )
+            if i % self.checkpoint_every == 0:
+                _fsync(f)
+        _fsync(f)
+
+    def write_chat(self, chat_name, batches, contact_info=None):
+        self.chats_dir.mkdir(parents=True, exist_ok=True)
+        file_path = self._path(chat_name)
+        tmp_path = file_path.with_name(file_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            self._write_batches(f, batches)
+        self._write_meta(chat_name, contact_info)
+        os.replace(tmp_path, file_path)
+
+    def append_messages(self, chat_name, messages, contact_info=None):
+        if not self._path(chat_name).exists():
+            # Migrate a legacy chat on first append
+            legacy = self._legacy.load_chat(chat_name)
+            if legacy is not None:
+                self.write_chat(
+                    chat_name,
+                    [legacy["messages"], messages],
+                    contact_info or legacy.get("contact_info"),
+                )
+                return
+
+        self.chats_dir.mkdir(parents=True, exist_ok=True)
+        file_path = self._path(chat_name)
+        torn = False
+        if file_path.exists() and file_path.stat().st_size:
+            with open(file_path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                torn = f.read(1) != b"\n"
+        with open(file_path, "a", encoding="utf-8") as f:
+            if torn:
+                f.write("\n")  # Keep a crashed partial line from eating ours
+            self._write_batches(f, [messages])
+        if contact_info or not self._meta_path(chat_name).exists():
+            self._write_meta(chat_name, contact_info)
+
+    def _iter_messages(self, file_path: Path):
+        with open(file_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping torn line in {file_path}")
+
+    def load_chat(self, chat_name):
+        file_path = self._path(chat_name)
+        if not file_path.exists():
+            return self._legacy.load_chat(chat_name)
+
+        meta = {"chat_name": chat_name, "contact_info": {}}
+        if self._meta_path(chat_name).exists():
+            with open(self._meta_path(chat_name), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        return {**meta, "messages": list(self._iter_messages(file_path))}
+
+    def tail(self, chat_name, count=1):
+        file_path = self._path(chat_name)
+        if not file_path.exists():
+            return self._legacy.tail(chat_name, count)
+        # Read backwards from the end so cost doesn't grow with history
+        with open(file_path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            chunk = b""
+            while position > 0 and chunk.count(b"\n") <= count:
+                step = min(position, 64 * 1024)
+                position -= step
+                f.seek(position)
+                chunk = f.read(step) + chunk
+
+        messages = deque(maxlen=count)
+        lines = chunk.splitlines()
+        if position > 0:
+            lines = lines[1:]  # First line may be cut mid-way
+        for line in lines:
+            try:
+                messages.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+        return list(messages)
+
+    def chat_names(self):
+        # Dot-files are sidecars, e.g. backfill spools left by a crash
+        names = {
+            p.stem for p in self.chats_dir.glob("*.jsonl") if not p.name.startswith(".")
+        }
+        return sorted(names | set(self._legacy.chat_names()))
+
+
+STORAGE_BACKENDS = {
+    "json": JsonStorage,
+    "jsonl": JsonlStorage,
+}
+
+
+def open_storage(kind: str, chats_dir: Path) -> ChatStorage:
+    """Creates the storage backend registered under ``kind``."""
+    if kind == "sqlite":
+        # Imported lazily, the archive module builds on this one
+        from midori_kage.archive import SqliteStorage
+
+        return SqliteStorage(chats_dir)
+    if kind not in STORAGE_BACKENDS:
+        raise ValueError(f"Unknown storage backend '{kind}'")
+    return STORAGE_BACKENDS[kind](chats_dir)
@@ -0,0 +1,54 @@
+from datetime import datetime
+
+from midori_kage.archive import SqliteStorage, import_chats_dir
+from midori_kage.storage import JsonStorage
+
+
+def _messages():
+    return [
+        {"info": "[9:00 AM, 1/30/2024] Alice: ", "text": "Please send the invoice"},
+        {"info": "[10:15 AM, 1/31/2024] Bob: ", "text": "Invoice attached"},
+        {"info": "[8:00 PM, 2/2/2024] Alice: ", "text": "Thanks!", "key": "x"},
+    ]
+
+
+def test_round_trip_and_append(tmp_path):
+    archive = SqliteStorage(tmp_path)
+    archive.write_chat("Alice", [_messages()[:2]], {"name": "Alice", "about": "hi"})
+    archive.append_messages("Alice", _messages()[2:])
+
+    chat = archive.load_chat("Alice")
+    assert chat["messages"] == _messages()
+    assert chat["contact_info"]["about"] == "hi"
+    assert archive.tail("Alice") == _messages()[2:]
+    assert archive.exists("Alice") and not archive.exists("Bob")
+
+
+def test_search_and_range(tmp_path):
+    archive = SqliteStorage(tmp_path)
+    archive.write_chat("Alice", [_messages()])
+
+    hits = archive.search("invoice")
+    assert {hit["text"] for hit in hits} == {
+        "Please send the invoice",
+        "Invoice attached",
+    }
+
+    # Punctuation in plain terms is searched literally
+    assert archive.search("don't") == [] and archive.search("e-mail") == []
+    assert len(archive.search('invoice OR "send the"')) == 2
+    assert len(archive.search("invo*")) == 2
+    assert archive.search("invoice", chat_name="Bob") == []
+
+    rows = archive.messages_between(
+        "Alice", since=datetime(2024, 1, 31), until=datetime(2024, 2, 1)
+    )
+    assert [row["text"] for row in rows] == ["Invoice attached"]
+    assert rows[0]["sent_at"] == "2024-01-31T10:15:00"
+
+
+def test_import_chats_dir(tmp_path):
+    JsonStorage(tmp_path).write_chat("Alice", [_messages()], {"name": "Alice"})
+
+    assert import_chats_dir(tmp_path) == 1
+    assert SqliteStorage(tmp_path).load_chat("Alice")["messages"] == _messages()
@@ -0,0 +1,13 @@
+from midori_kage.backfill import ReverseSpool
+
+
+def test_reverse_spool_replays_batches_oldest_first(tmp_path):
+    spool = ReverseSpool(tmp_path / "spool.jsonl")
+    spool.append([{"text": "3"}, {"text": "4"}])
+    spool.append([{"text": "1"}, {"text": "2"}])
+
+    assert [m["text"] for m in spool.iter_messages()] == ["1", "2", "3", "4"]
+    assert spool.message_count == 4
+
+    spool.remove()
+    assert not (tmp_path / "spool.jsonl").exists()
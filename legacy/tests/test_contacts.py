@@ -0,0 +1,102 @@
+import json
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from midori_kage.contacts import ContactInfoCache, ContactRecord, guess_phone
+from midori_kage.scraper import ChatRow, MidoriKage
+from midori_kage.storage import JsonlStorage
+
+
+def test_rows_become_contacts_and_groups():
+    contact = ContactRecord.from_row(
+        {"key": "+1 555 0100", "name": "+1 555 0100", "about": "Hey there!"}
+    )
+    group = ContactRecord.from_row(
+        {
+            "key": "Family",
+            "name": "Family",
+            "about": "Alice, Bob, You",
+            "is_group": True,
+        }
+    )
+
+    assert contact.phone == "+1 555 0100"
+    assert contact.about == "Hey there!"
+    assert group.members == ["Alice", "Bob", "You"]
+    assert guess_phone("Alice") == ""
+    assert guess_phone("2024") == ""
+
+
+@pytest.mark.asyncio
+async def test_sweep_dedupes_rows_across_scrolls_and_links_groups(tmp_path):
+    with patch("midori_kage.scraper.async_playwright"):
+        scraper = MidoriKage(headless=True, chats_dir=str(tmp_path))
+    scraper.page = MagicMock()
+    scraper.page.locator.return_value.first.click = AsyncMock()
+    scraper.page.wait_for_selector = AsyncMock()
+    scraper.page.keyboard.press = AsyncMock()
+
+    alice = {"key": "Alice", "name": "Alice", "about": "Busy"}
+    bob = {"key": "Bob", "name": "Bob", "about": ""}
+    family = {
+        "key": "Family",
+        "name": "Family",
+        "about": "Alice, You",
+        "is_group": True,
+    }
+    # The list grows twice, then stops changing
+    snapshots = iter([[alice, bob], [bob, family]] + [[family]] * 3)
+    changes = iter([True, True] + [False] * 3)
+    scraper._snapshot_contacts = AsyncMock(side_effect=lambda *a: next(snapshots))
+    scraper._scroll_and_wait = AsyncMock(
+        side_effect=lambda *a: {"changed": next(changes)}
+    )
+
+    count = await scraper.scrape_contacts()
+
+    lines = (tmp_path / "contacts" / "contacts.jsonl").read_text().splitlines()
+    records = {r["name"]: r for r in map(json.loads, lines)}
+    assert count == 3 and len(lines) == 3
+    assert records["Alice"]["groups"] == ["Family"]
+    assert records["Bob"]["groups"] == []
+    assert records["Family"]["members"] == ["Alice", "You"]
+    scraper.page.keyboard.press.assert_awaited_with("Escape")
+    # Kept out of the chat namespace of every storage backend
+    assert JsonlStorage(tmp_path).chat_names() == []
+
+
+def test_contact_info_cache_expires_and_persists(tmp_path):
+    path = tmp_path / ".contact_info.json"
+    fetched = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    cache = ContactInfoCache(path, ttl=timedelta(hours=24))
+    cache.set("Alice", {"name": "Alice", "about": "Hi"}, now=fetched)
+    assert not path.exists()  # Saved at the next checkpoint
+    cache.checkpoint()
+
+    reloaded = ContactInfoCache(path, ttl=timedelta(hours=24))
+    assert reloaded.get("Alice", now=fetched + timedelta(hours=23)) == {
+        "name": "Alice",
+        "about": "Hi",
+    }
+    assert reloaded.get("Alice", now=fetched + timedelta(hours=25)) is None
+    assert reloaded.get("Bob") is None
+    assert (reloaded.hits, reloaded.misses) == (1, 2)
+
+
+@pytest.mark.asyncio
+async def test_drawer_is_only_opened_for_missing_entries(tmp_path):
+    with patch("midori_kage.scraper.async_playwright"):
+        scraper = MidoriKage(headless=True, chats_dir=str(tmp_path))
+    info = {"name": "Alice", "phone": "", "about": "Hi", "scraped_at": ""}
+    scraper._scrape_contact_info = AsyncMock(return_value=info)
+    row = ChatRow(index=0, name="Alice", key="Alice")
+
+    assert await scraper._contact_info_for(row) == info
+    assert await scraper._contact_info_for(row) == info
+    assert scraper._scrape_contact_info.await_count == 1
+
+    scraper.refresh_contacts = True
+    await scraper._contact_info_for(row)
+    assert scraper._scrape_contact_info.await_count == 2
@@ -0,0 +1,57 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from midori_kage import client
+from midori_kage.daemon import MidoriDaemon
+
+
+def fake_scraper():
+    scraper = MagicMock()
+    scraper.start = AsyncMock()
+    scraper.close = AsyncMock()
+
+    async def scrape_chats(limit):
+        for name in ("Alice", "Bob")[:limit]:
+            scraper.on_progress("chat_saved", {"chat": name, "messages": 1})
+
+    scraper.scrape_chats = AsyncMock(side_effect=scrape_chats)
+    scraper.scrape_chat = AsyncMock(side_effect=RuntimeError("browser gone"))
+    return scraper
+
+
+@pytest.mark.asyncio
+async def test_jobs_run_in_order_over_the_socket(tmp_path):
+    scraper = fake_scraper()
+    socket_path = tmp_path / "daemon.sock"
+    daemon = MidoriDaemon(scraper, socket_path)
+    serving = asyncio.create_task(daemon.serve())
+    while not socket_path.exists():
+        await asyncio.sleep(0.01)
+
+    def call(payload):
+        return asyncio.to_thread(client.request, socket_path, payload)
+
+    first = await call({"op": "submit", "kind": "scrape_chats", "params": {"limit": 2}})
+    second = await call(
+        {"op": "submit", "kind": "scrape_chat", "params": {"name": "X"}}
+    )
+    bad = await call({"op": "submit", "kind": "format_disk"})
+
+    done = await asyncio.to_thread(
+        client.wait_for_job, socket_path, second["job"]["id"], 0.01, 5
+    )
+    status = await call({"op": "status", "id": first["job"]["id"]})
+    listing = await call({"op": "list"})
+    await call({"op": "shutdown"})
+    await serving
+
+    assert status["job"]["status"] == "done"
+    assert status["job"]["result"] == {"saved": ["Alice", "Bob"]}
+    assert done["status"] == "failed" and done["error"] == "browser gone"
+    assert not bad["ok"]
+    assert [j["id"] for j in listing["jobs"]] == ["1", "2"]
+    scraper.start.assert_awaited_once()
+    scraper.close.assert_awaited_once()
+    assert not socket_path.exists()
@@ -0,0 +1,55 @@
+from datetime import datetime
+
+import pytest
+
+from midori_kage.export import export_chats
+from midori_kage.storage import JsonlStorage
+
+pa = pytest.importorskip("pyarrow")
+ds = pytest.importorskip("pyarrow.dataset")
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_export_partitions_by_year_with_typed_columns(tmp_path, fmt):
+    storage = JsonlStorage(tmp_path / "chats")
+    storage.write_chat(
+        "Alice",
+        [
+            [
+                {"info": "[11:59 PM, 12/31/2023] Alice:", "text": "old"},
+                {
+                    "info": "[12:01 AM, 1/1/2024] You:",
+                    "text": "new",
+                    "direction": "out",
+                    "media": [{"sha256": "ab" * 32, "mime": "image/jpeg"}],
+                },
+            ]
+        ],
+        {"name": "Alice"},
+    )
+
+    rows = export_chats(storage, tmp_path / "out", fmt=fmt)
+
+    assert rows == 2
+    assert {p.name for p in (tmp_path / "out").iterdir()} == {
+        "year=2023",
+        "year=2024",
+    }
+    table = (
+        ds.dataset(
+            tmp_path / "out",
+            format="parquet" if fmt == "parquet" else "ipc",
+            partitioning="hive",
+        )
+        .to_table()
+        .sort_by("seq")
+    )
+    # Parquet has no seconds unit and stores milliseconds
+    assert pa.types.is_timestamp(table.schema.field("sent_at").type)
+    assert table.column("sent_at").to_pylist() == [
+        datetime(2023, 12, 31, 23, 59),
+        datetime(2024, 1, 1, 0, 1),
+    ]
+    assert table.column("sender").to_pylist() == ["Alice", "You"]
+    assert table.column("direction").to_pylist() == [None, "out"]
+    assert table.column("media").to_pylist() == [None, ["ab" * 32]]
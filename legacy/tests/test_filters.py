@@ -0,0 +1,71 @@
+from datetime import date
+
+from midori_kage.filters import (
+    ChatFilter,
+    FilterConfig,
+    FilterRule,
+    parse_last_activity,
+)
+from midori_kage.scraper import ChatRow
+
+TODAY = date(2024, 3, 14)  # A Thursday
+
+
+def row(name: str, **fields) -> ChatRow:
+    return ChatRow(index=0, name=name, key=name, **fields)
+
+
+def test_parse_last_activity_handles_relative_labels():
+    assert parse_last_activity("10:32 AM", TODAY) == TODAY
+    assert parse_last_activity("Yesterday", TODAY) == date(2024, 3, 13)
+    assert parse_last_activity("Monday", TODAY) == date(2024, 3, 11)
+    assert parse_last_activity("Thursday", TODAY) == date(2024, 3, 7)
+    assert parse_last_activity("1/31/2024", TODAY) == date(2024, 1, 31)
+    assert parse_last_activity("", TODAY) is None
+    assert parse_last_activity("typing...", TODAY) is None
+
+
+def test_default_filter_skips_groups_and_ignored_names():
+    chat_filter = ChatFilter(ignored=["Marketing Bot"])
+
+    assert chat_filter.excludes_groups
+    assert chat_filter.skip_reason(row("Family", group=True)) == (
+        "filtered (group=True)"
+    )
+    assert chat_filter.skip_reason(row("Marketing Bot")) == "ignored"
+    assert chat_filter.skip_reason(row("Alice")) is None
+
+
+def test_skip_rules_match_all_their_fields():
+    config = FilterConfig(
+        skip=[
+            FilterRule(name="*Bot"),
+            FilterRule(regex=r"^\+1 ?555"),
+            FilterRule(muted=True, last_activity_before=date(2024, 1, 1)),
+        ]
+    )
+    chat_filter = ChatFilter(config)
+
+    assert not chat_filter.excludes_groups
+    assert chat_filter.skip_reason(row("Weather Bot"), TODAY)
+    assert chat_filter.skip_reason(row("+1 555 0100"), TODAY)
+    assert chat_filter.skip_reason(row("Old", muted=True, last_activity="12/1/2023"))
+    # Muted but recent, or old but not muted
+    assert not chat_filter.skip_reason(
+        row("Recent", muted=True, last_activity="Yesterday"), TODAY
+    )
+    assert not chat_filter.skip_reason(row("Old", last_activity="12/1/2023"), TODAY)
+    # Unreadable timestamps never match activity rules
+    assert not chat_filter.skip_reason(row("X", muted=True), TODAY)
+
+
+def test_only_rules_whitelist_chats():
+    config = FilterConfig(only=[FilterRule(pinned=True), FilterRule(unread=True)])
+    chat_filter = ChatFilter(config)
+
+    assert chat_filter.skip_reason(row("Pinned", pinned=True)) is None
+    assert chat_filter.skip_reason(row("Unread", unread=True)) is None
+    assert chat_filter.skip_reason(row("Quiet")) == (
+        "filtered (no 'only' rule matched)"
+    )
+    assert ChatFilter(FilterConfig(only=[FilterRule(group=False)])).excludes_groups
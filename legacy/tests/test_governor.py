@@ -0,0 +1,95 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from midori_kage.governor import MemoryGovernor
+from midori_kage.ratelimit import RateScheduler
+from midori_kage.scraper import ChatRow, MidoriKage
+
+
+def fake_page(heap_mb):
+    session = MagicMock()
+    session.send = AsyncMock(
+        side_effect=lambda method: (
+            {"metrics": [{"name": "JSHeapUsedSize", "value": heap_mb * 1024 * 1024}]}
+            if method == "Performance.getMetrics"
+            else {}
+        )
+    )
+    page = MagicMock()
+    page.context.new_cdp_session = AsyncMock(return_value=session)
+    return page
+
+
+@pytest.mark.asyncio
+async def test_heap_over_limit_recycles_page_then_context():
+    governor = MemoryGovernor(max_heap_mb=100)
+
+    assert await governor.check(fake_page(50)) is None
+    assert await governor.check(fake_page(150)) == "page"
+    # Still too big on the fresh page: restart the context
+    assert await governor.check(fake_page(150)) == "context"
+    assert await governor.check(fake_page(150)) == "page"
+    assert governor.recycles == {"page": 2, "context": 1}
+
+
+@pytest.mark.asyncio
+async def test_rss_over_limit_restarts_context(monkeypatch):
+    governor = MemoryGovernor(max_rss_mb=500, check_every=2)
+    monkeypatch.setattr(governor, "_rss_mb", lambda: 800.0)
+    page = fake_page(10)
+
+    assert await governor.check(page) is None  # not sampled yet
+    assert await governor.check(page) == "context"
+    # The CDP session is reused for the same page
+    assert page.context.new_cdp_session.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_unreadable_metrics_never_recycle():
+    page = MagicMock()
+    page.context.new_cdp_session = AsyncMock(side_effect=RuntimeError("no CDP"))
+    governor = MemoryGovernor(max_heap_mb=1)
+
+    assert await governor.check(page) is None
+
+
+@pytest.mark.asyncio
+async def test_page_recycle_closes_the_old_tab_before_loading_whatsapp():
+    with patch("midori_kage.scraper.async_playwright"):
+        scraper = MidoriKage(headless=True)
+    calls = []
+    old_page, new_page = MagicMock(), MagicMock()
+    old_page.close = AsyncMock(side_effect=lambda: calls.append("close old"))
+    scraper.page = old_page
+    scraper.context = MagicMock()
+    scraper.context.new_page = AsyncMock(return_value=new_page)
+    scraper._open_page = AsyncMock(side_effect=lambda page: calls.append("open new"))
+
+    await scraper._recycle_browser("page")
+
+    assert calls == ["close old", "open new"]
+    scraper._open_page.assert_awaited_once_with(new_page)
+
+
+@pytest.mark.asyncio
+async def test_recycle_restores_the_chat_list_position(tmp_path):
+    with patch("midori_kage.scraper.async_playwright"):
+        scraper = MidoriKage(headless=True, chats_dir=str(tmp_path))
+    scraper.page = MagicMock()
+    scraper.page.evaluate = AsyncMock(return_value=4200)
+    scraper.page.wait_for_selector = AsyncMock()
+    scraper.governor = MagicMock()
+    scraper.governor.check = AsyncMock(return_value="page")
+    scraper._recycle_browser = AsyncMock()
+    scraper._snapshot_chat_list = AsyncMock(
+        return_value=[ChatRow(index=0, name="Alice")]
+    )
+    scraper._process_chat = AsyncMock(return_value=True)
+    scraper._scroll_and_wait = AsyncMock()
+    scraper.rate = RateScheduler(chats_per_minute=0, actions_per_second=0)
+
+    await scraper._scrape_chat_list(1, "list", "row", set(), 0)
+
+    scraper._recycle_browser.assert_awaited_once_with("page")
+    assert scraper._scroll_and_wait.await_args.args[3] == 4200
@@ -0,0 +1,106 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from midori_kage.incremental import MarkStore, mark_for, message_hash, messages_after
+from midori_kage.scraper import MidoriKage
+from midori_kage.storage import JsonlStorage
+
+
+def _msg(info, text):
+    return {"info": info, "text": text}
+
+
+def test_messages_after_returns_only_newer_messages():
+    history = [_msg("[10:00] A:", "one"), _msg("[10:01] B:", "two")]
+    rendered = history + [_msg("[10:02] A:", "three")]
+
+    assert messages_after(rendered, mark_for(history)) == [rendered[-1]]
+
+
+def test_messages_after_without_mark_in_view_keeps_everything():
+    mark = mark_for([_msg("[09:00] A:", "gone")])
+    rendered = [_msg("[10:00] A:", "one")]
+
+    assert messages_after(rendered, mark) == rendered
+    assert messages_after(rendered, None) == rendered
+
+
+def test_deleted_last_message_resumes_after_the_stored_tail(tmp_path):
+    with patch("midori_kage.scraper.async_playwright"):
+        scraper = MidoriKage(headless=True, chats_dir=str(tmp_path), incremental=True)
+    one, two = _msg("[10:00] A:", "one"), _msg("[10:01] B:", "two")
+    scraper._save_chat_delta("Alice", [one, two])
+
+    # "two" was deleted after the last run, so the mark is not rendered
+    deleted = _msg("[10:01] B:", "This message was deleted")
+    three = _msg("[10:02] A:", "three")
+    assert scraper._save_chat_delta("Alice", [one, deleted, three]) == 2
+
+    messages = scraper.storage.load_chat("Alice")["messages"]
+    assert messages == [one, two, deleted, three]
+    stored = {message_hash(one)}
+    assert messages_after([one, three], mark_for([two]), stored) == [three]
+
+
+@pytest.mark.asyncio
+async def test_backfill_stops_at_the_stored_tail_when_the_mark_is_gone(tmp_path):
+    with patch("midori_kage.scraper.async_playwright"):
+        scraper = MidoriKage(headless=True, chats_dir=str(tmp_path))
+    one, two = _msg("[10:00] A:", "one"), _msg("[10:01] B:", "two")
+    three = _msg("[10:02] A:", "three")
+    scraper._wait_for_messages = AsyncMock()
+    scraper._snapshot_viewport = AsyncMock()
+    scraper._extract_messages_batched = AsyncMock(
+        return_value=[{**m, "key": m["text"]} for m in (one, three)]
+    )
+    scraper._scroll_and_wait = AsyncMock()
+
+    batches = [
+        b
+        async for b in scraper._iter_history_batches(
+            stop_at=mark_for([two]), known={message_hash(one)}
+        )
+    ]
+
+    assert batches == [[three]]
+    scraper._scroll_and_wait.assert_not_awaited()
+
+
+def test_mark_store_round_trip(tmp_path):
+    path = tmp_path / "marks.json"
+    store = MarkStore(path)
+    store.set("Alice", mark_for([_msg("[10:00] A:", "hi")]))
+    store.checkpoint()
+
+    assert MarkStore(path).get("Alice") == store.get("Alice")
+    assert MarkStore(path).get("Bob") is None
+
+
+def test_mark_store_distrusts_marks_after_unsaved_updates(tmp_path):
+    path = tmp_path / "marks.json"
+    store = MarkStore(path, checkpoint_every=2)
+    store.set("Alice", mark_for([_msg("[10:00] A:", "hi")]))
+    store.set("Bob", mark_for([_msg("[10:00] B:", "yo")]))
+    store.set("Alice", mark_for([_msg("[10:05] A:", "later")]))
+
+    # Crashed before the last update was saved: no mark is trusted
+    crashed = MarkStore(path)
+    assert crashed.get("Alice") is None and crashed.get("Bob") is None
+
+    crashed.set("Alice", mark_for([_msg("[10:05] A:", "later")]))
+    crashed.checkpoint()
+    assert MarkStore(path).get("Bob") is None
+    assert crashed.get("Alice") is not None
+
+    store.checkpoint()
+    assert MarkStore(path).get("Bob") == store.get("Bob")
+
+
+def test_incremental_runs_append_to_jsonl_instead_of_rewriting_json(tmp_path):
+    with patch("midori_kage.scraper.async_playwright"):
+        scraper = MidoriKage(
+            headless=True, chats_dir=str(tmp_path), incremental=True, storage="json"
+        )
+
+    assert isinstance(scraper.storage, JsonlStorage)
@@ -0,0 +1,54 @@
+from midori_kage.manifest import RunManifest
+
+
+def test_resume_restores_visited_chats_and_progress(tmp_path):
+    path = tmp_path / ".manifest.json"
+    manifest = RunManifest(path)
+    manifest.begin_run(limit=10)
+    manifest.record("Alice", "done", message_count=3, output="chats/Alice.json")
+    manifest.record("Bob", "failed", detail="boom")
+    manifest.checkpoint()  # A crash happens here: end_run is never reached
+
+    resumed = RunManifest(path)
+    visited, processed = resumed.begin_run(limit=10, resume=True)
+
+    assert visited == {"Alice", "Bob"}
+    assert processed == 1
+    assert resumed.is_done("Alice") and not resumed.is_done("Bob")
+    assert resumed.chats["Alice"].message_count == 3
+
+
+def test_completed_runs_are_not_resumed(tmp_path):
+    path = tmp_path / ".manifest.json"
+    manifest = RunManifest(path)
+    manifest.begin_run(limit=float("inf"))
+    manifest.record("Alice", "done")
+    manifest.end_run()
+
+    visited, processed = RunManifest(path).begin_run(limit=5, resume=True)
+
+    assert (visited, processed) == (set(), 0)
+    assert RunManifest(path).is_done("Alice")
+
+
+def test_checkpoints_periodically_and_reconciles_storage(tmp_path):
+    path = tmp_path / ".manifest.json"
+    manifest = RunManifest(path, checkpoint_every=2, checkpoint_interval=3600)
+    manifest.record("A", "done")
+    assert not path.exists()
+
+    manifest.reconcile(["Old", "A"], lambda name: f"chats/{name}.json")
+    assert RunManifest(path).is_done("Old")
+    assert RunManifest(path).chats["Old"].output == "chats/Old.json"
+
+
+def test_reconcile_marks_chats_missing_from_storage(tmp_path):
+    manifest = RunManifest(tmp_path / ".manifest.json")
+    manifest.record("Deleted", "done", message_count=5)
+    manifest.record("Failed", "failed")
+
+    manifest.reconcile([], lambda name: name)
+
+    assert not manifest.is_done("Deleted")
+    assert manifest.chats["Deleted"].status == "missing"
+    assert manifest.chats["Failed"].status == "failed"
@@ -0,0 +1,103 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from midori_kage.incremental import message_hash
+from midori_kage.media import MediaDownloader, MediaStore
+from midori_kage.scraper import MidoriKage
+
+
+def test_store_is_content_addressed(tmp_path):
+    store = MediaStore(tmp_path)
+
+    digest, written = store.put(b"photo", "image/jpeg")
+    again, written_again = store.put(b"photo", "image/jpeg")
+
+    assert digest == again
+    assert (written, written_again) == (True, False)
+    assert store.path_for(digest, "image/jpeg").read_bytes() == b"photo"
+    assert store.path_for(digest, "image/jpeg").parent.name == digest[:2]
+
+
+@pytest.mark.asyncio
+async def test_downloads_are_bounded_and_deduplicated(tmp_path):
+    active, peak = 0, 0
+
+    async def fetch(url):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        if url == "blob:gone":
+            return None
+        # Two URLs carrying the same forwarded file
+        return (b"same" if url in ("blob:a", "blob:b") else url.encode(), "image/png")
+
+    downloader = MediaDownloader(MediaStore(tmp_path), fetch, workers=2)
+    await downloader.start()
+    for url in ("blob:a", "blob:b", "blob:c", "blob:d", "blob:gone", "blob:a"):
+        downloader.submit(url)
+
+    refs = await downloader.resolve(["blob:a", "blob:b", "blob:gone"])
+    await downloader.close()
+
+    assert peak == 2
+    assert refs[0]["sha256"] == refs[1]["sha256"]
+    assert len(refs) == 2  # the vanished blob is dropped
+    assert downloader.stats["downloaded"] == 3
+    assert downloader.stats["duplicates"] == 1
+    assert downloader.stats["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_media_bubbles_are_kept_and_resolved_to_hashes(tmp_path):
+    with patch("midori_kage.scraper.async_playwright"):
+        scraper = MidoriKage(headless=True, chats_dir=str(tmp_path), capture_media=True)
+    scraper.page = MagicMock()
+    scraper.page.evaluate = AsyncMock(
+        return_value=[
+            {"info": "[10:00, 01/01/2024] Alice: ", "text": "hi", "media": []},
+            {"info": "", "text": "", "media": ["blob:photo"]},
+            {"info": "", "text": "", "media": []},
+        ]
+    )
+    scraper._fetch_media = AsyncMock(return_value=(b"jpeg", "image/jpeg"))
+    await scraper._start_media()
+
+    messages = await scraper._extract_messages_batched()
+    assert messages[1] == {"info": "", "text": "", "media": ["blob:photo"]}
+    assert scraper.page.evaluate.call_args.args[1]["media"]
+
+    batch = await scraper._attach_media(messages)
+    await scraper._stop_media()
+
+    assert len(batch) == 2
+    assert batch[1]["media"][0]["mime"] == "image/jpeg"
+    assert len(list((tmp_path / "media").rglob("*.jpg"))) == 1
+
+
+@pytest.mark.asyncio
+async def test_distinct_media_only_messages_get_distinct_keys(tmp_path):
+    with patch("midori_kage.scraper.async_playwright"):
+        scraper = MidoriKage(headless=True, chats_dir=str(tmp_path), capture_media=True)
+    scraper.page = MagicMock()
+    scraper.page.evaluate = AsyncMock(
+        return_value=[
+            {"id": None, "info": "", "text": "", "media": ["blob:one"]},
+            {"id": None, "info": "", "text": "", "media": ["blob:two"]},
+            {"id": "true_3", "info": "", "text": "", "media": ["blob:one"]},
+        ]
+    )
+    scraper.media = MagicMock()
+
+    messages = await scraper._extract_messages_batched(with_keys=True)
+
+    assert len({m["key"] for m in messages}) == 3
+    assert messages[2]["id"] == "true_3"
+    # Hashes of resolved media use the content hash, and a mark on one
+    # photo no longer matches any other media-only message
+    photo = {"info": "", "text": "", "media": [{"sha256": "aa"}]}
+    other = {"info": "", "text": "", "media": [{"sha256": "bb"}]}
+    assert message_hash(photo) != message_hash(other)
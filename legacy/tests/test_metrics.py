@@ -0,0 +1,66 @@
+import json
+
+from midori_kage.metrics import Metrics, NullMetrics, open_metrics
+
+
+def test_spans_fill_histograms_and_chat_records(tmp_path):
+    metrics = Metrics(tmp_path / "metrics.json", interval=3600)
+
+    metrics.begin_chat("Alice")
+    with metrics.span("header"):
+        pass
+    metrics.observe("extract", 0.2)
+    metrics.observe("extract", 0.3)
+    metrics.end_chat("scraped")
+    # Outside a chat, spans still count but aren't attributed
+    metrics.observe("write", 7.0)
+
+    summary = metrics.summary()
+    assert summary["phase"]["extract"]["count"] == 2
+    assert summary["phase"]["write"]["buckets"]["10.0"] == 1
+    assert summary["chats"][0]["chat"] == "Alice"
+    assert summary["chats"][0]["phases"]["extract"] == 0.5
+    assert "write" not in summary["chats"][0]["phases"]
+
+
+def test_slow_chat_is_flagged_as_outlier(tmp_path, monkeypatch):
+    metrics = Metrics(tmp_path / "metrics.json", interval=3600)
+    clock = iter([0, 1, 10, 11, 20, 21, 30, 31, 40, 41, 50, 60])
+    monkeypatch.setattr("midori_kage.metrics.time.monotonic", lambda: next(clock))
+    metrics._last_write = 0
+
+    for name in "abcdef":
+        metrics.begin_chat(name)
+        metrics.end_chat("scraped")
+
+    flags = [c["outlier"] for c in metrics.chats]
+    assert flags == [False] * 5 + [True]
+
+
+def test_write_prometheus_and_json(tmp_path):
+    prom = Metrics(tmp_path / "metrics.prom")
+    prom.observe("header", 0.07)
+    prom.observe("messages", 6.0, kind="wait")
+    prom.write()
+
+    text = (tmp_path / "metrics.prom").read_text()
+    assert 'midori_phase_seconds_bucket{phase="header",le="0.05"} 0' in text
+    assert 'midori_phase_seconds_bucket{phase="header",le="0.1"} 1' in text
+    assert 'midori_phase_seconds_bucket{phase="header",le="+Inf"} 1' in text
+    assert 'midori_wait_seconds_count{wait="messages"} 1' in text
+
+    js = Metrics(tmp_path / "metrics.json")
+    js.observe("header", 0.07)
+    js.write()
+    data = json.loads((tmp_path / "metrics.json").read_text())
+    assert data["phase"]["header"]["count"] == 1
+
+
+def test_null_metrics_when_disabled():
+    metrics = open_metrics(None)
+    assert isinstance(metrics, NullMetrics)
+    with metrics.span("header"):
+        pass
+    metrics.begin_chat("Alice")
+    metrics.end_chat("scraped")
+    metrics.write()
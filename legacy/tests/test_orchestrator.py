@@ -0,0 +1,80 @@
+from unittest.mock import patch
+
+import pytest
+
+from midori_kage.orchestrator import (
+    AccountSpec,
+    Orchestrator,
+    OrchestratorManifest,
+    load_manifest,
+)
+
+
+def _manifest(**kwargs):
+    accounts = [
+        AccountSpec(name="a", session_dir="sessions/a", output_dir="out/a"),
+        AccountSpec(name="b", session_dir="sessions/b", output_dir="out/b"),
+    ]
+    return OrchestratorManifest(accounts=accounts, **kwargs)
+
+
+class FakeProcess:
+    """Stands in for a worker process, exiting with scripted codes."""
+
+    exit_codes = {}
+    resumed = {}
+
+    def __init__(self, target, args, name):
+        self.account = args[0]["name"]
+        self.exitcode = None
+        FakeProcess.resumed.setdefault(self.account, []).append(args[2])
+
+    def start(self):
+        self.exitcode = FakeProcess.exit_codes[self.account].pop(0)
+
+    def join(self):
+        pass
+
+    def is_alive(self):
+        return False
+
+
+def test_load_manifest_rejects_shared_session_dirs(tmp_path):
+    path = tmp_path / "accounts.yaml"
+    path.write_text(
+        "accounts:\n"
+        "  - {name: a, session_dir: s, output_dir: a}\n"
+        "  - {name: b, session_dir: s, output_dir: b}\n"
+    )
+
+    with pytest.raises(ValueError):
+        load_manifest(path)
+
+
+@pytest.mark.asyncio
+async def test_crashed_workers_are_restarted_until_the_limit():
+    orchestrator = Orchestrator(_manifest(concurrency=1, max_restarts=1))
+    FakeProcess.exit_codes = {"a": [1, 0], "b": [1, 1]}
+    FakeProcess.resumed = {}
+
+    with (
+        patch.object(orchestrator._mp, "Process", FakeProcess),
+        patch("midori_kage.orchestrator.asyncio.sleep"),
+    ):
+        reports = {r.name: r for r in await orchestrator.run()}
+
+    assert reports["a"].status == "done" and reports["a"].restarts == 1
+    assert reports["b"].status == "failed" and reports["b"].exit_code == 1
+    # Only restarts resume the crashed run
+    assert FakeProcess.resumed["a"] == [False, True]
+
+
+def test_progress_events_are_aggregated():
+    orchestrator = Orchestrator(_manifest())
+    orchestrator._handle_event("a", "chat_saved", {"chat": "x", "messages": 3})
+    orchestrator._handle_event("b", "chat_saved", {"chat": "y", "messages": 2})
+    orchestrator._handle_event("b", "chat_skipped", {"chat": "z"})
+
+    totals = orchestrator.totals()
+    assert totals["saved"] == 2 and totals["messages"] == 5
+    assert orchestrator.reports["b"].skipped == 1
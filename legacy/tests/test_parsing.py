@@ -0,0 +1,52 @@
+from datetime import date, datetime
+
+from midori_kage.parsing import (
+    InfoParser,
+    message_direction,
+    parse_info,
+    parse_info_date,
+)
+
+
+def test_parse_info_date():
+    assert parse_info_date("[10:32 AM, 1/31/2024] Alice: ") == date(2024, 1, 31)
+    assert parse_info_date("[10:32, 31/01/2024] Alice: ") == date(2024, 1, 31)
+    assert parse_info_date("no prefix") is None
+
+
+def test_parse_info_splits_timestamp_and_sender():
+    assert parse_info("[10:32 PM, 1/31/2024] Alice Smith: ") == (
+        datetime(2024, 1, 31, 22, 32),
+        "Alice Smith",
+    )
+    assert parse_info("[10:32, 31/01/2024] +1 555 0100:") == (
+        datetime(2024, 1, 31, 10, 32),
+        "+1 555 0100",
+    )
+    assert parse_info("") == (None, None)
+
+
+def test_parser_detects_day_first_dates_from_a_batch():
+    parser = InfoParser("en-US")
+    batch = [
+        {"info": "[09:00, 02/01/2024] Alice:"},
+        {"info": "[09:05, 31/01/2024] Bob:"},
+    ]
+
+    parser.parse_batch(batch)
+
+    # 02/01 is ambiguous alone; 31/01 settles the chat as day-first
+    assert batch[0]["timestamp"] == "2024-01-02T09:00:00"
+    assert batch[1]["sender"] == "Bob"
+    assert parser.parse("[09:00, 03/04/2024] Alice:")[0] == datetime(2024, 4, 3, 9)
+
+
+def test_locale_sets_default_date_order():
+    assert InfoParser("en-GB").parse_date("03/04/2024") == date(2024, 4, 3)
+    assert InfoParser("en-US").parse_date("03/04/2024") == date(2024, 3, 4)
+
+
+def test_message_direction():
+    assert message_direction("true_123@c.us_ABC") == "out"
+    assert message_direction("false_123@c.us_ABC") == "in"
+    assert message_direction(None) is None
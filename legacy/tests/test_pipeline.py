@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from midori_kage.pipeline import ChatJob, ChatPipeline
+
+
+@pytest.mark.asyncio
+async def test_jobs_flow_through_stages_in_order():
+    written, done = [], []
+
+    async def normalize(job):
+        job.messages = [{"text": m["text"].upper()} for m in job.messages]
+
+    def persist(job):
+        written.append((job.chat_name, job.messages))
+        return len(job.messages)
+
+    pipeline = ChatPipeline(
+        normalize, persist, lambda job, saved, error: done.append((saved, error))
+    )
+    await pipeline.start()
+    for name in ("a", "b", "c"):
+        await pipeline.submit(ChatJob(chat_name=name, messages=[{"text": name}]))
+    await pipeline.close()
+
+    assert written == [
+        ("a", [{"text": "A"}]),
+        ("b", [{"text": "B"}]),
+        ("c", [{"text": "C"}]),
+    ]
+    assert done == [(1, None)] * 3
+    assert pipeline.summary()["write"]["processed"] == 3
+
+
+@pytest.mark.asyncio
+async def test_full_queue_applies_backpressure_and_failures_are_reported():
+    release = asyncio.Event()
+    done = []
+
+    async def normalize(job):
+        await release.wait()
+
+    def persist(job):
+        raise OSError("disk full")
+
+    pipeline = ChatPipeline(
+        normalize, persist, lambda job, saved, error: done.append(error), depth=1
+    )
+    await pipeline.start()
+    await pipeline.submit(ChatJob(chat_name="a"))
+    await pipeline.submit(ChatJob(chat_name="b"))
+
+    blocked = asyncio.create_task(pipeline.submit(ChatJob(chat_name="c")))
+    await asyncio.sleep(0.05)
+    assert not blocked.done()
+
+    release.set()
+    await blocked
+    await pipeline.close()
+
+    assert len(done) == 3 and all(isinstance(e, OSError) for e in done)
+    stats = pipeline.summary()
+    assert stats["write"]["failed"] == 3
+    assert stats["normalize"]["max_depth"] == 1
+    assert stats["normalize"]["blocked_seconds"] > 0
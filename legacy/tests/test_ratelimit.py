@@ -0,0 +1,69 @@
+import json
+
+from midori_kage.ratelimit import (
+    RateScheduler,
+    TokenBucket,
+    estimate_run,
+    observed_timings,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_credits_time_already_spent():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1 / 3, clock=clock)  # 20 per minute
+
+    assert bucket.reserve() == 0  # First chat starts right away
+    clock.now = 1.0  # A fast chat must wait out the rest of the interval
+    assert round(bucket.reserve(), 3) == 2.0
+    clock.now = 15.0  # A slow chat already paid for the next one
+    assert bucket.reserve() == 0
+    # Idle time doesn't bank more than the bucket's capacity
+    clock.now = 100.0
+    assert bucket.reserve() == 0
+    assert round(bucket.reserve(), 3) == 3.0
+
+
+def test_disabled_budget_never_waits():
+    rate = RateScheduler(chats_per_minute=0, actions_per_second=0)
+    assert [rate.delay("chat") for _ in range(5)] == [0.0] * 5
+    assert rate.delay("action") == 0.0
+
+
+def test_estimate_uses_the_slower_of_chat_time_and_budget():
+    fast = estimate_run(100, chats_per_minute=20, seconds_per_chat=1, startup_seconds=0)
+    assert fast["seconds_per_chat"] == 3
+    assert fast["rate_wait_seconds"] == 200
+    assert fast["total_seconds"] == 300 + 7  # 7 list scrolls
+
+    slow = estimate_run(100, chats_per_minute=20, seconds_per_chat=10)
+    assert slow["rate_wait_seconds"] == 0
+    assert slow["legacy_total_seconds"] - slow["total_seconds"] == 200
+
+
+def test_observed_timings_from_metrics_json(tmp_path):
+    path = tmp_path / "metrics.json"
+    path.write_text(
+        json.dumps(
+            {
+                "phase": {"list_scroll": {"count": 2, "avg": 0.8}},
+                "chats": [
+                    {"seconds": 4.0, "outcome": "scraped"},
+                    {"seconds": 9.0, "outcome": "scraped"},
+                    {"seconds": 5.0, "outcome": "scraped"},
+                    {"seconds": 0.5, "outcome": "skipped"},
+                ],
+            }
+        )
+    )
+    assert observed_timings(path) == {
+        "seconds_per_chat": 5.0,
+        "seconds_per_scroll": 0.8,
+    }
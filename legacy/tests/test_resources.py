@@ -0,0 +1,74 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from midori_kage.resources import (
+    ResourceBlocker,
+    ResourcePolicy,
+    load_resource_policy,
+)
+
+
+def test_policy_decisions():
+    policy = ResourcePolicy(
+        allowed_types=["document", "script", "fetch"],
+        stub_types=["image"],
+        blocked_urls=["*://pps.whatsapp.net/*"],
+        allowed_urls=["data:*"],
+    )
+
+    assert policy.decide("script", "https://web.whatsapp.com/app.js") == "allow"
+    assert policy.decide("font", "https://web.whatsapp.com/f.woff2") == "abort"
+    assert policy.decide("image", "https://web.whatsapp.com/a.png") == "stub"
+    assert policy.decide("fetch", "https://pps.whatsapp.net/v/t61/x.jpg") == "abort"
+    assert policy.decide("image", "data:image/png;base64,AAAA") == "allow"
+
+
+def test_shipped_policy_keeps_the_app_running():
+    policy = load_resource_policy()
+    for kind in ("document", "script", "xhr", "fetch", "websocket"):
+        assert policy.decide(kind, "https://web.whatsapp.com/x") == "allow"
+    assert policy.decide("media", "https://web.whatsapp.com/v.mp4") == "abort"
+
+
+@pytest.mark.asyncio
+async def test_blocker_counts_blocked_requests_and_bytes():
+    policy = ResourcePolicy(
+        allowed_types=["document"],
+        stub_types=["image"],
+        estimated_bytes={"image": 100, "default": 10},
+    )
+    blocker = ResourceBlocker(policy)
+
+    routes = []
+    for kind in ("document", "image", "image", "font"):
+        route = MagicMock()
+        route.request.resource_type = kind
+        route.request.url = f"https://example.com/{kind}"
+        route.fallback = AsyncMock()
+        route.fulfill = AsyncMock()
+        route.abort = AsyncMock()
+        await blocker._handle(route)
+        routes.append(route)
+
+    routes[0].fallback.assert_awaited_once()
+    routes[1].fulfill.assert_awaited_once()
+    routes[3].abort.assert_awaited_once_with("blockedbyclient")
+    assert blocker.allowed == 1
+    assert blocker.blocked == {"image": 2, "font": 1}
+    assert blocker.estimated_bytes_saved == 210
+
+
+def test_media_capture_lets_message_media_through():
+    policy = ResourcePolicy(
+        allowed_types=["fetch"],
+        media_urls=["*://mmg.whatsapp.net/*"],
+        blocked_urls=["*://pps.whatsapp.net/*"],
+    )
+    media = "https://mmg.whatsapp.net/v/t62/x.enc"
+
+    assert policy.decide("fetch", media) == "abort"
+    policy.capture_media = True
+    assert policy.decide("fetch", media) == "allow"
+    assert policy.decide("image", "https://web.whatsapp.com/a.png") == "allow"
+    assert policy.decide("fetch", "https://pps.whatsapp.net/a.jpg") == "abort"
@@ -1,8 +1,11 @@
-from unittest.mock import patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
-from midori_kage.scraper import MidoriKage
+from midori_kage.pipeline import ChatJob
+from midori_kage.ratelimit import RateScheduler
+from midori_kage.scraper import ChatRow, MidoriKage
 
 
 @pytest.mark.asyncio
@@ -15,3 +18,179 @@ async def test_scraper_initialization():
 
         # Verify config loaded (assuming default config exists)
         assert scraper.config is not None
+
+
+@pytest.mark.asyncio
+async def test_batched_extraction_matches_per_locator_output():
+    """Batched records are filtered and stripped like the locator path."""
+    with patch("midori_kage.scraper.async_playwright"):
+        scraper = MidoriKage(headless=True)
+
+    scraper.page = MagicMock()
+    scraper.page.evaluate = AsyncMock(
+        return_value=[
+            {"info": " [10:00, 01/01/2024] Alice: ", "text": " hi \n"},
+            {"info": "", "text": ""},
+            None,
+            {"info": "[10:01, 01/01/2024] Bob: ", "text": ""},
+        ]
+    )
+
+    messages = await scraper._extract_messages_batched()
+
+    assert messages == [
+        {"info": "[10:00, 01/01/2024] Alice:", "text": "hi"},
+        {"info": "[10:01, 01/01/2024] Bob:", "text": ""},
+    ]
+    selectors = scraper.page.evaluate.call_args.args[1]
+    assert selectors["info"] == "div[data-pre-plain-text]"
+
+
+@pytest.mark.asyncio
+async def test_chat_list_snapshot_skips_unnamed_rows():
+    """The chat list is read in one call and unnamed rows are dropped."""
+    with patch("midori_kage.scraper.async_playwright"):
+        scraper = MidoriKage(headless=True)
+
+    scraper.page = MagicMock()
+    scraper.page.evaluate = AsyncMock(
+        return_value=[
+            {"index": 0, "key": "Alice", "name": "Alice", "pinned": True},
+            {"index": 1, "key": None, "name": None},
+            {"index": 2, "key": None, "name": "Bob", "muted": True},
+        ]
+    )
+
+    rows = await scraper._snapshot_chat_list()
+
+    assert [row.name for row in rows] == ["Alice", "Bob"]
+    assert rows[0].pinned and rows[1].muted
+    scraper.page.evaluate.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_wait_records_latency_and_timeouts():
+    """Condition waits report their latency and count timeouts."""
+    with patch("midori_kage.scraper.async_playwright"):
+        scraper = MidoriKage(headless=True)
+
+    async def resolves():
+        return True
+
+    async def times_out():
+        raise PlaywrightTimeoutError("timeout")
+
+    assert await scraper._wait("header", resolves()) is True
+    assert await scraper._wait("header", times_out()) is False
+
+    stats = scraper.wait_stats["header"]
+    assert stats["count"] == 2
+    assert stats["timeouts"] == 1
+    assert stats["max"] >= 0
+
+
+def test_header_matches_is_fuzzy():
+    with patch("midori_kage.scraper.async_playwright"):
+        scraper = MidoriKage(headless=True)
+
+    assert scraper._header_matches("Alice\nonline", "Alice", "Alice")
+    assert scraper._header_matches("Team Rocket HQ…", "Team Rocket HQ 2024", "x")
+    assert scraper._header_matches("Bob ☕", "Bob ☕!", "Bob")
+    assert not scraper._header_matches("Carol", "Alice", "Alice")
+
+
+@pytest.mark.asyncio
+async def test_scraped_chats_are_saved_through_the_pipeline(tmp_path):
+    """Jobs submitted by the browser stage end up in storage."""
+    with patch("midori_kage.scraper.async_playwright"):
+        scraper = MidoriKage(headless=True, chats_dir=str(tmp_path))
+    events = []
+    scraper.on_progress = lambda event, data: events.append((event, data))
+
+    async def shout(batch):
+        return [{**m, "text": m["text"].upper()} for m in batch]
+
+    scraper.normalizers.append(shout)
+
+    await scraper._start_pipeline()
+    await scraper._submit(
+        ChatJob(chat_name="Alice", messages=[{"info": "", "text": "hi"}])
+    )
+    await scraper._stop_pipeline()
+
+    assert scraper.storage.load_chat("Alice")["messages"] == [
+        {"info": "", "text": "HI"}
+    ]
+    assert events == [("chat_saved", {"chat": "Alice", "messages": 1})]
+
+
+@pytest.mark.asyncio
+async def test_find_chat_row_scrolls_until_the_chat_appears():
+    with patch("midori_kage.scraper.async_playwright"):
+        scraper = MidoriKage(headless=True)
+
+    scraper._snapshot_chat_list = AsyncMock(
+        side_effect=[
+            [ChatRow(index=0, name="Alice", key="Alice")],
+            [ChatRow(index=0, name="Bob", key="Bob")],
+        ]
+    )
+    scraper._scroll_and_wait = AsyncMock(return_value={"changed": True})
+
+    row = await scraper._find_chat_row("Bob", "list", "row")
+
+    assert row.name == "Bob"
+    # Jumped to the top first, then scrolled down once
+    deltas = [c.args[3] for c in scraper._scroll_and_wait.call_args_list]
+    assert deltas == [None, 1000]
+
+
+@pytest.mark.asyncio
+async def test_filtered_rows_are_never_clicked(tmp_path):
+    """Rows rejected by the filters are skipped before any click."""
+    with patch("midori_kage.scraper.async_playwright"):
+        scraper = MidoriKage(headless=True, chats_dir=str(tmp_path))
+
+    scraper.page = MagicMock()
+    scraper._snapshot_chat_list = AsyncMock(
+        return_value=[
+            ChatRow(index=0, name="Family", group=True),
+            ChatRow(index=1, name="Alice"),
+        ]
+    )
+    scraper._process_chat = AsyncMock(return_value=True)
+    scraper.rate = RateScheduler(chats_per_minute=0, actions_per_second=0)
+    events = []
+    scraper.on_progress = lambda event, data: events.append((event, data))
+
+    await scraper._scrape_chat_list(1, "list", "row", set(), 0)
+
+    assert [c.args[0].name for c in scraper._process_chat.await_args_list] == ["Alice"]
+    assert ("chat_skipped", {"chat": "Family", "reason": "filtered (group=True)"}) in (
+        events
+    )
+
+
+def test_incremental_appends_keep_the_chat_total(tmp_path):
+    with patch("midori_kage.scraper.async_playwright"):
+        scraper = MidoriKage(headless=True, chats_dir=str(tmp_path))
+    scraper._on_job_done(ChatJob(chat_name="Alice"), 10, None)
+    scraper._on_job_done(ChatJob(chat_name="Alice", appended=True), 0, None)
+    scraper._on_job_done(ChatJob(chat_name="Alice", appended=True), 2, None)
+
+    assert scraper.manifest.chats["Alice"].message_count == 12
+
+
+@pytest.mark.asyncio
+async def test_scrape_chats_starts_from_the_top_of_the_list(tmp_path):
+    with patch("midori_kage.scraper.async_playwright"):
+        scraper = MidoriKage(headless=True, chats_dir=str(tmp_path))
+    scraper.page = MagicMock()
+    scraper.page.wait_for_selector = AsyncMock()
+    scraper._scroll_and_wait = AsyncMock(return_value={"changed": False})
+    scraper._scrape_chat_list = AsyncMock()
+
+    await scraper.scrape_chats(limit=1)
+
+    assert scraper._scroll_and_wait.await_args.args[3] is None
+    scraper._scrape_chat_list.assert_awaited_once()
@@ -0,0 +1,164 @@
+import gzip
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from midori_kage.config import load_selectors
+from midori_kage.ratelimit import RateScheduler
+from midori_kage.scraper import ChatRow, MidoriKage
+from midori_kage.snapshots import (
+    SnapshotWriter,
+    extract_messages,
+    read_snapshot,
+    reextract_archive,
+    reextract_file,
+)
+from midori_kage.storage import open_storage
+
+pytest.importorskip("bs4")
+
+SELECTORS = load_selectors()
+
+
+def bubble(data_id: str, info: str, text: str) -> str:
+    return (
+        f'<div role="row"><div data-id="{data_id}">'
+        f'<div data-pre-plain-text="{info}">'
+        f'<span class="selectable-text">{text}</span></div></div></div>'
+    )
+
+
+def panel(*bubbles: str) -> str:
+    return '<div id="main"><header>Alice</header>' + "".join(bubbles) + "</div>"
+
+
+def test_extraction_matches_the_batched_rules():
+    html = panel(
+        bubble("true_1", "[10:00, 1/31/2024] Me: ", "line one<br>line two"),
+        '<div role="row"><span class="selectable-text">a</span>'
+        '<span class="selectable-text">b</span></div>',  # Ambiguous, dropped
+        '<div role="row"><img src="blob:x"></div>',  # Media only, dropped
+    )
+    messages = extract_messages(html, SELECTORS)
+
+    assert messages == [
+        {
+            "info": "[10:00, 1/31/2024] Me:",
+            "text": "line one\nline two",
+            "key": "true_1",
+            "id": "true_1",
+        }
+    ]
+
+
+def test_backfill_viewports_are_merged_in_order(tmp_path):
+    writer = SnapshotWriter(tmp_path, "Alice", {"name": "Alice"})
+    # Newest viewport first, overlapping the older one by message 2
+    writer.write(
+        panel(
+            bubble("false_2", "[10:01, 1/31/2024] Alice: ", "two"),
+            bubble("true_3", "[10:02, 1/31/2024] Me: ", "three"),
+        )
+    )
+    writer.write(
+        panel(
+            bubble("false_1", "[10:00, 1/31/2024] Alice: ", "one"),
+            bubble("false_2", "[10:01, 1/31/2024] Alice: ", "two"),
+        )
+    )
+    writer.close()
+
+    [(header, pages)] = read_snapshot(writer.path)
+    assert header["chat"] == "Alice" and len(pages) == 2
+
+    chat, contact_info, messages = reextract_file(
+        writer.path, SELECTORS, parse_info=True
+    )
+    assert (chat, contact_info) == ("Alice", {"name": "Alice"})
+    assert [m["text"] for m in messages] == ["one", "two", "three"]
+    assert [m["direction"] for m in messages] == ["in", "in", "out"]
+    assert messages[0]["timestamp"] == "2024-01-31T10:00:00"
+
+
+def test_archive_is_reextracted_in_worker_processes(tmp_path):
+    snapshots = tmp_path / "snapshots"
+    for name in ("Alice", "Bob"):
+        writer = SnapshotWriter(snapshots, name, {})
+        writer.write(panel(bubble(f"false_{name}", "[10:00, 1/31/2024] X: ", name)))
+        writer.close()
+    storage = open_storage("json", tmp_path / "out")
+
+    assert reextract_archive(snapshots, storage, SELECTORS, workers=2) == 2
+    assert storage.load_chat("Bob")["messages"] == [
+        {"info": "[10:00, 1/31/2024] X:", "text": "Bob"}
+    ]
+
+
+def test_discarded_visit_keeps_the_previous_snapshot(tmp_path):
+    writer = SnapshotWriter(tmp_path, "Alice", {})
+    writer.write(panel(bubble("false_1", "[10:00, 1/31/2024] Alice: ", "one")))
+    writer.close()
+
+    failed = SnapshotWriter(tmp_path, "Alice", {})
+    failed.write(panel())
+    failed.discard()
+
+    assert [len(pages) for _, pages in read_snapshot(writer.path)] == [1]
+    assert list(tmp_path.iterdir()) == [writer.path]
+
+
+@pytest.mark.asyncio
+async def test_failed_visits_keep_the_snapshot_and_incremental_ones_append(
+    tmp_path,
+):
+    with patch("midori_kage.scraper.async_playwright"):
+        scraper = MidoriKage(headless=True, chats_dir=str(tmp_path), snapshot_dom=True)
+    scraper.page = MagicMock()
+    scraper.page.locator.return_value.count = AsyncMock(return_value=1)
+    scraper.page.locator.return_value.first.inner_text = AsyncMock(return_value="Alice")
+    scraper._row_locator = MagicMock(return_value=MagicMock(click=AsyncMock()))
+    scraper.page.evaluate = AsyncMock(return_value=panel())
+    scraper._wait = AsyncMock(return_value=True)
+    scraper._contact_info_for = AsyncMock(return_value={})
+    scraper.rate = RateScheduler(chats_per_minute=0, actions_per_second=0)
+    path = tmp_path / "snapshots" / "Alice.html.jsonl.gz"
+
+    async def fails():
+        await scraper._snapshot_viewport()
+        raise RuntimeError("page crashed")
+
+    scraper._scrape_current_chat = fails
+    with pytest.raises(RuntimeError):
+        await scraper._process_chat(ChatRow(index=0, name="Alice"), "Alice")
+    assert not path.parent.exists() or list(path.parent.iterdir()) == []
+
+    # A delta-only visit is not a snapshot of its own
+    scraper.incremental = True
+    scraper.storage.write_chat("Alice", [[{"info": "", "text": "hi"}]])
+    scraper._submit = AsyncMock()
+
+    async def visits():
+        await scraper._snapshot_viewport()
+        return []
+
+    scraper._scrape_current_chat = visits
+    await scraper._process_chat(ChatRow(index=0, name="Alice"), "Alice")
+    assert not path.exists()
+
+    # With a full snapshot, it is appended and merged on re-extraction
+    one = bubble("false_1", "[10:00, 1/31/2024] Alice: ", "one")
+    two = bubble("false_2", "[10:01, 1/31/2024] Alice: ", "two")
+    three = bubble("false_3", "[10:02, 1/31/2024] Alice: ", "three")
+    base = SnapshotWriter(path.parent, "Alice", {})
+    base.write(panel(one, two))
+    base.close()
+    scraper.page.evaluate = AsyncMock(return_value=panel(two, three))
+    await scraper._process_chat(ChatRow(index=0, name="Alice"), "Alice")
+
+    _, _, messages = reextract_file(path, SELECTORS)
+    assert [m["text"] for m in messages] == ["one", "two", "three"]
+
+    # A visit torn while appending is dropped
+    with open(path, "ab") as f:
+        f.write(gzip.compress(b'{"chat": "Alice", "delta": true}\n')[:-4])
+    assert [h["delta"] for h, _ in read_snapshot(path)] == [False, True]
@@ -0,0 +1,67 @@
+import json
+
+from midori_kage.storage import JsonlStorage, JsonStorage
+
+
+def test_json_batches_match_whole_file_dump(tmp_path):
+    """Streaming batches produces the same file as a single json.dump."""
+    storage = JsonStorage(tmp_path)
+    messages = [
+        {"info": "[10:00] A:", "text": "héllo"},
+        {"info": "", "text": "l1\u2028l2\u2029l3\x85l4\nl5"},
+    ]
+    contact = {"name": "A"}
+
+    for batches in ([messages[:1], [], messages[1:]], []):
+        flat = [m for batch in batches for m in batch]
+        storage.write_chat("chat", iter(batches), contact)
+
+        expected = {"chat_name": "chat", "contact_info": contact, "messages": flat}
+        assert (tmp_path / "chat.json").read_text(encoding="utf-8") == json.dumps(
+            expected, ensure_ascii=False, indent=2
+        )
+        assert storage.load_chat("chat") == expected
+
+
+def test_jsonl_append_and_tail(tmp_path):
+    storage = JsonlStorage(tmp_path)
+    storage.write_chat("chat", [[{"text": "1"}], [{"text": "2"}]], {"name": "A"})
+    storage.append_messages("chat", [{"text": "3"}])
+
+    chat = storage.load_chat("chat")
+    assert chat["contact_info"] == {"name": "A"}
+    assert [m["text"] for m in chat["messages"]] == ["1", "2", "3"]
+    assert storage.tail("chat", 2) == [{"text": "2"}, {"text": "3"}]
+
+
+def test_jsonl_survives_torn_line(tmp_path):
+    storage = JsonlStorage(tmp_path)
+    storage.write_chat("chat", [[{"text": "1"}]])
+    with open(tmp_path / "chat.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"text": "cra')
+
+    storage.append_messages("chat", [{"text": "2"}])
+
+    assert [m["text"] for m in storage.load_chat("chat")["messages"]] == ["1", "2"]
+    assert storage.tail("chat") == [{"text": "2"}]
+
+
+def test_jsonl_reads_legacy_json_chats(tmp_path):
+    JsonStorage(tmp_path).write_chat("old", [[{"text": "1"}]], {"name": "B"})
+    storage = JsonlStorage(tmp_path)
+
+    assert storage.exists("old")
+    assert storage.load_chat("old")["contact_info"] == {"name": "B"}
+    assert storage.chat_names() == ["old"]
+
+    storage.append_messages("old", [{"text": "2"}])
+    assert [m["text"] for m in storage.load_chat("old")["messages"]] == ["1", "2"]
+
+
+def test_jsonl_chat_names_skip_dot_files(tmp_path):
+    storage = JsonlStorage(tmp_path)
+    storage.write_chat("chat", [[{"text": "1"}]])
+    (tmp_path / ".chat.spool.jsonl").write_text("[]\n")
+    (tmp_path / ".chat.spool.norm.jsonl").write_text("[]\n")
+
+    assert storage.chat_names() == ["chat"]